@@ -0,0 +1,127 @@
+"""Compares protocol throughput with uncompressed, gzip and zstd compressed request and response bodies.
+
+Requests are made by an `AsyncRequestHandler` to a `NodeServer` in process, through an ASGI transport, so the CPU time of a request includes both sides: encoding, compressing, decompressing and decoding. Payloads are a broadcast of Slack-like message events (a compressed request) and a fetch of Slack-like message bundles with their contents (a compressed response). Throughput over a link is estimated from the CPU time and the bytes on the wire, assuming the link is the only other bottleneck. zstd is only listed if `zstandard` is installed. Times are the fastest of `runs` runs.
+
+Usage: python benchmarks/compression.py [runs]
+"""
+
+import asyncio
+import gc
+import sys
+import tempfile
+import time
+import httpx
+from rid_lib.ext import Bundle
+from rid_lib.types import SlackMessage
+from koi_net import NodeInterface
+from koi_net.config import NodeConfig, KoiNetConfig, HTTPClientConfig
+from koi_net.network.async_request_handler import AsyncRequestHandler
+from koi_net.protocol.api_models import EventsPayload, FetchBundles
+from koi_net.protocol.compression import compress, supported_encodings
+from koi_net.protocol.event import Event, EventType
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+from koi_net.server import NodeServer
+
+LINKS = {"1 Gbit/s": 1e9, "100 Mbit/s": 1e8, "10 Mbit/s": 1e7}
+
+
+def message(i: int) -> dict:
+    return {
+        "type": "message",
+        "text": f"message {i}: " + " ".join(f"word{(i * 7 + j) % 300}" for j in range(60)),
+        "user": f"U{i % 50:08d}",
+        "ts": f"{1700000000 + i}.000100",
+        "thread_ts": f"{1700000000 + i - i % 10}.000100",
+        "reactions": [
+            {"name": f"reaction-{j}", "count": j + 1, "users": [f"U{k:08d}" for k in range(j + 1)]}
+            for j in range(i % 5)
+        ]
+    }
+
+def client_for(app, encoding: str | None) -> AsyncRequestHandler:
+    handler = AsyncRequestHandler(
+        None, None, HTTPClientConfig(compression_threshold=1024 if encoding else None))
+    handler.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        headers={"Accept-Encoding": encoding or "identity"}
+    )
+    return handler
+
+async def fastest(app, encodings: list[str | None], make_request, runs: int) -> dict[str | None, float]:
+    """Makes requests with each coding interleaved (with garbage collection disabled), returning the fastest time of each in seconds."""
+    handlers = {encoding: client_for(app, encoding) for encoding in encodings}
+    for handler in handlers.values():
+        # the first response advertises the codings the server accepts
+        await make_request(handler)
+    
+    best = {encoding: float("inf") for encoding in encodings}
+    gc.disable()
+    try:
+        for _ in range(runs):
+            for encoding, handler in handlers.items():
+                start = time.perf_counter()
+                await make_request(handler)
+                best[encoding] = min(best[encoding], time.perf_counter() - start)
+    finally:
+        gc.enable()
+        for handler in handlers.values():
+            await handler.aclose()
+    return best
+
+def main(runs: int = 30):
+    directory = tempfile.mkdtemp()
+    config = NodeConfig(koi_net=KoiNetConfig(
+        node_name="bench",
+        node_profile=NodeProfile(
+            node_type=NodeType.FULL,
+            provides=NodeProvides(event=[SlackMessage], state=[SlackMessage])
+        ),
+        cache_directory_path=f"{directory}/cache",
+        event_queues_path=f"{directory}/event_queues.json",
+        sync_watermarks_path=None
+    ))
+    # processor threads are never started, so broadcast events stay queued
+    node = NodeInterface(config, use_kobj_processor_thread=True)
+    app = NodeServer(node).app
+    url = "http://bench" + config.server.path
+    
+    bundles = [
+        Bundle.generate(SlackMessage("T0", "C0", f"{1700000000 + i}.000100"), message(i))
+        for i in range(200)
+    ]
+    for bundle in bundles:
+        node.cache.write(bundle)
+    
+    events = EventsPayload(events=[
+        Event.from_bundle(EventType.NEW, bundle) for bundle in bundles
+    ])
+    fetch = FetchBundles(rids=[bundle.rid for bundle in bundles])
+    
+    async def broadcast(handler: AsyncRequestHandler):
+        await handler.broadcast_events(url=url, req=events)
+        for kobj_queue in node.processor.kobj_queues:
+            kobj_queue.queue.clear()
+    
+    async def fetch_bundles(handler: AsyncRequestHandler):
+        await handler.fetch_bundles(url=url, req=fetch)
+    
+    cases = {
+        "broadcast 200 events": (broadcast, events),
+        "fetch 200 bundles": (fetch_bundles, node.network.response_handler.fetch_bundles(fetch))
+    }
+    encodings = [None] + supported_encodings()[::-1]
+    
+    print(f"{'payload':<22}{'coding':<10}{'wire KB':>10}{'ratio':>8}{'cpu ms':>10}"
+        + "".join(f"{link + ' /s':>16}" for link in LINKS))
+    for case, (make_request, payload) in cases.items():
+        body = node.network.codec.encode(payload)
+        results = asyncio.run(fastest(app, encodings, make_request, runs))
+        for encoding, seconds in results.items():
+            wire = len(compress(body, encoding)) if encoding else len(body)
+            print(
+                f"{case:<22}{encoding or 'identity':<10}{wire / 1024:>10.1f}{len(body) / wire:>8.1f}{seconds * 1000:>10.2f}"
+                + "".join(f"{1 / (seconds + wire * 8 / bps):>16.1f}" for bps in LINKS.values())
+            )
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
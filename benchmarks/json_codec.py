@@ -0,0 +1,93 @@
+"""Compares encoding and decoding protocol payloads with the available `koi_net.protocol.codec` codecs and the previous path.
+
+The previous path is what request handlers used before codecs: `model_dump_json()` encoded to bytes, and `model_validate_json(resp.text)`, decoding the body to a string first. Payloads are a poll response of small events, a fetch response of bundles with large contents, and saved event queues (the same events queued for several nodes). Codecs are only listed if their backend is installed (`orjson`, `msgspec`). Times are the fastest of `runs` interleaved runs, in milliseconds per payload.
+
+Usage: python benchmarks/json_codec.py [runs]
+"""
+
+import gc
+import importlib.util
+import sys
+import time
+from typing import Callable
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.network.interface import EventQueueModel
+from koi_net.protocol.api_models import EventsPayload, BundlesPayload
+from koi_net.protocol.codec import CODECS, get_codec
+from koi_net.protocol.event import Event, EventType
+
+
+def message(i: int) -> dict:
+    return {
+        "text": f"message {i} " + "lorem ipsum dolor sit amet " * 40,
+        "user": f"U{i % 50}",
+        "ts": f"{i}.000100",
+        "reactions": [
+            {"name": f"reaction-{j}", "count": j, "users": [f"U{k}" for k in range(5)]}
+            for j in range(10)
+        ]
+    }
+
+def fastest(funcs: dict[str, Callable], runs: int) -> dict[str, float]:
+    """Runs functions interleaved (with garbage collection disabled, like `timeit`), returning the fastest time of each."""
+    best = {name: float("inf") for name in funcs}
+    gc.disable()
+    try:
+        for _ in range(runs):
+            for name, func in funcs.items():
+                start = time.perf_counter()
+                func()
+                best[name] = min(best[name], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return {name: seconds * 1000 for name, seconds in best.items()}
+
+def main(runs: int = 30):
+    events = [
+        Event.from_bundle(EventType.NEW, Bundle.generate(
+            SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}", "user": f"U{i % 50}"}))
+        for i in range(500)
+    ]
+    payloads = {
+        "500 events": EventsPayload(events=events),
+        "200 large bundles": BundlesPayload(bundles=[
+            Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), message(i))
+            for i in range(200)
+        ]),
+        "event queues 5x500": EventQueueModel(
+            poll={KoiNetNode.generate(f"node-{i}"): events for i in range(5)},
+            webhook={}
+        )
+    }
+    codecs = [
+        get_codec(name) for name in CODECS
+        if name == "pydantic" or importlib.util.find_spec(name)
+    ]
+    
+    # all codecs encode with pydantic-core
+    print(f"{'encode (ms)':<22}{'previous':>12}{'codec':>12}")
+    for name, payload in payloads.items():
+        results = fastest({
+            "previous": lambda: payload.model_dump_json().encode(),
+            "codec": lambda: codecs[0].encode(payload)
+        }, runs)
+        print(f"{name:<22}" + "".join(f"{result:>12.2f}" for result in results.values()))
+    
+    for i, (name, payload) in enumerate(payloads.items()):
+        model = type(payload)
+        data = payload.model_dump_json().encode()
+        
+        funcs = {"previous": lambda: model.model_validate_json(data.decode())}
+        for codec in codecs:
+            funcs[codec.name] = lambda codec=codec: codec.decode(data, model)
+            funcs[f"{codec.name} memoized"] = lambda codec=codec: codec.decode_memoized(data, model)
+        
+        if i == 0:
+            print(f"\n{'decode (ms)':<22}" + "".join(f"{column:>18}" for column in funcs))
+        results = fastest(funcs, runs)
+        print(f"{name:<22}" + "".join(f"{result:>18.2f}" for result in results.values()))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,124 @@
+"""Compares protocol endpoint throughput of hand-wired sync FastAPI routes and `koi_net.server.NodeServer`.
+
+The hand-wired app is the one every full node used to define (see the examples before `NodeServer`): sync route functions, run in the threadpool, with request and response bodies validated and encoded by FastAPI. Requests are sent in process through an ASGI transport, one at a time, so the numbers only include the server side. Events received through broadcasts are queued but not processed.
+
+Usage: python benchmarks/server_endpoints.py [requests]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+import httpx
+from fastapi import FastAPI
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode
+from koi_net import NodeInterface
+from koi_net.config import NodeConfig, KoiNetConfig
+from koi_net.processor.knowledge_object import KnowledgeSource
+from koi_net.protocol.api_models import (
+    EventsPayload,
+    PollEvents,
+    FetchBundles,
+    BundlesPayload
+)
+from koi_net.protocol.consts import (
+    BROADCAST_EVENTS_PATH,
+    POLL_EVENTS_PATH,
+    FETCH_BUNDLES_PATH
+)
+from koi_net.protocol.event import Event, EventType
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+from koi_net.server import NodeServer
+
+
+def hand_wired_app(node: NodeInterface) -> FastAPI:
+    app = FastAPI()
+    
+    @app.post("/koi-net" + BROADCAST_EVENTS_PATH)
+    def broadcast_events(req: EventsPayload):
+        for event in req.events:
+            node.processor.handle(event=event, source=KnowledgeSource.External)
+    
+    @app.post("/koi-net" + POLL_EVENTS_PATH)
+    def poll_events(req: PollEvents) -> EventsPayload:
+        return node.network.handle_poll(req)
+    
+    @app.post("/koi-net" + FETCH_BUNDLES_PATH)
+    def fetch_bundles(req: FetchBundles) -> BundlesPayload:
+        return node.network.response_handler.fetch_bundles(req)
+    
+    return app
+
+async def requests_per_second(app: FastAPI, path: str, body: bytes, n: int) -> float:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench"
+    ) as client:
+        start = time.perf_counter()
+        for _ in range(n):
+            resp = await client.post(
+                "/koi-net" + path,
+                content=body,
+                headers={"Content-Type": "application/json"}
+            )
+            resp.raise_for_status()
+        return n / (time.perf_counter() - start)
+
+def main(n: int = 200):
+    directory = tempfile.mkdtemp()
+    config = NodeConfig(koi_net=KoiNetConfig(
+        node_name="bench",
+        node_profile=NodeProfile(
+            node_type=NodeType.FULL,
+            provides=NodeProvides(state=[KoiNetNode])
+        ),
+        cache_directory_path=f"{directory}/cache",
+        event_queues_path=f"{directory}/event_queues.json",
+        sync_watermarks_path=None
+    ))
+    # processor threads are never started, so broadcast events stay queued
+    node = NodeInterface(config, use_kobj_processor_thread=True)
+    
+    bundles = [
+        Bundle.generate(
+            KoiNetNode.generate(f"node-{i}"),
+            {"text": f"contents of bundle {i} " * 20, "index": i}
+        )
+        for i in range(100)
+    ]
+    for bundle in bundles:
+        node.cache.write(bundle)
+    
+    events = EventsPayload(events=[
+        Event.from_bundle(EventType.NEW, bundles[i % len(bundles)])
+        for i in range(500)
+    ])
+    
+    cases = {
+        "broadcast 500 events": (
+            BROADCAST_EVENTS_PATH, events.model_dump_json().encode()),
+        "fetch 100 bundles": (
+            FETCH_BUNDLES_PATH,
+            FetchBundles(rids=[b.rid for b in bundles]).model_dump_json().encode()),
+        "poll empty queue": (
+            POLL_EVENTS_PATH,
+            PollEvents(rid=KoiNetNode.generate("poller")).model_dump_json().encode())
+    }
+    apps = {
+        "hand-wired": hand_wired_app(node),
+        "NodeServer": NodeServer(node).app
+    }
+    
+    print(f"{'endpoint':<24}" + "".join(f"{name + ' req/s':>20}" for name in apps))
+    for case, (path, body) in cases.items():
+        results = []
+        for app in apps.values():
+            results.append(asyncio.run(requests_per_second(app, path, body, n)))
+            for kobj_queue in node.processor.kobj_queues:
+                kobj_queue.queue.clear()
+        print(f"{case:<24}" + "".join(f"{result:>20.0f}" for result in results))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
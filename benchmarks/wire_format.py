@@ -0,0 +1,57 @@
+"""Compares the size and the encoding and decoding times of protocol payloads as JSON and as MessagePack.
+
+JSON is encoded and decoded with the fastest installed JSON codec (see `benchmarks/json_codec.py`), MessagePack with `koi_net.protocol.codec.MsgpackCodec` (requires `msgspec`). Payloads are a poll response of small events, a fetch response of manifests, and a fetch response of bundles with large contents. Times are the fastest of `runs` interleaved runs, in milliseconds per payload.
+
+Usage: python benchmarks/wire_format.py [runs]
+"""
+
+import sys
+from rid_lib.ext import Bundle
+from rid_lib.types import SlackMessage
+from koi_net.protocol.api_models import EventsPayload, ManifestsPayload, BundlesPayload
+from koi_net.protocol.codec import get_codec, get_msgpack_codec
+from koi_net.protocol.event import Event, EventType
+from json_codec import fastest, message
+
+
+def main(runs: int = 30):
+    msgpack_codec = get_msgpack_codec()
+    if not msgpack_codec:
+        print("MessagePack requires the 'msgspec' package")
+        return
+    json_codec = get_codec()
+    
+    bundles = [
+        Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), message(i))
+        for i in range(500)
+    ]
+    payloads = {
+        "500 events": EventsPayload(events=[
+            Event.from_bundle(EventType.NEW, Bundle.generate(
+                SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}", "user": f"U{i % 50}"}))
+            for i in range(500)
+        ]),
+        "500 manifests": ManifestsPayload(manifests=[bundle.manifest for bundle in bundles]),
+        "200 large bundles": BundlesPayload(bundles=bundles[:200])
+    }
+    
+    print(f"{'payload':<20}{'format':<10}{'KB':>10}{'encode ms':>12}{'decode ms':>12}")
+    for name, payload in payloads.items():
+        model = type(payload)
+        data = {codec: codec.encode(payload) for codec in (json_codec, msgpack_codec)}
+        funcs = {}
+        for codec in data:
+            funcs[f"{codec.name} encode"] = lambda codec=codec: codec.encode(payload)
+            funcs[f"{codec.name} decode"] = lambda codec=codec: codec.decode(data[codec], model)
+        results = fastest(funcs, runs)
+        
+        for codec, encoded in data.items():
+            label = "json" if codec is json_codec else "msgpack"
+            print(
+                f"{name:<20}{label:<10}{len(encoded) / 1024:>10.1f}"
+                f"{results[f'{codec.name} encode']:>12.2f}{results[f'{codec.name} decode']:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -1,37 +1,18 @@
 import json
 import logging
 from pydantic import Field
-import uvicorn
-from contextlib import asynccontextmanager
 from rich.logging import RichHandler
-from fastapi import FastAPI
 from rid_lib.types import KoiNetNode, KoiNetEdge
 from koi_net import NodeInterface
 from koi_net.config import NodeConfig, KoiNetConfig
 from koi_net.processor.handler import HandlerType
-from koi_net.processor.knowledge_object import KnowledgeObject, KnowledgeSource
+from koi_net.processor.knowledge_object import KnowledgeObject
 from koi_net.protocol.edge import EdgeType
 from koi_net.protocol.event import Event, EventType
 from koi_net.protocol.helpers import generate_edge_bundle
 from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
 from koi_net.processor import ProcessorInterface
-from koi_net.protocol.api_models import (
-    PollEvents,
-    FetchRids,
-    FetchManifests,
-    FetchBundles,
-    EventsPayload,
-    RidsPayload,
-    ManifestsPayload,
-    BundlesPayload
-)
-from koi_net.protocol.consts import (
-    BROADCAST_EVENTS_PATH,
-    POLL_EVENTS_PATH,
-    FETCH_RIDS_PATH,
-    FETCH_MANIFESTS_PATH,
-    FETCH_BUNDLES_PATH
-)
+from koi_net.server import NodeServer
 
 
 logging.basicConfig(
@@ -95,47 +76,13 @@ def handshake_handler(proc: ProcessorInterface, kobj: KnowledgeObject):
 
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    node.start()
-    yield
-    node.stop()
-
-app = FastAPI(
-    lifespan=lifespan, 
-    root_path="/koi-net",
-    title="KOI-net Protocol API",
-    version="1.0.0"
-)
+server = NodeServer(node)
+app = server.app
 
-@app.post(BROADCAST_EVENTS_PATH)
-def broadcast_events(req: EventsPayload):
-    logger.info(f"Request to {BROADCAST_EVENTS_PATH}, received {len(req.events)} event(s)")
-    for event in req.events:
-        node.processor.handle(event=event, source=KnowledgeSource.External)
-    
-@app.post(POLL_EVENTS_PATH)
-def poll_events(req: PollEvents) -> EventsPayload:
-    logger.info(f"Request to {POLL_EVENTS_PATH}")
-    events = node.network.flush_poll_queue(req.rid)
-    return EventsPayload(events=events)
-
-@app.post(FETCH_RIDS_PATH)
-def fetch_rids(req: FetchRids) -> RidsPayload:
-    return node.network.response_handler.fetch_rids(req)
-
-@app.post(FETCH_MANIFESTS_PATH)
-def fetch_manifests(req: FetchManifests) -> ManifestsPayload:
-    return node.network.response_handler.fetch_manifests(req)
-
-@app.post(FETCH_BUNDLES_PATH)
-def fetch_bundles(req: FetchBundles) -> BundlesPayload:
-    return node.network.response_handler.fetch_bundles(req)
-    
 if __name__ == "__main__":
     openapi_spec = app.openapi()
 
     with open("koi-net-protocol-openapi.json", "w") as f:
         json.dump(openapi_spec, f, indent=2)
     
-    uvicorn.run("examples.basic_coordinator_node:app", port=node.config.server.port)
\ No newline at end of file
+    server.run()
\ No newline at end of file
@@ -39,8 +39,10 @@ node = NodeInterface(
 node.start()
 
 while True:
-    for event in node.network.poll_neighbors():
-        node.processor.handle(event=event, source=KnowledgeSource.External)
+    node.processor.handle_many(
+        events=node.network.poll_neighbors(),
+        source=KnowledgeSource.External
+    )
     node.processor.flush_kobj_queue()
     
     time.sleep(5)
\ No newline at end of file
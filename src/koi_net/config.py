@@ -11,18 +11,60 @@ class ServerConfig(BaseModel):
     host: str | None = "127.0.0.1"
     port: int | None = 8000
     path: str | None = "/koi-net"
+    max_body_size: int = 16 * 1024 * 1024
+    compression_threshold: int | None = 1024
     
     @property
     def url(self) -> str:
         return f"http://{self.host}:{self.port}{self.path or ''}"
 
+class HTTPClientConfig(BaseModel):
+    connect_timeout: float | None = 5.0
+    read_timeout: float | None = 30.0
+    write_timeout: float | None = 30.0
+    pool_timeout: float | None = 5.0
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+    http2: bool = False
+    max_concurrent_requests: int = 10
+    compression_threshold: int | None = 1024
+    msgpack: bool = False
+
+class EventLogConfig(BaseModel):
+    path: str | None = None
+    segment_size: int = 1000
+    fsync_batch: int = 100
+    fsync_interval: float = 1.0
+    max_batch_size: int = 1000
+    coalesce: bool = False
+
+class PeerRetryConfig(BaseModel):
+    failure_threshold: int = 1
+    base_delay: float = 1.0
+    max_delay: float = 300.0
+    jitter: float = 0.5
+
 class KoiNetConfig(BaseModel):
     node_name: str
     node_rid: KoiNetNode | None = None
     node_profile: NodeProfile
     
     cache_directory_path: str | None = ".rid_cache"
+    cache_database_path: str | None = None
+    change_log_size: int = 10000
+    sync_watermarks_path: str | None = "sync_watermarks.json"
     event_queues_path: str | None = "event_queues.json"
+    event_log: EventLogConfig = Field(default_factory=EventLogConfig)
+    profile_cache_size: int = 10000
+    http_client: HTTPClientConfig = Field(default_factory=HTTPClientConfig)
+    fetch_hedge_delay: float | None = None
+    fetch_batch_window: float | None = None
+    fetch_batch_size: int = 100
+    webhook_flush_interval: float | None = None
+    webhook_batch_size: int = 100
+    peer_retry: PeerRetryConfig = Field(default_factory=PeerRetryConfig)
+    json_codec: str | None = None
 
     first_contact: str | None = None
 
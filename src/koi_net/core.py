@@ -3,11 +3,14 @@ from typing import Generic
 import httpx
 from rid_lib.ext import Cache, Bundle
 from .network import NetworkInterface
+from .storage import FileCache, SQLiteCache
 from .processor import ProcessorInterface
 from .processor import default_handlers
 from .processor.handler import KnowledgeHandler
 from .identity import NodeIdentity
 from .protocol.event import Event, EventType
+from .protocol.edge import EdgeStatus
+from .protocol.node import NodeType
 from .config import ConfigType
 
 logger = logging.getLogger(__name__)
@@ -21,12 +24,12 @@ class NodeInterface(Generic[ConfigType]):
     network: NetworkInterface
     processor: ProcessorInterface
     
-    use_kobj_processor_thread: bool
+    use_kobj_processor_thread: bool | int
     
     def __init__(
         self, 
         config: ConfigType,
-        use_kobj_processor_thread: bool = False,
+        use_kobj_processor_thread: bool | int = False,
         
         handlers: list[KnowledgeHandler] | None = None,
         
@@ -35,8 +38,14 @@ class NodeInterface(Generic[ConfigType]):
         processor: ProcessorInterface | None = None
     ):
         self.config: ConfigType = config
-        self.cache = cache or Cache(
-            self.config.koi_net.cache_directory_path)
+        if cache:
+            self.cache = cache
+        elif self.config.koi_net.cache_database_path:
+            self.cache = SQLiteCache(
+                self.config.koi_net.cache_database_path)
+        else:
+            self.cache = FileCache(
+                self.config.koi_net.cache_directory_path)
         
         self.identity = NodeIdentity(
             config=self.config,
@@ -68,11 +77,17 @@ class NodeInterface(Generic[ConfigType]):
     def start(self) -> None:
         """Starts a node, call this method first.
         
-        Starts the processor thread (if enabled). Loads event queues into memory. Generates network graph from nodes and edges in cache. Processes any state changes of node bundle. Initiates handshake with first contact (if provided) if node doesn't have any neighbors.
+        Starts the processor worker thread(s) and webhook dispatcher (if enabled). Loads event queues into memory. Generates network graph from nodes and edges in cache. Processes any state changes of node bundle. Catches up with providers in the background. Initiates handshake with first contact (if provided) if node doesn't have any neighbors.
         """
         if self.use_kobj_processor_thread:
-            logger.info("Starting processor worker thread")
-            self.processor.worker_thread.start()
+            logger.info(f"Starting {self.processor.worker_count} processor worker thread(s)")
+            for worker_thread in self.processor.worker_threads:
+                worker_thread.start()
+            if self.processor.fetch_batcher:
+                self.processor.fetch_batcher.start()
+        
+        if self.network.webhook_dispatcher:
+            self.network.webhook_dispatcher.start()
         
         self.network._load_event_queues()
         self.network.graph.generate()
@@ -84,9 +99,11 @@ class NodeInterface(Generic[ConfigType]):
             )
         )
         
+        self.catch_up_with_providers()
+        
         logger.debug("Waiting for kobj queue to empty")
         if self.use_kobj_processor_thread:
-            self.processor.kobj_queue.join()
+            self.processor.join()
         else:
             self.processor.flush_kobj_queue()
         logger.debug("Done")
@@ -105,22 +122,43 @@ class NodeInterface(Generic[ConfigType]):
                     events=events
                 )
                 
-            except httpx.ConnectError:
+            except httpx.HTTPError:
                 logger.warning("Failed to reach first contact")
                 return
             
                         
+    def catch_up_with_providers(self):
+        """Schedules catch ups on the subscribed RID types of every full node with an approved edge to this node."""
+        for edge_rid in self.network.graph.get_edges(direction="in"):
+            edge_profile = self.network.graph.get_edge_profile(rid=edge_rid)
+            if not edge_profile or edge_profile.status != EdgeStatus.APPROVED:
+                continue
+            
+            node_profile = self.network.graph.get_node_profile(edge_profile.source)
+            if not node_profile or node_profile.node_type != NodeType.FULL:
+                continue
+            
+            self.processor.schedule_catch_up(
+                edge_profile.source, rid_types=edge_profile.rid_types)
+    
     def stop(self):
         """Stops a node, call this method last.
         
-        Finishes processing knowledge object queue. Saves event queues to storage.
+        Finishes processing knowledge object queue. Flushes pending webhook queues (if the webhook dispatcher is enabled). Saves event queues to storage. Closes HTTP connections to other nodes.
         """
         logger.info("Stopping node...")
         
         if self.use_kobj_processor_thread:
-            logger.info(f"Waiting for kobj queue to empty ({self.processor.kobj_queue.unfinished_tasks} tasks remaining)")
-            self.processor.kobj_queue.join()
+            logger.info(f"Waiting for kobj queue to empty ({self.processor.unfinished_tasks} tasks remaining)")
+            self.processor.join()
         else:
             self.processor.flush_kobj_queue()
         
-        self.network._save_event_queues()
\ No newline at end of file
+        if self.network.webhook_dispatcher:
+            self.network.webhook_dispatcher.stop()
+        
+        self.network._save_event_queues()
+        self.network._save_sync_watermarks()
+        self.network._fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.network.request_handler.close()
+        self.network.async_request_handler.close()
\ No newline at end of file
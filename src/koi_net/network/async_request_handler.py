@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import threading
+import weakref
+from typing import AsyncIterator
+import httpx
+from rid_lib import RID
+from rid_lib.ext import Cache
+from ..protocol.api_models import (
+    RidsPayload,
+    ManifestsPayload,
+    BundlesPayload,
+    EventsPayload,
+    FetchRids,
+    FetchManifests,
+    FetchBundles,
+    PollEvents,
+    RequestModels,
+    ResponseModels
+)
+from ..protocol.consts import (
+    BROADCAST_EVENTS_PATH,
+    POLL_EVENTS_PATH,
+    FETCH_RIDS_PATH,
+    FETCH_MANIFESTS_PATH,
+    FETCH_BUNDLES_PATH,
+    NDJSON_MEDIA_TYPE
+)
+from ..protocol.codec import JSONCodec, MsgpackCodec
+from ..config import HTTPClientConfig
+from .graph import NetworkGraph
+from .request_handler import BaseRequestHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequestHandler(BaseRequestHandler):
+    """Handles making requests to other KOI nodes from an asyncio event loop.
+    
+    Mirrors `RequestHandler`, but all request methods are coroutines sharing a pooled `httpx.AsyncClient`. The number of requests in flight at once is bounded by `HTTPClientConfig.max_concurrent_requests` (streamed responses are only counted until their headers arrive).
+    
+    Clients and semaphores are bound to an event loop, so they are created lazily for each running loop using the handler (a server's loop, or each `asyncio.run` call).
+    """
+    
+    def __init__(
+        self,
+        cache: Cache,
+        graph: NetworkGraph,
+        client_config: HTTPClientConfig | None = None,
+        codec: JSONCodec | None = None,
+        msgpack_codec: MsgpackCodec | None = None
+    ):
+        super().__init__(cache, graph, client_config, codec, msgpack_codec)
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = httpx.AsyncClient(**self._client_kwargs())
+            return client
+    
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        with self._lock:
+            self._clients[asyncio.get_running_loop()] = client
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding the requests in flight in the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(
+                    self.client_config.max_concurrent_requests)
+            return semaphore
+    
+    async def aclose(self):
+        """Closes pooled connections of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+            self._semaphores.pop(loop, None)
+        if client:
+            await client.aclose()
+    
+    def close(self):
+        """Closes pooled connections of every event loop, call when shutting down the node.
+        
+        Clients of loops running in other threads are closed on their loop, without waiting. Clients of closed loops are dropped (their connections were closed with the loop).
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+            self._semaphores.clear()
+        
+        for loop, client in clients:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+    
+    async def _post(
+        self,
+        url: str,
+        request: RequestModels,
+        headers: dict | None = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """See `RequestHandler._post`."""
+        content, body_headers = self._encode_body(url, request)
+        resp = await self.client.send(
+            self.client.build_request("POST", url, content=content, headers={**body_headers, **(headers or {})}),
+            stream=stream
+        )
+        self._update_negotiation(url, resp)
+        
+        if resp.status_code == 415 and self._negotiated(body_headers):
+            logger.debug(f"{url} rejected request body, retrying as plain JSON")
+            await resp.aclose()
+            content, body_headers = self._encode_body(url, request, negotiated=False)
+            resp = await self.client.send(
+                self.client.build_request("POST", url, content=content, headers={**body_headers, **(headers or {})}),
+                stream=stream
+            )
+            self._update_negotiation(url, resp)
+        return resp
+    
+    async def make_request(
+        self,
+        url: str,
+        request: RequestModels,
+        response_model: type[ResponseModels] | None = None
+    ) -> ResponseModels | None:
+        async with self.semaphore:
+            logger.debug(f"Making request to {url}")
+            resp = await self._post(url, request)
+        resp.raise_for_status()
+        if response_model:
+            return self._response_codec(resp).decode(resp.content, response_model)
+    
+    async def make_stream_request(
+        self,
+        url: str,
+        request: RequestModels,
+        response_model: type[ResponseModels]
+    ) -> AsyncIterator[ResponseModels]:
+        """See `RequestHandler.make_stream_request`.
+        
+        The request only counts towards `max_concurrent_requests` until the response headers arrive, so the caller may make other requests while consuming the stream.
+        """
+        async with self.semaphore:
+            logger.debug(f"Making stream request to {url}")
+            resp = await self._post(
+                url, request,
+                headers={"Accept": f"{NDJSON_MEDIA_TYPE}, application/json"},
+                stream=True
+            )
+        try:
+            resp.raise_for_status()
+            if not resp.headers.get("Content-Type", "").startswith(NDJSON_MEDIA_TYPE):
+                yield self._response_codec(resp).decode(await resp.aread(), response_model)
+                return
+            
+            async for line in resp.aiter_lines():
+                if line:
+                    yield self.codec.decode(line, response_model)
+        finally:
+            await resp.aclose()
+    
+    async def broadcast_events(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: EventsPayload | None = None,
+        **kwargs
+    ) -> None:
+        """See protocol.api_models.EventsPayload for available kwargs."""
+        request = req or EventsPayload.model_validate(kwargs)
+        await self.make_request(
+            self.get_url(node, url) + BROADCAST_EVENTS_PATH, request
+        )
+        logger.info(f"Broadcasted {len(request.events)} event(s) to {node or url!r}")
+    
+    async def poll_events(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: PollEvents | None = None,
+        **kwargs
+    ) -> EventsPayload:
+        """See protocol.api_models.PollEvents for available kwargs."""
+        request = req or PollEvents.model_validate(kwargs)
+        resp = await self.make_request(
+            self.get_url(node, url) + POLL_EVENTS_PATH, request,
+            response_model=EventsPayload
+        )
+        logger.info(f"Polled {len(resp.events)} events from {node or url!r}")
+        return resp
+    
+    async def fetch_rids(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchRids | None = None,
+        **kwargs
+    ) -> RidsPayload:
+        """See protocol.api_models.FetchRids for available kwargs."""
+        request = req or FetchRids.model_validate(kwargs)
+        resp = await self.make_request(
+            self.get_url(node, url) + FETCH_RIDS_PATH, request,
+            response_model=RidsPayload
+        )
+        logger.info(f"Fetched {len(resp.rids)} RID(s) from {node or url!r}")
+        return resp
+    
+    async def fetch_manifests(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchManifests | None = None,
+        **kwargs
+    ) -> ManifestsPayload:
+        """See protocol.api_models.FetchManifests for available kwargs."""
+        request = req or FetchManifests.model_validate(kwargs)
+        resp = await self.make_request(
+            self.get_url(node, url) + FETCH_MANIFESTS_PATH, request,
+            response_model=ManifestsPayload
+        )
+        logger.info(f"Fetched {len(resp.manifests)} manifest(s) from {node or url!r}")
+        return resp
+    
+    async def fetch_bundles(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchBundles | None = None,
+        **kwargs
+    ) -> BundlesPayload:
+        """See protocol.api_models.FetchBundles for available kwargs."""
+        request = req or FetchBundles.model_validate(kwargs)
+        resp = await self.make_request(
+            self.get_url(node, url) + FETCH_BUNDLES_PATH, request,
+            response_model=BundlesPayload
+        )
+        logger.info(f"Fetched {len(resp.bundles)} bundle(s) from {node or url!r}")
+        return resp
+    
+    
+    async def stream_rids(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchRids | None = None,
+        **kwargs
+    ) -> AsyncIterator[RidsPayload]:
+        """Streaming variant of `fetch_rids`, yields chunks of the response as they are received."""
+        request = req or FetchRids.model_validate(kwargs)
+        async for payload in self.make_stream_request(
+            self.get_url(node, url) + FETCH_RIDS_PATH, request,
+            response_model=RidsPayload
+        ):
+            yield payload
+    
+    async def stream_manifests(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchManifests | None = None,
+        **kwargs
+    ) -> AsyncIterator[ManifestsPayload]:
+        """Streaming variant of `fetch_manifests`, yields chunks of the response as they are received."""
+        request = req or FetchManifests.model_validate(kwargs)
+        async for payload in self.make_stream_request(
+            self.get_url(node, url) + FETCH_MANIFESTS_PATH, request,
+            response_model=ManifestsPayload
+        ):
+            yield payload
+    
+    async def stream_bundles(
+        self,
+        node: RID = None,
+        url: str = None,
+        req: FetchBundles | None = None,
+        **kwargs
+    ) -> AsyncIterator[BundlesPayload]:
+        """Streaming variant of `fetch_bundles`, yields chunks of the response as they are received."""
+        request = req or FetchBundles.model_validate(kwargs)
+        async for payload in self.make_stream_request(
+            self.get_url(node, url) + FETCH_BUNDLES_PATH, request,
+            response_model=BundlesPayload
+        ):
+            yield payload
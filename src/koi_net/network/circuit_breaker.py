@@ -0,0 +1,121 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from rid_lib.types import KoiNetNode
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+@dataclass
+class PeerCircuit:
+    """Delivery state of a single peer."""
+    
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    retry_at: float = 0.0
+
+class CircuitBreaker:
+    """Tracks failed deliveries to peers, to stop contacting peers which are down.
+    
+    A peer's circuit opens after `failure_threshold` consecutive failures. Its retry delay starts at `base_delay` and doubles up to `max_delay` (minus up to `jitter` of it), after which a single probe request is allowed.
+    """
+    
+    failure_threshold: int
+    base_delay: float
+    max_delay: float
+    jitter: float
+    circuits: dict[KoiNetNode, PeerCircuit]
+    
+    def __init__(
+        self,
+        failure_threshold: int = 1,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.5
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.circuits = dict()
+        self._lock = threading.Lock()
+    
+    def state(self, node: KoiNetNode) -> CircuitState:
+        circuit = self.circuits.get(node)
+        return circuit.state if circuit else CircuitState.CLOSED
+    
+    def retry_in(self, node: KoiNetNode) -> float:
+        """Returns seconds until a request to the peer will be allowed (`0` if allowed now)."""
+        circuit = self.circuits.get(node)
+        if not circuit or circuit.state == CircuitState.CLOSED:
+            return 0.0
+        if circuit.state == CircuitState.HALF_OPEN:
+            # waits for the probe in flight
+            return self.base_delay
+        return max(circuit.retry_at - time.monotonic(), 0.0)
+    
+    def is_available(self, node: KoiNetNode) -> bool:
+        """Returns whether a request to the peer would currently be allowed, without changing its state."""
+        return self.retry_in(node) == 0.0
+    
+    def allow(self, node: KoiNetNode) -> bool:
+        """Returns whether a request to the peer may be made now.
+        
+        Once the retry delay has passed, the caller must report its probe request with `record_success` or `record_failure`.
+        """
+        with self._lock:
+            circuit = self.circuits.get(node)
+            if not circuit or circuit.state == CircuitState.CLOSED:
+                return True
+            if circuit.state == CircuitState.HALF_OPEN:
+                return False
+            if time.monotonic() < circuit.retry_at:
+                return False
+            
+            circuit.state = CircuitState.HALF_OPEN
+            logger.debug(f"Probing {node!r}")
+            return True
+    
+    def record_success(self, node: KoiNetNode):
+        with self._lock:
+            circuit = self.circuits.pop(node, None)
+        if circuit and circuit.state != CircuitState.CLOSED:
+            logger.info(f"{node!r} is reachable again")
+    
+    def record_failure(self, node: KoiNetNode):
+        with self._lock:
+            circuit = self.circuits.setdefault(node, PeerCircuit())
+            circuit.failures += 1
+            
+            if (
+                circuit.state == CircuitState.CLOSED and
+                circuit.failures < self.failure_threshold
+            ):
+                return
+            
+            exponent = min(max(circuit.failures - self.failure_threshold, 0), 32)
+            delay = min(self.base_delay * 2 ** exponent, self.max_delay)
+            delay *= 1 - self.jitter * random.random()
+            
+            circuit.state = CircuitState.OPEN
+            circuit.retry_at = time.monotonic() + delay
+            logger.warning(f"{node!r} unreachable after {circuit.failures} failure(s), retrying in {delay:.1f}s")
+    
+    def stats(self) -> dict[KoiNetNode, dict]:
+        """Returns state, consecutive failures, and retry delay of peers with failed deliveries."""
+        return {
+            node: {
+                "state": circuit.state,
+                "failures": circuit.failures,
+                "retry_in": self.retry_in(node)
+            }
+            for node, circuit in list(self.circuits.items())
+        }
@@ -0,0 +1,380 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from rid_lib import RID
+from ..protocol.event import Event, EventType
+from ..protocol.api_models import EventsPayload
+from ..protocol.codec import JSONCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+
+class NodeEventQueue(ABC):
+    """Queue of events waiting to be delivered to a single node.
+    
+    Events are numbered by offset, and stay queued until acknowledged with `ack`. Offsets restart with a new `epoch`. Events before `sent` may have been delivered without being acknowledged. Subclasses implement `_append`, `_read` and `_ack`.
+    """
+    
+    epoch: str
+    acked: int
+    sent: int
+    end: int
+    
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex
+        self.acked = 0
+        self.sent = 0
+        self.end = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self.end - self.acked
+    
+    def empty(self) -> bool:
+        return self.end <= self.acked
+    
+    def put(self, event: Event) -> int:
+        """Appends an event to the queue, returning its offset."""
+        with self._lock:
+            self._append(event)
+            self.end += 1
+            return self.end - 1
+    
+    def read(self, start: int | None = None, limit: int | None = None) -> list[Event]:
+        """Returns up to `limit` events from the `start` offset (first unacknowledged event by default)."""
+        with self._lock:
+            start = self.acked if start is None else max(start, self.acked)
+            stop = self.end if limit is None else min(self.end, start + limit)
+            if start >= stop:
+                return []
+            return self._read(start, stop)
+    
+    def ack(self, offset: int):
+        """Acknowledges delivery of all events before `offset`, removing them from the queue."""
+        with self._lock:
+            offset = min(offset, self.end)
+            if offset <= self.acked:
+                return
+            self._ack(offset)
+            self.acked = offset
+    
+    def mark_sent(self, offset: int):
+        """Records that events before `offset` have been sent."""
+        with self._lock:
+            self.sent = max(self.sent, min(offset, self.end))
+    
+    def pop(self, limit: int | None = None) -> list[Event]:
+        """Reads and immediately acknowledges up to `limit` events."""
+        with self._lock:
+            stop = self.end if limit is None else min(self.end, self.acked + limit)
+            if self.acked >= stop:
+                return []
+            events = self._read(self.acked, stop)
+            self._ack(stop)
+            self.acked = stop
+            return events
+    
+    def close(self):
+        """Releases resources held by the queue."""
+    
+    @abstractmethod
+    def _append(self, event: Event):
+        """Stores an event at offset `end`."""
+    
+    @abstractmethod
+    def _read(self, start: int, stop: int) -> list[Event]:
+        """Returns the stored events from offset `start` up to `stop`."""
+    
+    @abstractmethod
+    def _ack(self, offset: int):
+        """Removes the stored events before `offset`."""
+
+class MemoryEventQueue(NodeEventQueue):
+    """Event queue held in memory, lost if the process exits without saving it."""
+    
+    def __init__(self):
+        super().__init__()
+        self._events: deque[Event] = deque()
+    
+    def _append(self, event: Event):
+        self._events.append(event)
+    
+    def _read(self, start: int, stop: int) -> list[Event]:
+        base = self.acked
+        return [self._events[i - base] for i in range(start, stop)]
+    
+    def _ack(self, offset: int):
+        for _ in range(offset - self.acked):
+            self._events.popleft()
+
+class DurableEventQueue(NodeEventQueue):
+    """Event queue backed by an append-only log of segment files in `directory`.
+    
+    Each segment holds `segment_size` JSON lines. Writes are synced to disk every `fsync_batch` events or `fsync_interval` seconds. The acknowledged offset is kept in an `ack` file, and fully acknowledged segments are deleted.
+    """
+    
+    directory: str
+    segment_size: int
+    fsync_batch: int
+    fsync_interval: float
+    codec: JSONCodec
+    
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 1000,
+        fsync_batch: int = 100,
+        fsync_interval: float = 1.0,
+        codec: JSONCodec | None = None
+    ):
+        super().__init__()
+        self.directory = directory
+        self.segment_size = segment_size
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.codec = codec or get_codec()
+        
+        self._segments: list[int] = []
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: threading.Timer | None = None
+        
+        os.makedirs(directory, exist_ok=True)
+        self._replay()
+    
+    def _segment_path(self, base: int) -> str:
+        return os.path.join(self.directory, f"{base:020d}.log")
+    
+    @property
+    def _ack_path(self) -> str:
+        return os.path.join(self.directory, "ack")
+    
+    @property
+    def _epoch_path(self) -> str:
+        return os.path.join(self.directory, "epoch")
+    
+    def _replay(self):
+        """Restores epoch and offsets from the segments, epoch, and ack files on disk."""
+        try:
+            with open(self._epoch_path, "r") as f:
+                self.epoch = f.read().strip()
+        except FileNotFoundError:
+            with open(self._epoch_path, "w") as f:
+                f.write(self.epoch)
+        
+        self._segments = sorted(
+            int(name.removesuffix(".log"))
+            for name in os.listdir(self.directory)
+            if name.endswith(".log")
+        )
+        
+        if self._segments:
+            last = self._segments[-1]
+            path = self._segment_path(last)
+            with open(path, "rb") as f:
+                data = f.read()
+            
+            # drops a partially written event left by a crash
+            valid = data.rfind(b"\n") + 1
+            if valid < len(data):
+                logger.warning(f"Truncating partially written event in '{path}'")
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            
+            self.end = last + data.count(b"\n", 0, valid)
+            self.acked = self._segments[0]
+        
+        try:
+            with open(self._ack_path, "r") as f:
+                self.acked = max(self.acked, int(f.read().strip() or 0))
+        except FileNotFoundError:
+            pass
+        
+        self.acked = min(self.acked, self.end)
+        if not self._segments:
+            self.end = self.acked
+        # replayed events may have been sent before the restart
+        self.sent = self.end
+        
+        if len(self):
+            logger.debug(f"Replayed {len(self)} unacknowledged event(s) from '{self.directory}'")
+    
+    def _append(self, event: Event):
+        if (
+            self._file is None or
+            self.end - self._segments[-1] >= self.segment_size
+        ):
+            self._roll_segment()
+        
+        self._file.write(self.codec.encode(event) + b"\n")
+        self._file.flush()
+        self._unsynced += 1
+        
+        if (
+            self._unsynced >= self.fsync_batch or
+            time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync()
+        elif self._sync_timer is None:
+            self._sync_timer = threading.Timer(self.fsync_interval, self._sync_idle)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+    
+    def _roll_segment(self):
+        if self._segments and self._file is None and (
+            self.end - self._segments[-1] < self.segment_size
+        ):
+            # reopens the last segment after a restart
+            self._file = open(self._segment_path(self._segments[-1]), "ab")
+            return
+        
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        
+        self._segments.append(self.end)
+        self._file = open(self._segment_path(self.end), "ab")
+    
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def _sync_idle(self):
+        """Called by the sync timer, syncs events written since the last sync."""
+        with self._lock:
+            self._sync_timer = None
+            if self._unsynced:
+                self._sync()
+    
+    def _read(self, start: int, stop: int) -> list[Event]:
+        lines = []
+        for i, base in enumerate(self._segments):
+            next_base = self._segments[i + 1] if i + 1 < len(self._segments) else self.end
+            if next_base <= start:
+                continue
+            if base >= stop:
+                break
+            
+            with open(self._segment_path(base), "rb") as f:
+                for offset, line in enumerate(f, start=base):
+                    if offset >= stop:
+                        break
+                    if offset >= start:
+                        lines.append(line)
+        
+        payload = self.codec.decode_memoized(
+            b'{"events":[' + b",".join(lines) + b"]}", EventsPayload)
+        return payload.events
+    
+    def _ack(self, offset: int):
+        tmp_path = self._ack_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self._ack_path)
+        
+        self._compact(offset)
+    
+    def _compact(self, offset: int):
+        """Deletes segments which only contain events before `offset`."""
+        while self._segments:
+            base = self._segments[0]
+            next_base = self._segments[1] if len(self._segments) > 1 else self.end
+            
+            # keeps the segment being written to unless it is full
+            if len(self._segments) == 1 and self.end - base < self.segment_size:
+                break
+            if next_base > offset:
+                break
+            
+            if len(self._segments) == 1 and self._file is not None:
+                self._file.close()
+                self._file = None
+            
+            os.remove(self._segment_path(base))
+            self._segments.pop(0)
+            logger.debug(f"Compacted segment {base} of '{self.directory}'")
+    
+    def close(self):
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+
+class EventCoalescer:
+    """Reduces a batch of outbound events to the latest state of each RID.
+    
+    Events about the same RID are merged in order: `UPDATE`s replace earlier `NEW`s (keeping the `NEW` event type) and `UPDATE`s, a `FORGET` replaces an earlier `UPDATE`, and a `NEW` followed by a `FORGET` cancels out. A `NEW` following a `FORGET` is kept as is, so the receiver still resets its state. Remaining events are delivered in the order of the latest event merged into them.
+    
+    A `NEW` which may already have been delivered is never cancelled, the `FORGET` replaces it instead.
+    """
+    
+    events: int
+    coalesced: int
+    cancelled: int
+    
+    def __init__(self):
+        self.events = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+    
+    def coalesce(self, events: list[Event], delivered: int = 0) -> list[Event]:
+        """Returns coalesced events, updating counters.
+        
+        The first `delivered` events may already have been delivered (e.g. a redelivered poll page).
+        """
+        # (position, event, whether any merged event may have been delivered)
+        sequences: dict[RID, list[tuple[int, Event, bool]]] = {}
+        cancelled = 0
+        
+        for i, event in enumerate(events):
+            sequence = sequences.setdefault(event.rid, [])
+            last = sequence[-1][1].event_type if sequence else None
+            seen = i < delivered or bool(sequence) and sequence[-1][2]
+            
+            if last is None or (
+                last == EventType.FORGET and event.event_type != EventType.FORGET
+            ):
+                sequence.append((i, event, i < delivered))
+            
+            elif event.event_type == EventType.FORGET and last == EventType.NEW and not seen:
+                sequence.pop()
+                cancelled += 1
+            
+            elif event.event_type == EventType.UPDATE and last == EventType.NEW:
+                sequence[-1] = (i, event.model_copy(update={"event_type": EventType.NEW}), seen)
+            
+            else:
+                sequence[-1] = (i, event, seen)
+        
+        coalesced = sorted(
+            (item for sequence in sequences.values() for item in sequence),
+            key=lambda item: item[0]
+        )
+        
+        with self._lock:
+            self.events += len(events)
+            self.coalesced += len(events) - len(coalesced)
+            self.cancelled += cancelled
+        
+        return [event for _, event, _ in coalesced]
+    
+    def stats(self) -> dict[str, int]:
+        """Returns counters of events seen, events removed by coalescing, and cancelled `NEW`/`FORGET` pairs."""
+        return {
+            "events": self.events,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled
+        }
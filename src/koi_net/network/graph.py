@@ -1,51 +1,302 @@
 import logging
+import threading
 from typing import Literal
 import networkx as nx
-from rid_lib import RIDType
-from rid_lib.ext import Cache
+from rid_lib import RID, RIDType
+from rid_lib.ext import Bundle, Cache
 from rid_lib.types import KoiNetEdge, KoiNetNode
 from ..identity import NodeIdentity
+from ..protocol.event import EventType
 from ..protocol.edge import EdgeProfile, EdgeStatus
-from ..protocol.node import NodeProfile
+from ..protocol.node import NodeProfile, NodeType
+from .profile_cache import Profile, ProfileCache
 
 logger = logging.getLogger(__name__)
 
 
 class NetworkGraph:
-    """Graph functions for this node's view of its network."""
+    """Graph functions for this node's view of its network.
+    
+    Changes to the graph are guarded by `lock`, so it can be read while it is updated by processor worker threads.
+    
+    Also maintains indices of the nodes providing state (`FULL` nodes only) and events for each RID type, and of this node's neighbors by edge direction, status, and RID type, updated along with the graph.
+    
+    The graph holds a single edge between two nodes. If several edge RIDs connect the same nodes, the one added last is used (and indexed), and the previous one takes its place once it is removed."""
     
     cache: Cache
     identity: NodeIdentity
     dg: nx.DiGraph
+    edge_endpoints: dict[KoiNetEdge, tuple[KoiNetNode, KoiNetNode]]
+    profiles: ProfileCache
+    state_providers: dict[RIDType, set[KoiNetNode]]
+    event_providers: dict[RIDType, set[KoiNetNode]]
+    neighbor_index: dict[tuple, dict[KoiNetEdge, KoiNetNode]]
     
-    def __init__(self, cache: Cache, identity: NodeIdentity):
+    def __init__(
+        self, 
+        cache: Cache, 
+        identity: NodeIdentity,
+        profile_cache_size: int = 10000
+    ):
         self.cache = cache
         self.dg = nx.DiGraph()
+        self.edge_endpoints = dict()
+        self.profiles = ProfileCache(max_size=profile_cache_size)
+        self.state_providers = dict()
+        self.event_providers = dict()
+        self._node_provides: dict[KoiNetNode, tuple[list[RIDType], list[RIDType]]] = dict()
+        self.neighbor_index = dict()
+        self._edge_keys: dict[KoiNetEdge, list[tuple]] = dict()
+        # edge RIDs between the same nodes, in the order they were added
+        self._endpoint_edges: dict[tuple[KoiNetNode, KoiNetNode], list[KoiNetEdge]] = dict()
         self.identity = identity
+        self.lock = threading.RLock()
         
     def generate(self):
-        """Generates directed graph from cached KOI nodes and edges."""
-        logger.debug("Generating network graph")
-        self.dg.clear()
-        for rid in self.cache.list_rids():
-            if type(rid) == KoiNetNode:                
-                self.dg.add_node(rid)
-                logger.debug(f"Added node {rid}")
-                
+        """Generates directed graph from cached KOI nodes and edges.
+        
+        Reads every node and edge in the cache, only needed on startup or to recover from an inconsistent state. Use `update` to apply single changes."""
+        with self.lock:
+            logger.debug("Generating network graph")
+            self.dg.clear()
+            self.edge_endpoints.clear()
+            self.profiles.clear()
+            self.state_providers.clear()
+            self.event_providers.clear()
+            self._node_provides.clear()
+            self.neighbor_index.clear()
+            self._edge_keys.clear()
+            self._endpoint_edges.clear()
+            for rid in self.cache.list_rids():
+                if type(rid) == KoiNetNode:                
+                    self.add_node(rid)
+                    node_profile = self.get_node_profile(rid)
+                    if node_profile:
+                        self.index_providers(rid, node_profile)
+                    
+                elif type(rid) == KoiNetEdge:
+                    edge_profile = self.get_edge_profile(rid)
+                    if not edge_profile:
+                        logger.warning(f"Failed to load {rid!r}")
+                        continue
+                    self.add_edge(rid, edge_profile)
+            logger.debug("Done")
+        
+    def update(
+        self, 
+        rid: RID, 
+        event_type: EventType, 
+        bundle: Bundle | None = None
+    ):
+        """Applies a single node or edge change to the graph.
+        
+        Called with the normalized event type of a knowledge object after it was written to (`NEW`, `UPDATE`) or deleted from (`FORGET`) the cache. Profiles are read from the provided bundle instead of the cache, and the profile cache is updated to match. RIDs that aren't KOI nodes or edges are ignored.
+        """
+        with self.lock:
+            if type(rid) not in (KoiNetNode, KoiNetEdge):
+                return
+            
+            self.profiles.invalidate(rid)
+            
+            if type(rid) == KoiNetNode:
+                if event_type in (EventType.NEW, EventType.UPDATE):
+                    if bundle:
+                        node_profile = bundle.validate_contents(NodeProfile)
+                        self.profiles.set(rid, node_profile)
+                    else:
+                        node_profile = self.get_node_profile(rid)
+                    self.add_node(rid)
+                    
+                    if node_profile:
+                        self.index_providers(rid, node_profile)
+                    else:
+                        self.unindex_providers(rid)
+                    
+                elif event_type == EventType.FORGET:
+                    self.unindex_providers(rid)
+                    self.remove_node(rid)
+            
             elif type(rid) == KoiNetEdge:
-                edge_profile = self.get_edge_profile(rid)
-                if not edge_profile:
-                    logger.warning(f"Failed to load {rid!r}")
-                    continue
-                self.dg.add_edge(edge_profile.source, edge_profile.target, rid=rid)
-                logger.debug(f"Added edge {rid} ({edge_profile.source} -> {edge_profile.target})")
-        logger.debug("Done")
+                if event_type in (EventType.NEW, EventType.UPDATE):
+                    if bundle:
+                        edge_profile = bundle.validate_contents(EdgeProfile)
+                        self.profiles.set(rid, edge_profile)
+                    else:
+                        edge_profile = self.get_edge_profile(rid)
+                    
+                    if not edge_profile:
+                        logger.warning(f"Failed to load {rid!r}")
+                        return
+                    self.add_edge(rid, edge_profile)
+                    
+                elif event_type == EventType.FORGET:
+                    self.remove_edge(rid)
+                
+    def add_node(self, rid: KoiNetNode):
+        """Adds a node to the graph (no-op if already present)."""
+        with self.lock:
+            self.dg.add_node(rid)
+            logger.debug(f"Added node {rid}")
         
+    def remove_node(self, rid: KoiNetNode):
+        """Removes a node from the graph.
+        
+        Nodes which are still part of a cached edge are kept until the edge is removed, matching the graph produced by `generate`."""
+        with self.lock:
+            if rid not in self.dg:
+                return
+            if self.dg.degree(rid) > 0:
+                logger.debug(f"Node {rid} is still part of an edge, keeping in graph")
+                return
+            self.dg.remove_node(rid)
+            logger.debug(f"Removed node {rid}")
+        
+    def index_providers(self, rid: KoiNetNode, node_profile: NodeProfile):
+        """Adds or updates a node in the state and event provider indices."""
+        with self.lock:
+            self.unindex_providers(rid)
+            
+            state_types = []
+            if node_profile.node_type == NodeType.FULL:
+                state_types = list(node_profile.provides.state)
+            event_types = list(node_profile.provides.event)
+            
+            for rid_type in state_types:
+                self.state_providers.setdefault(rid_type, set()).add(rid)
+            for rid_type in event_types:
+                self.event_providers.setdefault(rid_type, set()).add(rid)
+            self._node_provides[rid] = (state_types, event_types)
+    
+    def unindex_providers(self, rid: KoiNetNode):
+        """Removes a node from the state and event provider indices (no-op if not present)."""
+        with self.lock:
+            state_types, event_types = self._node_provides.pop(rid, ([], []))
+            for index, rid_types in (
+                (self.state_providers, state_types),
+                (self.event_providers, event_types)
+            ):
+                for rid_type in rid_types:
+                    providers = index.get(rid_type)
+                    if providers is None: continue
+                    providers.discard(rid)
+                    if not providers:
+                        del index[rid_type]
+    
+    def get_state_providers(self, rid_type: RIDType) -> list[KoiNetNode]:
+        """Returns `FULL` nodes which provide state for the specified RID type."""
+        with self.lock:
+            return list(self.state_providers.get(rid_type, ()))
+    
+    def get_event_providers(self, rid_type: RIDType) -> list[KoiNetNode]:
+        """Returns nodes which provide events for the specified RID type."""
+        with self.lock:
+            return list(self.event_providers.get(rid_type, ()))
+    
+    def add_edge(self, rid: KoiNetEdge, edge_profile: EdgeProfile):
+        """Adds or updates an edge in the graph."""
+        with self.lock:
+            endpoints = (edge_profile.source, edge_profile.target)
+            
+            # edge was previously stored under different nodes
+            prev_endpoints = self.edge_endpoints.get(rid)
+            if prev_endpoints and prev_endpoints != endpoints:
+                self.remove_edge(rid)
+            
+            # replaces another edge RID between the same nodes
+            prev_rid = self._edge_rid(*endpoints)
+            if prev_rid and prev_rid != rid:
+                self._unindex_neighbor(prev_rid)
+            
+            rids = self._endpoint_edges.setdefault(endpoints, [])
+            if rid in rids:
+                rids.remove(rid)
+            rids.append(rid)
+            
+            self.dg.add_edge(*endpoints, rid=rid)
+            self.edge_endpoints[rid] = endpoints
+            self._index_neighbor(rid, edge_profile)
+            logger.debug(f"Added edge {rid} ({edge_profile.source} -> {edge_profile.target})")
+        
+    def remove_edge(self, rid: KoiNetEdge):
+        """Removes an edge from the graph, restoring the previous edge RID between the same nodes if there is one."""
+        with self.lock:
+            endpoints = self.edge_endpoints.pop(rid, None)
+            if not endpoints:
+                return
+            
+            self._unindex_neighbor(rid)
+            rids = self._endpoint_edges.get(endpoints, [])
+            if rid in rids:
+                rids.remove(rid)
+            if not rids:
+                self._endpoint_edges.pop(endpoints, None)
+            
+            logger.debug(f"Removed edge {rid}")
+            if self._edge_rid(*endpoints) != rid:
+                return
+            self.dg.remove_edge(*endpoints)
+            
+            for prev_rid in reversed(rids):
+                edge_profile = self.get_edge_profile(prev_rid)
+                if edge_profile:
+                    self.dg.add_edge(*endpoints, rid=prev_rid)
+                    self._index_neighbor(prev_rid, edge_profile)
+                    logger.debug(f"Restored edge {prev_rid}")
+                    break
+            
+            for node_rid in endpoints:
+                self._remove_if_orphaned(node_rid)
+    
+    def _remove_if_orphaned(self, rid: KoiNetNode):
+        """Removes a node without edges which isn't cached (other than this node), matching the graph produced by `generate`."""
+        if (
+            rid != self.identity.rid and
+            rid in self.dg and
+            self.dg.degree(rid) == 0 and
+            not self.cache.exists(rid)
+        ):
+            self.dg.remove_node(rid)
+            logger.debug(f"Removed node {rid}")
+    
+    def _edge_rid(self, source: KoiNetNode, target: KoiNetNode) -> KoiNetEdge | None:
+        """Returns the RID of the edge between two nodes in the graph."""
+        edge_data = self.dg.get_edge_data(source, target)
+        return edge_data.get("rid") if edge_data else None
+        
+    def _index_neighbor(self, rid: KoiNetEdge, edge_profile: EdgeProfile):
+        """Adds or updates an edge in the neighbor index, if this node is one of its endpoints.
+        
+        The edge is stored under every combination of its direction, status, and RID types with `None` (any), matching the filters of `get_neighbors`."""
+        self._unindex_neighbor(rid)
+        
+        if edge_profile.target == self.identity.rid:
+            direction, neighbor = "in", edge_profile.source
+        elif edge_profile.source == self.identity.rid:
+            direction, neighbor = "out", edge_profile.target
+        else:
+            return
+        
+        keys = [
+            (d, s, t)
+            for d in (direction, None)
+            for s in (edge_profile.status, None)
+            for t in (*edge_profile.rid_types, None)
+        ]
+        for key in keys:
+            self.neighbor_index.setdefault(key, dict())[rid] = neighbor
+        self._edge_keys[rid] = keys
+    
+    def _unindex_neighbor(self, rid: KoiNetEdge):
+        for key in self._edge_keys.pop(rid, []):
+            edges = self.neighbor_index.get(key)
+            if edges is None: continue
+            edges.pop(rid, None)
+            if not edges:
+                del self.neighbor_index[key]
+    
     def get_node_profile(self, rid: KoiNetNode) -> NodeProfile | None:
         """Returns node profile given its RID."""
-        bundle = self.cache.read(rid)
-        if bundle:
-            return bundle.validate_contents(NodeProfile)
+        return self._read_profile(rid, NodeProfile)
         
     def get_edge_profile(
         self, 
@@ -55,17 +306,30 @@ class NetworkGraph:
     ) -> EdgeProfile | None:
         """Returns edge profile given its RID, or source and target node RIDs."""
         if source and target:
-            if (source, target) not in self.dg.edges: return
-            edge_data = self.dg.get_edge_data(source, target)
+            with self.lock:
+                edge_data = self.dg.get_edge_data(source, target)
             if not edge_data: return
             rid = edge_data.get("rid")
             if not rid: return
         elif not rid:
             raise ValueError("Either 'rid' or 'source' and 'target' must be provided")
         
-        bundle = self.cache.read(rid)
-        if bundle:
-            return bundle.validate_contents(EdgeProfile)
+        return self._read_profile(rid, EdgeProfile)
+    
+    def _read_profile(self, rid: RID, profile_type: type[Profile]) -> Profile | None:
+        """Returns a profile from the profile cache, reading it from the cache on a miss.
+        
+        Misses are filled under `lock`, so a profile read before `update` can't replace the one it stored."""
+        profile = self.profiles.get(rid)
+        if profile:
+            return profile
+        
+        with self.lock:
+            bundle = self.cache.read(rid)
+            if bundle:
+                profile = bundle.validate_contents(profile_type)
+                self.profiles.set(rid, profile)
+                return profile
         
     def get_edges(
         self,
@@ -74,25 +338,25 @@ class NetworkGraph:
         """Returns edges this node belongs to.
         
         All edges returned by default, specify `direction` to restrict to incoming or outgoing edges only."""
-                
-        edges = []
-        if direction != "in" and self.dg.out_edges:
-            out_edges = self.dg.out_edges(self.identity.rid)
-            edges.extend([e for e in out_edges])
-                
-        if direction != "out" and self.dg.in_edges:
-            in_edges = self.dg.in_edges(self.identity.rid)
-            edges.extend([e for e in in_edges])
+        with self.lock:
+            edges = []
+            if direction != "in" and self.dg.out_edges:
+                out_edges = self.dg.out_edges(self.identity.rid)
+                edges.extend([e for e in out_edges])
                     
-        edge_rids = []
-        for edge in edges:
-            edge_data = self.dg.get_edge_data(*edge)
-            if not edge_data: continue
-            edge_rid = edge_data.get("rid")
-            if not edge_rid: continue
-            edge_rids.append(edge_rid)
-       
-        return edge_rids
+            if direction != "out" and self.dg.in_edges:
+                in_edges = self.dg.in_edges(self.identity.rid)
+                edges.extend([e for e in in_edges])
+                        
+            edge_rids = []
+            for edge in edges:
+                edge_data = self.dg.get_edge_data(*edge)
+                if not edge_data: continue
+                edge_rid = edge_data.get("rid")
+                if not edge_rid: continue
+                edge_rids.append(edge_rid)
+           
+            return edge_rids
     
     def get_neighbors(
         self,
@@ -102,26 +366,8 @@ class NetworkGraph:
     ) -> list[KoiNetNode]:
         """Returns neighboring nodes this node shares an edge with.
         
-        All neighboring nodes returned by default, specify `direction` to restrict to neighbors connected by incoming or outgoing edges only."""
-        
-        neighbors = []
-        for edge_rid in self.get_edges(direction):
-            edge_profile = self.get_edge_profile(edge_rid)
-            
-            if not edge_profile: 
-                logger.warning(f"Failed to find edge {edge_rid!r} in cache")
-                continue
-                        
-            if status and edge_profile.status != status:
-                continue
-            
-            if allowed_type and allowed_type not in edge_profile.rid_types:
-                continue
-            
-            if edge_profile.target == self.identity.rid:
-                neighbors.append(edge_profile.source)
-            elif edge_profile.source == self.identity.rid:
-                neighbors.append(edge_profile.target)
-                
-        return list(neighbors)
+        All neighboring nodes returned by default, specify `direction` to restrict to neighbors connected by incoming or outgoing edges only, `status` to restrict to edges with that status, and `allowed_type` to edges including that RID type. Looked up in the neighbor index, without reading edge profiles."""
         
+        with self.lock:
+            edges = self.neighbor_index.get((direction, status, allowed_type))
+            return list(edges.values()) if edges else []
@@ -1,19 +1,34 @@
+import asyncio
 import logging
-from queue import Queue
-from typing import Generic
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Generator, Generic
 import httpx
 from pydantic import BaseModel
 from rid_lib import RID
 from rid_lib.core import RIDType
 from rid_lib.ext import Cache
+from rid_lib.ext.utils import b64_encode, b64_decode
 from rid_lib.types import KoiNetNode
 
 from .graph import NetworkGraph
 from .request_handler import RequestHandler
+from .async_request_handler import AsyncRequestHandler
 from .response_handler import ResponseHandler
+from .provider_stats import ProviderStats
+from .event_queue import NodeEventQueue, MemoryEventQueue, DurableEventQueue, EventCoalescer
+from .webhook_dispatcher import WebhookDispatcher
+from .circuit_breaker import CircuitBreaker
 from ..protocol.node import NodeType
 from ..protocol.edge import EdgeType
 from ..protocol.event import Event
+from ..protocol.api_models import PollEvents, EventsPayload
+from ..protocol.codec import JSONCodec, MsgpackCodec, get_codec, get_msgpack_codec
+from ..storage import ChangeLog
 from ..identity import NodeIdentity
 from ..config import ConfigType
 
@@ -24,7 +39,10 @@ class EventQueueModel(BaseModel):
     webhook: dict[KoiNetNode, list[Event]]
     poll: dict[KoiNetNode, list[Event]]
 
-type EventQueue = dict[RID, Queue[Event]]
+type EventQueue = dict[KoiNetNode, NodeEventQueue]
+
+class SyncWatermarksModel(BaseModel):
+    watermarks: dict[KoiNetNode, str]
 
 class NetworkInterface(Generic[ConfigType]):
     """A collection of functions and classes to interact with the KOI network."""
@@ -34,9 +52,19 @@ class NetworkInterface(Generic[ConfigType]):
     cache: Cache
     graph: NetworkGraph
     request_handler: RequestHandler
+    async_request_handler: AsyncRequestHandler
     response_handler: ResponseHandler
+    codec: JSONCodec
+    msgpack_codec: MsgpackCodec | None
+    change_log: ChangeLog
+    sync_watermarks: dict[KoiNetNode, str]
+    provider_stats: ProviderStats
     poll_event_queue: EventQueue
     webhook_event_queue: EventQueue
+    poll_cursors: dict[KoiNetNode | str, str]
+    coalescer: EventCoalescer
+    webhook_dispatcher: WebhookDispatcher | None = None
+    circuit_breaker: CircuitBreaker
     
     def __init__(
         self, 
@@ -47,43 +75,151 @@ class NetworkInterface(Generic[ConfigType]):
         self.config = config
         self.identity = identity
         self.cache = cache
-        self.graph = NetworkGraph(cache, identity)
-        self.request_handler = RequestHandler(cache, self.graph)
-        self.response_handler = ResponseHandler(cache)
+        self.graph = NetworkGraph(
+            cache, identity, 
+            profile_cache_size=config.koi_net.profile_cache_size
+        )
+        self.codec = get_codec(config.koi_net.json_codec)
+        self.msgpack_codec = get_msgpack_codec()
+        if config.koi_net.http_client.msgpack and not self.msgpack_codec:
+            logger.warning("MessagePack requires the 'msgspec' package, falling back to JSON")
+        client_msgpack_codec = self.msgpack_codec if config.koi_net.http_client.msgpack else None
+        
+        self.request_handler = RequestHandler(
+            cache, self.graph, 
+            client_config=config.koi_net.http_client,
+            codec=self.codec,
+            msgpack_codec=client_msgpack_codec
+        )
+        self.async_request_handler = AsyncRequestHandler(
+            cache, self.graph,
+            client_config=config.koi_net.http_client,
+            codec=self.codec,
+            msgpack_codec=client_msgpack_codec
+        )
+        self.change_log = ChangeLog(max_entries=config.koi_net.change_log_size)
+        self.response_handler = ResponseHandler(
+            cache, change_log=self.change_log, codec=self.codec)
+        self.sync_watermarks = dict()
+        self.provider_stats = ProviderStats()
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=config.koi_net.http_client.max_concurrent_requests,
+            thread_name_prefix="koi-net-fetch"
+        )
+        self._webhook_locks: dict[KoiNetNode, threading.Lock] = dict()
+        self._async_webhook_locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[KoiNetNode, asyncio.Lock]] = weakref.WeakKeyDictionary()
+        self._queues_lock = threading.Lock()
         
         self.poll_event_queue = dict()
         self.webhook_event_queue = dict()
+        self.poll_cursors = dict()
+        self.coalescer = EventCoalescer()
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.koi_net.peer_retry.failure_threshold,
+            base_delay=config.koi_net.peer_retry.base_delay,
+            max_delay=config.koi_net.peer_retry.max_delay,
+            jitter=config.koi_net.peer_retry.jitter
+        )
+        
+        if config.koi_net.webhook_flush_interval is not None:
+            self.webhook_dispatcher = WebhookDispatcher(
+                network=self,
+                max_latency=config.koi_net.webhook_flush_interval,
+                batch_size=config.koi_net.webhook_batch_size
+            )
+        
         self._load_event_queues()
+        self._load_sync_watermarks()
+    
+    def _get_queue(self, event_queue: EventQueue, node: KoiNetNode) -> NodeEventQueue:
+        """Returns a node's queue, creating it if it doesn't exist.
+        
+        Queues are durable event logs if `event_log.path` is set, otherwise they are held in memory.
+        """
+        queue = event_queue.get(node)
+        if queue is not None:
+            return queue
+        
+        with self._queues_lock:
+            if node in event_queue:
+                return event_queue[node]
+            
+            log_config = self.config.koi_net.event_log
+            if log_config.path:
+                name = "webhook" if event_queue is self.webhook_event_queue else "poll"
+                queue = DurableEventQueue(
+                    directory=os.path.join(log_config.path, name, b64_encode(str(node))),
+                    segment_size=log_config.segment_size,
+                    fsync_batch=log_config.fsync_batch,
+                    fsync_interval=log_config.fsync_interval,
+                    codec=self.codec
+                )
+            else:
+                queue = MemoryEventQueue()
+            
+            event_queue[node] = queue
+            return queue
     
     def _load_event_queues(self):
-        """Loads event queues from storage."""
+        """Loads event queues from storage.
+        
+        Opens existing event logs if `event_log.path` is set, moving any events saved to `event_queues_path` into them.
+        """
+        log_config = self.config.koi_net.event_log
+        if log_config.path:
+            for name, event_queue in (
+                ("poll", self.poll_event_queue),
+                ("webhook", self.webhook_event_queue)
+            ):
+                directory = os.path.join(log_config.path, name)
+                if not os.path.isdir(directory):
+                    continue
+                for entry in os.listdir(directory):
+                    node = RID.from_string(b64_decode(entry))
+                    self._get_queue(event_queue, node)
+        
         try:
-            with open(self.config.koi_net.event_queues_path, "r") as f:
-                queues = EventQueueModel.model_validate_json(f.read())
+            with open(self.config.koi_net.event_queues_path, "rb") as f:
+                queues = self.codec.decode_memoized(f.read(), EventQueueModel)
             
-            for node in queues.poll.keys():
-                for event in queues.poll[node]:
-                    queue = self.poll_event_queue.setdefault(node, Queue())
-                    queue.put(event)
+            for event_queue, saved in (
+                (self.poll_event_queue, queues.poll),
+                (self.webhook_event_queue, queues.webhook)
+            ):
+                for node, events in saved.items():
+                    queue = self._get_queue(event_queue, node)
+                    for event in events:
+                        queue.put(event)
+                    # saved events may have been sent before the restart
+                    queue.mark_sent(queue.end)
             
-            for node in queues.webhook.keys():
-                for event in queues.webhook[node]:
-                    queue = self.webhook_event_queue.setdefault(node, Queue())
-                    queue.put(event)
+            if log_config.path:
+                os.remove(self.config.koi_net.event_queues_path)
                                 
         except FileNotFoundError:
             return
         
     def _save_event_queues(self):
-        """Writes event queues to storage."""
-        events_model = EventQueueModel(
+        """Writes event queues to storage.
+        
+        Event logs are already on disk and are only synced and closed.
+        """
+        if self.config.koi_net.event_log.path:
+            for event_queue in (self.poll_event_queue, self.webhook_event_queue):
+                for queue in event_queue.values():
+                    queue.close()
+            return
+        
+        # queued events are already validated
+        events_model = EventQueueModel.model_construct(
             poll={
-                node: list(queue.queue) 
+                node: queue.read() 
                 for node, queue in self.poll_event_queue.items()
                 if not queue.empty()
             },
             webhook={
-                node: list(queue.queue) 
+                node: queue.read() 
                 for node, queue in self.webhook_event_queue.items()
                 if not queue.empty()
             }
@@ -92,13 +228,32 @@ class NetworkInterface(Generic[ConfigType]):
         if len(events_model.poll) == 0 and len(events_model.webhook) == 0:
             return
         
-        with open(self.config.koi_net.event_queues_path, "w") as f:
-            f.write(events_model.model_dump_json(indent=2))
+        with open(self.config.koi_net.event_queues_path, "wb") as f:
+            f.write(self.codec.encode(events_model, indent=2))
+    
+    def _load_sync_watermarks(self):
+        """Loads the change log watermarks of nodes this node has caught up with from storage."""
+        if not self.config.koi_net.sync_watermarks_path:
+            return
+        try:
+            with open(self.config.koi_net.sync_watermarks_path, "r") as f:
+                model = SyncWatermarksModel.model_validate_json(f.read())
+            self.sync_watermarks.update(model.watermarks)
+        except FileNotFoundError:
+            return
+    
+    def _save_sync_watermarks(self):
+        """Writes the change log watermarks of nodes this node has caught up with to storage."""
+        if not self.config.koi_net.sync_watermarks_path or not self.sync_watermarks:
+            return
+        with open(self.config.koi_net.sync_watermarks_path, "w") as f:
+            f.write(SyncWatermarksModel(
+                watermarks=self.sync_watermarks).model_dump_json(indent=2))
     
     def push_event_to(self, event: Event, node: KoiNetNode, flush=False):
         """Pushes event to queue of specified node.
         
-        Event will be sent to webhook or poll queue depending on the node type and edge type of the specified node. If `flush` is set to `True`, the webhook queued will be flushed after pushing the event.
+        Event will be sent to webhook or poll queue depending on the node type and edge type of the specified node. If `flush` is set to `True`, the webhook queued will be flushed after pushing the event. Otherwise (or if flushing fails), if the webhook dispatcher is enabled, it will flush the queue once a batch is ready.
         """
         logger.debug(f"Pushing event {event.event_type} {event.rid} to {node}")
             
@@ -123,33 +278,101 @@ class NetworkInterface(Generic[ConfigType]):
             elif node_profile.node_type == NodeType.PARTIAL:
                 event_queue = self.poll_event_queue
         
-        queue = event_queue.setdefault(node, Queue())
-        queue.put(event)
+        self._get_queue(event_queue, node).put(event)
                 
-        if flush and event_queue is self.webhook_event_queue:
-            self.flush_webhook_queue(node)
+        if event_queue is self.webhook_event_queue:
+            if flush and self.flush_webhook_queue(node) is not False:
+                return
+            if self.webhook_dispatcher:
+                # schedules the batch, or a retry if flushing failed
+                self.webhook_dispatcher.notify(node)
             
-    def _flush_queue(self, event_queue: EventQueue, node: KoiNetNode) -> list[Event]:
-        """Flushes a node's queue, returning list of events."""
+    def _batch_limit(self, limit: int = 0) -> int:
+        """Returns requested batch size capped at `event_log.max_batch_size` (`0` for no preference)."""
+        max_batch_size = self.config.koi_net.event_log.max_batch_size
+        return min(limit, max_batch_size) if limit > 0 else max_batch_size
+    
+    def _flush_queue(self, event_queue: EventQueue, node: KoiNetNode, limit: int = 0) -> list[Event]:
+        """Flushes up to `limit` events from a node's queue, returning list of events."""
         queue = event_queue.get(node)
         events = list()
         if queue:
-            while not queue.empty():
-                event = queue.get()
+            start = queue.acked
+            events = queue.pop(limit=self._batch_limit(limit))
+            events = self._coalesce(events, delivered=queue.sent - start)
+            for event in events:
                 logger.debug(f"Dequeued {event.event_type} '{event.rid}'")
-                events.append(event)
         
         return events
     
-    def flush_poll_queue(self, node: KoiNetNode) -> list[Event]:
-        """Flushes a node's poll queue, returning list of events."""
+    def flush_poll_queue(self, node: KoiNetNode, limit: int = 0) -> list[Event]:
+        """Flushes up to `limit` events from a node's poll queue, returning list of events.
+        
+        Events are removed before they are delivered, see `handle_poll` for acknowledged polling.
+        """
         logger.debug(f"Flushing poll queue for {node}")
-        return self._flush_queue(self.poll_event_queue, node)
+        return self._flush_queue(self.poll_event_queue, node, limit)
     
-    def flush_webhook_queue(self, node: KoiNetNode):
-        """Flushes a node's webhook queue, and broadcasts events.
+    def handle_poll(self, req: PollEvents) -> EventsPayload:
+        """Responds to a poll request from a node.
+        
+        Requests without a cursor flush the poll queue (see `flush_poll_queue`). Otherwise events before the cursor are acknowledged, and up to `limit` events after it are returned with the next cursor. Unacknowledged events are returned again by the next poll.
+        """
+        if req.cursor is None:
+            return EventsPayload(events=self.flush_poll_queue(req.rid, req.limit))
+        
+        queue = self.poll_event_queue.get(req.rid)
+        if queue is None:
+            return EventsPayload(events=[], next_cursor=req.cursor)
+        
+        epoch, _, offset = req.cursor.partition(":")
+        if epoch == queue.epoch and offset.isdigit():
+            queue.ack(int(offset))
+        
+        start = queue.acked
+        events = queue.read(start, limit=self._batch_limit(req.limit))
+        end = start + len(events)
+        events = self._coalesce(events, delivered=queue.sent - start)
+        queue.mark_sent(end)
+        logger.debug(f"Returning {len(events)} events from poll queue of {req.rid}")
         
-        If node profile is unknown, or node type is not `FULL`, this operation will fail silently. If the remote node cannot be reached, all events will be requeued.
+        return EventsPayload(
+            events=events,
+            next_cursor=f"{queue.epoch}:{end}"
+        )
+    
+    def _poll_request(self, target: KoiNetNode | str) -> PollEvents:
+        """Builds a poll request continuing from the last cursor received from `target` (node RID or URL)."""
+        return PollEvents(
+            rid=self.identity.rid,
+            limit=self.config.koi_net.event_log.max_batch_size,
+            cursor=self.poll_cursors.get(target, "")
+        )
+    
+    def _update_poll_cursor(self, target: KoiNetNode | str, payload: EventsPayload):
+        if payload.next_cursor is not None:
+            self.poll_cursors[target] = payload.next_cursor
+    
+    def _coalesce(self, events: list[Event], delivered: int = 0) -> list[Event]:
+        """Coalesces a batch of outbound events if `event_log.coalesce` is enabled, see `EventCoalescer.coalesce`."""
+        if not self.config.koi_net.event_log.coalesce:
+            return events
+        return self.coalescer.coalesce(events, delivered)
+    
+    def _next_batch(self, queue: NodeEventQueue) -> tuple[int, list[Event]]:
+        """Reads the next batch of events to deliver, returning the offset to acknowledge once delivered and the (coalesced) events."""
+        start = queue.acked
+        events = queue.read(start, limit=self.config.koi_net.event_log.max_batch_size)
+        end = start + len(events)
+        # retried events may have been received even though the broadcast failed
+        events = self._coalesce(events, delivered=queue.sent - start)
+        queue.mark_sent(end)
+        return end, events
+    
+    def _flush_webhook_batches(self, node: KoiNetNode) -> Generator[list[Event], None, bool | None]:
+        """Flushes a node's webhook queue, yielding each batch of events for the caller to send.
+        
+        HTTP errors sending a batch are thrown back into the generator. Returns the result of the flush.
         """
         
         logger.debug(f"Flushing webhook queue for {node}")
@@ -164,49 +387,144 @@ class NetworkInterface(Generic[ConfigType]):
             logger.warning(f"{node!r} is a partial node!")
             return
         
-        events = self._flush_queue(self.webhook_event_queue, node)
-        if not events: return
+        queue = self.webhook_event_queue.get(node)
+        if not queue: return
         
-        logger.debug(f"Broadcasting {len(events)} events")
+        if not self.circuit_breaker.allow(node):
+            logger.debug(f"Skipping unreachable {node!r}, retrying in {self.circuit_breaker.retry_in(node):.1f}s")
+            return False
         
-        try:  
-            self.request_handler.broadcast_events(node, events=events)
+        # the outcome is always recorded, a circuit left half-open would never be probed again
+        delivered = False
+        try:
+            while not queue.empty():
+                ack_offset, events = self._next_batch(queue)
+                
+                # batch may be empty if all events cancelled out
+                if events:
+                    logger.debug(f"Broadcasting {len(events)} events")
+                    try:
+                        yield events
+                    except httpx.HTTPError as e:
+                        logger.warning(f"Broadcast failed: {e!r}")
+                        return False
+                
+                queue.ack(ack_offset)
+            
+            delivered = True
             return True
-        except httpx.ConnectError:
-            logger.warning("Broadcast failed")
-            for event in events:
-                self.push_event_to(event, node)
-            return False
+        finally:
+            if delivered:
+                self.circuit_breaker.record_success(node)
+            else:
+                self.circuit_breaker.record_failure(node)
+    
+    def flush_webhook_queue(self, node: KoiNetNode):
+        """Flushes a node's webhook queue, and broadcasts events.
+        
+        If node profile is unknown, or node type is not `FULL`, this operation will fail silently. Events stay queued until delivered. Returns `False` if the remote node cannot be reached, or its circuit is open (see `circuit_breaker`).
+        """
+        
+        with self._webhook_locks.setdefault(node, threading.Lock()):
+            flush = self._flush_webhook_batches(node)
+            try:
+                events = next(flush)
+                while True:
+                    try:
+                        self.request_handler.broadcast_events(node, events=events)
+                    except httpx.HTTPError as e:
+                        events = flush.throw(e)
+                    else:
+                        events = next(flush)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                # records the failure if anything else was raised
+                flush.close()
             
     def get_state_providers(self, rid_type: RIDType) -> list[KoiNetNode]:
-        """Returns list of node RIDs which provide state for the specified RID type."""
+        """Returns list of node RIDs which provide state for the specified RID type.
+        
+        Looked up in the network graph's provider index, see `NetworkGraph.get_state_providers`."""
         
         logger.debug(f"Looking for state providers of '{rid_type}'")
-        provider_nodes = []
-        for node_rid in self.cache.list_rids(rid_types=[KoiNetNode]):
-            node = self.graph.get_node_profile(node_rid)
-                        
-            if node.node_type == NodeType.FULL and rid_type in node.provides.state:
-                logger.debug(f"Found provider '{node_rid}'")
-                provider_nodes.append(node_rid)
+        provider_nodes = self.graph.get_state_providers(rid_type)
         
         if not provider_nodes:
             logger.debug("Failed to find providers")
         return provider_nodes
+    
+    def get_event_providers(self, rid_type: RIDType) -> list[KoiNetNode]:
+        """Returns list of node RIDs which provide events for the specified RID type."""
+        return self.graph.get_event_providers(rid_type)
+            
+    def _timed_fetch(self, fetch_from_node, node_rid: KoiNetNode):
+        """Calls a fetch function for a provider, recording its outcome in `provider_stats`."""
+        start = time.monotonic()
+        try:
+            result = fetch_from_node(node_rid)
+        except httpx.HTTPError as e:
+            logger.debug(f"Failed to fetch from '{node_rid}': {e!r}")
+            self.provider_stats.record_failure(node_rid)
+            return
+        
+        self.provider_stats.record_success(node_rid, time.monotonic() - start)
+        return result
+    
+    def _fetch_from_providers(self, rid: RID, fetch_from_node):
+        """Queries state providers of an RID, returning the first non-empty result.
+        
+        Providers are tried in order of their `provider_stats` ranking. If `fetch_hedge_delay` is set, the next provider is queried whenever the previous one hasn't responded within the delay (or failed), otherwise providers are queried one at a time. Requests still in flight after a result is found are abandoned.
+        """
+        providers = self.provider_stats.rank(
+            self.get_state_providers(type(rid)))
+        hedge_delay = self.config.koi_net.fetch_hedge_delay
+        
+        if hedge_delay is None:
+            for node_rid in providers:
+                result = self._timed_fetch(fetch_from_node, node_rid)
+                if result: 
+                    return result
+            return
+        
+        remaining = iter(providers)
+        pending = set()
+        
+        def hedge():
+            node_rid = next(remaining, None)
+            if node_rid is None: return
+            logger.debug(f"Querying provider '{node_rid}'")
+            pending.add(self._fetch_executor.submit(
+                self._timed_fetch, fetch_from_node, node_rid))
+        
+        hedge()
+        while pending:
+            done, pending = wait(
+                pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                result = future.result()
+                if result:
+                    for future in pending:
+                        future.cancel()
+                    return result
+            
+            # no result yet, either timed out or a provider failed
+            hedge()
             
     def fetch_remote_bundle(self, rid: RID):
         """Attempts to fetch a bundle by RID from known peer nodes."""
         
         logger.debug(f"Fetching remote bundle '{rid}'")
-        remote_bundle = None
-        for node_rid in self.get_state_providers(type(rid)):
+        
+        def fetch_from_node(node_rid: KoiNetNode):
             payload = self.request_handler.fetch_bundles(
                 node=node_rid, rids=[rid])
-            
             if payload.bundles:
-                remote_bundle = payload.bundles[0]
                 logger.debug(f"Got bundle from '{node_rid}'")
-                break
+                return payload.bundles[0]
+        
+        remote_bundle = self._fetch_from_providers(rid, fetch_from_node)
         
         if not remote_bundle:
             logger.warning("Failed to fetch remote bundle")
@@ -217,25 +535,25 @@ class NetworkInterface(Generic[ConfigType]):
         """Attempts to fetch a manifest by RID from known peer nodes."""
         
         logger.debug(f"Fetching remote manifest '{rid}'")
-        remote_manifest = None
-        for node_rid in self.get_state_providers(type(rid)):
+        
+        def fetch_from_node(node_rid: KoiNetNode):
             payload = self.request_handler.fetch_manifests(
                 node=node_rid, rids=[rid])
-            
             if payload.manifests:
-                remote_manifest = payload.manifests[0]
-                logger.debug(f"Got bundle from '{node_rid}'")
-                break
+                logger.debug(f"Got manifest from '{node_rid}'")
+                return payload.manifests[0]
+        
+        remote_manifest = self._fetch_from_providers(rid, fetch_from_node)
         
         if not remote_manifest:
-            logger.warning("Failed to fetch remote bundle")
+            logger.warning("Failed to fetch remote manifest")
             
         return remote_manifest
     
     def poll_neighbors(self) -> list[Event]:
         """Polls all neighboring nodes and returns compiled list of events.
         
-        If this node has no neighbors, it will instead attempt to poll the provided first contact URL.
+        If this node has no neighbors, it will instead attempt to poll the provided first contact URL. Each poll acknowledges the previous poll's events with its cursor.
         """
         
         neighbors = self.graph.get_neighbors()
@@ -245,12 +563,13 @@ class NetworkInterface(Generic[ConfigType]):
             try:
                 payload = self.request_handler.poll_events(
                     url=self.config.koi_net.first_contact, 
-                    rid=self.identity.rid
+                    req=self._poll_request(self.config.koi_net.first_contact)
                 )
+                self._update_poll_cursor(self.config.koi_net.first_contact, payload)
                 if payload.events:
                     logger.debug(f"Received {len(payload.events)} events from '{self.config.koi_net.first_contact}'")
                 return payload.events
-            except httpx.ConnectError:
+            except httpx.HTTPError:
                 logger.debug(f"Failed to reach first contact '{self.config.koi_net.first_contact}'")
         
         events = []
@@ -262,15 +581,216 @@ class NetworkInterface(Generic[ConfigType]):
             try:
                 payload = self.request_handler.poll_events(
                     node=node_rid, 
-                    rid=self.identity.rid
+                    req=self._poll_request(node_rid)
                 )
+                self._update_poll_cursor(node_rid, payload)
                 if payload.events:
                     logger.debug(f"Received {len(payload.events)} events from {node_rid!r}")
                 events.extend(payload.events)
-            except httpx.ConnectError:
+            except httpx.HTTPError:
                 logger.debug(f"Failed to reach node '{node_rid}'")
                 continue
             
-        return events                
+        return events
+    
+    @asynccontextmanager
+    async def _webhook_lock_async(self, node: KoiNetNode):
+        """Serializes async flushes of a node's webhook queue with each other and with `flush_webhook_queue`, without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with self._queues_lock:
+            async_lock = self._async_webhook_locks.setdefault(loop, dict()).setdefault(node, asyncio.Lock())
+            lock = self._webhook_locks.setdefault(node, threading.Lock())
+        
+        async with async_lock:
+            if not lock.acquire(blocking=False):
+                acquire = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+                try:
+                    await asyncio.shield(acquire)
+                except asyncio.CancelledError:
+                    # the worker thread still acquires the lock, release it once it does
+                    acquire.add_done_callback(lambda f: f.cancelled() or lock.release())
+                    raise
+            try:
+                yield
+            finally:
+                lock.release()
+    
+    async def flush_webhook_queue_async(self, node: KoiNetNode):
+        """Async variant of `flush_webhook_queue`, serialized with other flushes of the same node's queue."""
+        
+        async with self._webhook_lock_async(node):
+            flush = self._flush_webhook_batches(node)
+            try:
+                events = next(flush)
+                while True:
+                    try:
+                        await self.async_request_handler.broadcast_events(node, events=events)
+                    except httpx.HTTPError as e:
+                        events = flush.throw(e)
+                    else:
+                        events = next(flush)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                # records the failure if anything else was raised
+                flush.close()
+    
+    async def flush_webhook_queues_async(
+        self, 
+        nodes: list[KoiNetNode] | None = None
+    ) -> dict[KoiNetNode, bool | None]:
+        """Concurrently flushes the webhook queues of the provided nodes (all queued nodes by default).
+        
+        Returns the result of `flush_webhook_queue_async` for each node.
+        """
+        if nodes is None:
+            nodes = [
+                node for node, queue in self.webhook_event_queue.items()
+                if not queue.empty()
+            ]
         
-        
\ No newline at end of file
+        results = await asyncio.gather(*(
+            self.flush_webhook_queue_async(node) for node in nodes
+        ))
+        return dict(zip(nodes, results))
+    
+    async def _timed_fetch_async(self, fetch_from_node, node_rid: KoiNetNode):
+        """Async variant of `_timed_fetch`."""
+        start = time.monotonic()
+        try:
+            result = await fetch_from_node(node_rid)
+        except httpx.HTTPError as e:
+            logger.debug(f"Failed to fetch from '{node_rid}': {e!r}")
+            self.provider_stats.record_failure(node_rid)
+            return
+        
+        self.provider_stats.record_success(node_rid, time.monotonic() - start)
+        return result
+    
+    async def _fetch_from_providers_async(self, rid: RID, fetch_from_node):
+        """Async variant of `_fetch_from_providers`.
+        
+        If `fetch_hedge_delay` isn't set, all providers are queried at once. Remaining requests are cancelled once a result is found.
+        """
+        providers = self.provider_stats.rank(
+            self.get_state_providers(type(rid)))
+        hedge_delay = self.config.koi_net.fetch_hedge_delay
+        
+        remaining = iter(providers)
+        pending = set()
+        
+        def hedge():
+            node_rid = next(remaining, None)
+            if node_rid is None: return
+            logger.debug(f"Querying provider '{node_rid}'")
+            pending.add(asyncio.create_task(
+                self._timed_fetch_async(fetch_from_node, node_rid)))
+        
+        if hedge_delay is None:
+            for _ in providers:
+                hedge()
+        else:
+            hedge()
+        try:
+            while pending:
+                # without a hedge delay, waits for the next request to finish
+                done, pending = await asyncio.wait(
+                    pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+                
+                hedge()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+    async def fetch_remote_bundle_async(self, rid: RID):
+        """Async variant of `fetch_remote_bundle`."""
+        
+        logger.debug(f"Fetching remote bundle '{rid}'")
+        
+        async def fetch_from_node(node_rid: KoiNetNode):
+            payload = await self.async_request_handler.fetch_bundles(
+                node=node_rid, rids=[rid])
+            if payload.bundles:
+                logger.debug(f"Got bundle from '{node_rid}'")
+                return payload.bundles[0]
+        
+        remote_bundle = await self._fetch_from_providers_async(rid, fetch_from_node)
+        
+        if not remote_bundle:
+            logger.warning("Failed to fetch remote bundle")
+            
+        return remote_bundle
+    
+    async def fetch_remote_manifest_async(self, rid: RID):
+        """Async variant of `fetch_remote_manifest`."""
+        
+        logger.debug(f"Fetching remote manifest '{rid}'")
+        
+        async def fetch_from_node(node_rid: KoiNetNode):
+            payload = await self.async_request_handler.fetch_manifests(
+                node=node_rid, rids=[rid])
+            if payload.manifests:
+                logger.debug(f"Got manifest from '{node_rid}'")
+                return payload.manifests[0]
+        
+        remote_manifest = await self._fetch_from_providers_async(rid, fetch_from_node)
+        
+        if not remote_manifest:
+            logger.warning("Failed to fetch remote manifest")
+            
+        return remote_manifest
+    
+    async def poll_neighbors_async(self) -> list[Event]:
+        """Async variant of `poll_neighbors`, polls all neighbors concurrently."""
+        
+        neighbors = self.graph.get_neighbors()
+        
+        if not neighbors and self.config.koi_net.first_contact:
+            logger.debug("No neighbors found, polling first contact")
+            try:
+                payload = await self.async_request_handler.poll_events(
+                    url=self.config.koi_net.first_contact, 
+                    req=self._poll_request(self.config.koi_net.first_contact)
+                )
+                self._update_poll_cursor(self.config.koi_net.first_contact, payload)
+                if payload.events:
+                    logger.debug(f"Received {len(payload.events)} events from '{self.config.koi_net.first_contact}'")
+                return payload.events
+            except httpx.HTTPError:
+                logger.debug(f"Failed to reach first contact '{self.config.koi_net.first_contact}'")
+        
+        async def poll_node(node_rid: KoiNetNode) -> list[Event]:
+            try:
+                payload = await self.async_request_handler.poll_events(
+                    node=node_rid, 
+                    req=self._poll_request(node_rid)
+                )
+                self._update_poll_cursor(node_rid, payload)
+                if payload.events:
+                    logger.debug(f"Received {len(payload.events)} events from {node_rid!r}")
+                return payload.events
+            except httpx.HTTPError:
+                logger.debug(f"Failed to reach node '{node_rid}'")
+                return []
+        
+        full_neighbors = []
+        for node_rid in neighbors:
+            node = self.graph.get_node_profile(node_rid)
+            if not node: continue
+            if node.node_type != NodeType.FULL: continue
+            full_neighbors.append(node_rid)
+        
+        # results are ordered by neighbor, not by arrival
+        results = await asyncio.gather(*(
+            poll_node(node_rid) for node_rid in full_neighbors
+        ))
+        
+        events = []
+        for node_events in results:
+            events.extend(node_events)
+        return events
@@ -0,0 +1,79 @@
+import logging
+import threading
+from collections import OrderedDict
+from rid_lib import RID
+from ..protocol.edge import EdgeProfile
+from ..protocol.node import NodeProfile
+
+logger = logging.getLogger(__name__)
+
+
+type Profile = NodeProfile | EdgeProfile
+
+class ProfileCache:
+    """Bounded in-memory store of validated node and edge profiles.
+    
+    Profiles are evicted in least recently used order once `max_size` is reached. Cached profiles are shared between callers and should be treated as read-only.
+    """
+    
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._profiles: OrderedDict[RID, Profile] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._profiles)
+    
+    def get(self, rid: RID) -> Profile | None:
+        """Returns cached profile, or `None` on a miss."""
+        with self._lock:
+            profile = self._profiles.get(rid)
+            if profile is None:
+                self.misses += 1
+                return
+            
+            self._profiles.move_to_end(rid)
+            self.hits += 1
+            return profile
+    
+    def set(self, rid: RID, profile: Profile):
+        """Stores a profile, evicting the least recently used one if full."""
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            self._profiles[rid] = profile
+            self._profiles.move_to_end(rid)
+            
+            while len(self._profiles) > self.max_size:
+                evicted_rid, _ = self._profiles.popitem(last=False)
+                self.evictions += 1
+                logger.debug(f"Evicted profile of {evicted_rid!r}")
+    
+    def invalidate(self, rid: RID):
+        """Removes a profile from the cache (no-op if not present)."""
+        with self._lock:
+            self._profiles.pop(rid, None)
+    
+    def clear(self):
+        """Removes all profiles, counters are kept."""
+        with self._lock:
+            self._profiles.clear()
+    
+    def stats(self) -> dict[str, int]:
+        """Returns size, hit, miss, and eviction counters."""
+        return {
+            "size": len(self._profiles),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,57 @@
+import threading
+from dataclasses import dataclass
+from rid_lib.types import KoiNetNode
+
+
+@dataclass
+class ProviderRecord:
+    """Observed request outcomes of a single state provider."""
+    
+    successes: int = 0
+    failures: int = 0
+    latency: float | None = None
+    
+    @property
+    def success_rate(self) -> float:
+        # smoothed so new providers aren't ranked on one sample
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+class ProviderStats:
+    """Tracks latency and success rate of state providers to rank them for fetches.
+    
+    Latency is an exponentially weighted moving average over successful requests, weighted by `alpha`. Providers without samples are assumed to respond in `default_latency` seconds.
+    """
+    
+    alpha: float
+    default_latency: float
+    records: dict[KoiNetNode, ProviderRecord]
+    
+    def __init__(self, alpha: float = 0.2, default_latency: float = 0.1):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.records = dict()
+        self._lock = threading.Lock()
+    
+    def record_success(self, node: KoiNetNode, latency: float):
+        with self._lock:
+            record = self.records.setdefault(node, ProviderRecord())
+            record.successes += 1
+            if record.latency is None:
+                record.latency = latency
+            else:
+                record.latency += self.alpha * (latency - record.latency)
+    
+    def record_failure(self, node: KoiNetNode):
+        with self._lock:
+            record = self.records.setdefault(node, ProviderRecord())
+            record.failures += 1
+    
+    def score(self, node: KoiNetNode) -> float:
+        """Returns expected cost of querying a provider, lower is better."""
+        record = self.records.get(node) or ProviderRecord()
+        latency = record.latency if record.latency is not None else self.default_latency
+        return latency / record.success_rate
+    
+    def rank(self, nodes: list[KoiNetNode]) -> list[KoiNetNode]:
+        """Returns providers sorted from best to worst score."""
+        return sorted(nodes, key=self.score)
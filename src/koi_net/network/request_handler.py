@@ -1,4 +1,6 @@
 import logging
+import importlib.util
+from typing import Iterator
 import httpx
 from rid_lib import RID
 from rid_lib.ext import Cache
@@ -20,39 +22,124 @@ from ..protocol.consts import (
     POLL_EVENTS_PATH,
     FETCH_RIDS_PATH,
     FETCH_MANIFESTS_PATH,
-    FETCH_BUNDLES_PATH
+    FETCH_BUNDLES_PATH,
+    NDJSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE
 )
 from ..protocol.node import NodeType
+from ..protocol.codec import JSONCodec, MsgpackCodec, get_codec
+from ..protocol.compression import compress, negotiate
+from ..config import HTTPClientConfig
 from .graph import NetworkGraph
 
 
 logger = logging.getLogger(__name__)
 
 
-class RequestHandler:
-    """Handles making requests to other KOI nodes."""
+class BaseRequestHandler:
+    """Shared configuration, URL resolution and request body encoding for sync and async request handlers.
+    
+    Request bodies of at least `HTTPClientConfig.compression_threshold` bytes are compressed with the preferred coding a node advertised in the `Accept-Encoding` header of a previous response (RFC 7694), the first request to a node is always sent uncompressed. Compressed responses are decoded by httpx.
+    
+    If `msgpack_codec` is set, requests accept MessagePack responses (preferring them to JSON), and request bodies are encoded as MessagePack to nodes that responded with it before. Responses are decoded according to their `Content-Type`.
+    """
     
     cache: Cache
     graph: NetworkGraph
+    client_config: HTTPClientConfig
+    codec: JSONCodec
+    msgpack_codec: MsgpackCodec | None
+    request_encodings: dict[str, str | None]
+    msgpack_origins: set[str]
     
-    def __init__(self, cache: Cache, graph: NetworkGraph):
+    def __init__(
+        self, 
+        cache: Cache, 
+        graph: NetworkGraph,
+        client_config: HTTPClientConfig | None = None,
+        codec: JSONCodec | None = None,
+        msgpack_codec: MsgpackCodec | None = None
+    ):
         self.cache = cache
         self.graph = graph
-                
-    def make_request(
-        self, 
-        url: str, 
-        request: RequestModels,
-        response_model: type[ResponseModels] | None = None
-    ) -> ResponseModels | None:
-        logger.debug(f"Making request to {url}")
-        resp = httpx.post(
-            url=url,
-            data=request.model_dump_json()
+        self.client_config = client_config or HTTPClientConfig()
+        self.codec = codec or get_codec()
+        self.msgpack_codec = msgpack_codec
+        self.request_encodings = {}
+        self.msgpack_origins = set()
+    
+    def _client_kwargs(self) -> dict:
+        """Builds connection pool and timeout settings for an HTTP client."""
+        config = self.client_config
+        
+        http2 = config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requires the 'h2' package, falling back to HTTP/1.1")
+            http2 = False
+        
+        return dict(
+            timeout=httpx.Timeout(
+                connect=config.connect_timeout,
+                read=config.read_timeout,
+                write=config.write_timeout,
+                pool=config.pool_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            http2=http2
         )
-        if response_model:
-            return response_model.model_validate_json(resp.text)
-            
+    
+    @staticmethod
+    def _origin(url: str) -> str:
+        url = httpx.URL(url)
+        return f"{url.scheme}://{url.netloc.decode()}"
+    
+    def _encode_body(self, url: str, request: RequestModels, negotiated: bool = True) -> tuple[bytes, dict]:
+        """Encodes a request body, returning it with its headers. Unless `negotiated`, the body is plain JSON."""
+        origin = self._origin(url)
+        codec = self.codec
+        if negotiated and self.msgpack_codec and origin in self.msgpack_origins:
+            codec = self.msgpack_codec
+        
+        content = codec.encode(request)
+        headers = {"Content-Type": codec.media_type}
+        if self.msgpack_codec:
+            headers["Accept"] = f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5"
+        
+        threshold = self.client_config.compression_threshold
+        encoding = self.request_encodings.get(origin)
+        if negotiated and encoding and threshold is not None and len(content) >= threshold:
+            content = compress(content, encoding)
+            headers["Content-Encoding"] = encoding
+        return content, headers
+    
+    def _update_negotiation(self, url: str, resp: httpx.Response):
+        """Remembers how to encode requests to a node: the coding to compress them with, from the `Accept-Encoding` header of its response, and whether it responds with MessagePack."""
+        origin = self._origin(url)
+        accept_encoding = resp.headers.get("Accept-Encoding")
+        if accept_encoding is not None:
+            self.request_encodings[origin] = negotiate(accept_encoding)
+        elif resp.status_code == 415:
+            self.request_encodings[origin] = None
+        
+        if resp.status_code == 415:
+            self.msgpack_origins.discard(origin)
+        elif self.msgpack_codec and resp.is_success and self._response_codec(resp) is self.msgpack_codec:
+            self.msgpack_origins.add(origin)
+    
+    def _response_codec(self, resp: httpx.Response) -> JSONCodec:
+        """Returns the codec to decode a response with, from its `Content-Type`."""
+        if self.msgpack_codec and resp.headers.get("Content-Type", "").startswith(MSGPACK_MEDIA_TYPE):
+            return self.msgpack_codec
+        return self.codec
+    
+    @staticmethod
+    def _negotiated(headers: dict) -> bool:
+        return "Content-Encoding" in headers or headers["Content-Type"] == MSGPACK_MEDIA_TYPE
+    
     def get_url(self, node_rid: KoiNetNode, url: str) -> str:
         """Retrieves URL of a node, or returns provided URL."""
         
@@ -69,6 +156,96 @@ class RequestHandler:
             return node_profile.base_url
         else:
             return url
+
+
+class RequestHandler(BaseRequestHandler):
+    """Handles making requests to other KOI nodes.
+    
+    Request bodies are encoded and responses decoded (from bytes) with `codec`.
+    """
+    
+    client: httpx.Client
+    
+    def __init__(
+        self, 
+        cache: Cache, 
+        graph: NetworkGraph,
+        client_config: HTTPClientConfig | None = None,
+        codec: JSONCodec | None = None,
+        msgpack_codec: MsgpackCodec | None = None
+    ):
+        super().__init__(cache, graph, client_config, codec, msgpack_codec)
+        self.client = httpx.Client(**self._client_kwargs())
+    
+    def close(self):
+        """Closes pooled connections, call when shutting down the node."""
+        self.client.close()
+    
+    def _post(
+        self,
+        url: str,
+        request: RequestModels,
+        headers: dict | None = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """Sends a request, retrying it once as plain JSON if the node rejects its compressed or MessagePack body."""
+        content, body_headers = self._encode_body(url, request)
+        resp = self.client.send(
+            self.client.build_request("POST", url, content=content, headers={**body_headers, **(headers or {})}),
+            stream=stream
+        )
+        self._update_negotiation(url, resp)
+        
+        if resp.status_code == 415 and self._negotiated(body_headers):
+            logger.debug(f"{url} rejected request body, retrying as plain JSON")
+            resp.close()
+            content, body_headers = self._encode_body(url, request, negotiated=False)
+            resp = self.client.send(
+                self.client.build_request("POST", url, content=content, headers={**body_headers, **(headers or {})}),
+                stream=stream
+            )
+            self._update_negotiation(url, resp)
+        return resp
+    
+    def make_request(
+        self, 
+        url: str, 
+        request: RequestModels,
+        response_model: type[ResponseModels] | None = None
+    ) -> ResponseModels | None:
+        logger.debug(f"Making request to {url}")
+        resp = self._post(url, request)
+        resp.raise_for_status()
+        if response_model:
+            return self._response_codec(resp).decode(resp.content, response_model)
+    
+    def make_stream_request(
+        self,
+        url: str,
+        request: RequestModels,
+        response_model: type[ResponseModels]
+    ) -> Iterator[ResponseModels]:
+        """Makes a request for an NDJSON streamed response, yielding each payload line as it arrives.
+        
+        Falls back to yielding a single payload if the node responds with a regular JSON response.
+        """
+        logger.debug(f"Making stream request to {url}")
+        resp = self._post(
+            url, request,
+            headers={"Accept": f"{NDJSON_MEDIA_TYPE}, application/json"},
+            stream=True
+        )
+        try:
+            resp.raise_for_status()
+            if not resp.headers.get("Content-Type", "").startswith(NDJSON_MEDIA_TYPE):
+                yield self._response_codec(resp).decode(resp.read(), response_model)
+                return
+            
+            for line in resp.iter_lines():
+                if line:
+                    yield self.codec.decode(line, response_model)
+        finally:
+            resp.close()
     
     def broadcast_events(
         self, 
@@ -83,7 +260,7 @@ class RequestHandler:
             self.get_url(node, url) + BROADCAST_EVENTS_PATH, request
         )
         logger.info(f"Broadcasted {len(request.events)} event(s) to {node or url!r}")
-        
+    
     def poll_events(
         self, 
         node: RID = None, 
@@ -99,7 +276,7 @@ class RequestHandler:
         )
         logger.info(f"Polled {len(resp.events)} events from {node or url!r}")
         return resp
-        
+    
     def fetch_rids(
         self, 
         node: RID = None, 
@@ -115,7 +292,7 @@ class RequestHandler:
         )
         logger.info(f"Fetched {len(resp.rids)} RID(s) from {node or url!r}")
         return resp
-                
+    
     def fetch_manifests(
         self, 
         node: RID = None, 
@@ -131,7 +308,7 @@ class RequestHandler:
         )
         logger.info(f"Fetched {len(resp.manifests)} manifest(s) from {node or url!r}")
         return resp
-                
+    
     def fetch_bundles(
         self, 
         node: RID = None, 
@@ -146,4 +323,46 @@ class RequestHandler:
             response_model=BundlesPayload
         )
         logger.info(f"Fetched {len(resp.bundles)} bundle(s) from {node or url!r}")
-        return resp
\ No newline at end of file
+        return resp
+    
+    def stream_rids(
+        self, 
+        node: RID = None, 
+        url: str = None, 
+        req: FetchRids | None = None,
+        **kwargs
+    ) -> Iterator[RidsPayload]:
+        """Streaming variant of `fetch_rids`, yields chunks of the response as they are received."""
+        request = req or FetchRids.model_validate(kwargs)
+        yield from self.make_stream_request(
+            self.get_url(node, url) + FETCH_RIDS_PATH, request,
+            response_model=RidsPayload
+        )
+    
+    def stream_manifests(
+        self, 
+        node: RID = None, 
+        url: str = None, 
+        req: FetchManifests | None = None,
+        **kwargs
+    ) -> Iterator[ManifestsPayload]:
+        """Streaming variant of `fetch_manifests`, yields chunks of the response as they are received."""
+        request = req or FetchManifests.model_validate(kwargs)
+        yield from self.make_stream_request(
+            self.get_url(node, url) + FETCH_MANIFESTS_PATH, request,
+            response_model=ManifestsPayload
+        )
+    
+    def stream_bundles(
+        self, 
+        node: RID = None, 
+        url: str = None, 
+        req: FetchBundles | None = None,
+        **kwargs
+    ) -> Iterator[BundlesPayload]:
+        """Streaming variant of `fetch_bundles`, yields chunks of the response as they are received."""
+        request = req or FetchBundles.model_validate(kwargs)
+        yield from self.make_stream_request(
+            self.get_url(node, url) + FETCH_BUNDLES_PATH, request,
+            response_model=BundlesPayload
+        )
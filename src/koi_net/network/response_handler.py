@@ -1,7 +1,12 @@
 import logging
+from typing import Iterator
+from pydantic import BaseModel
 from rid_lib import RID
+from rid_lib.core import RIDType
 from rid_lib.ext import Manifest, Cache
 from rid_lib.ext.bundle import Bundle
+from ..storage import ChangeLog, read_manifest, list_manifests, list_rids_page
+from ..protocol.codec import JSONCodec, get_codec
 from ..protocol.api_models import (
     RidsPayload,
     ManifestsPayload,
@@ -15,45 +20,177 @@ logger = logging.getLogger(__name__)
 
 
 class ResponseHandler:
-    """Handles generating responses to requests from other KOI nodes."""
+    """Handles generating responses to requests from other KOI nodes.
+    
+    `fetch_rids` and `fetch_manifests` (without `rids`) return a single page of up to `limit` results when a `limit` or `cursor` is set, ordered by RID string. The `next_cursor` of the response continues from the last RID returned, and is `None` on the last page.
+    
+    `fetch_manifests` with `since` set to a `change_log` watermark only returns RIDs changed since then (deleted ones in `not_found`), or all manifests if the watermark is unknown. Responses include the current `watermark`.
+    
+    The `stream_*` methods generate the same responses as NDJSON lines (encoded with `codec`), each holding a payload of up to `chunk_size` results, so large responses are never held in memory at once.
+    """
     
     cache: Cache
+    change_log: ChangeLog | None
+    chunk_size: int
+    codec: JSONCodec
     
-    def __init__(self, cache: Cache):
+    def __init__(
+        self, 
+        cache: Cache, 
+        change_log: ChangeLog | None = None,
+        chunk_size: int = 100,
+        codec: JSONCodec | None = None
+    ):
         self.cache = cache
+        self.change_log = change_log
+        self.chunk_size = chunk_size
+        self.codec = codec or get_codec()
+    
+    def _rids_page(
+        self,
+        rid_types: list[RIDType],
+        cursor: str | None,
+        limit: int
+    ) -> tuple[list[RID], str | None]:
+        """Returns a page of cached RIDs, and the cursor of the next page if there is one."""
+        rids = list_rids_page(
+            self.cache, rid_types, after=cursor, limit=limit + 1 if limit else 0)
         
+        if limit and len(rids) > limit:
+            rids = rids[:limit]
+            return rids, str(rids[-1])
+        return rids, None
+    
     def fetch_rids(self, req: FetchRids) -> RidsPayload:
         logger.info(f"Request to fetch rids, allowed types {req.rid_types}")
-        rids = self.cache.list_rids(req.rid_types)
         
-        return RidsPayload(rids=rids)
-        
-    def fetch_manifests(self, req: FetchManifests) -> ManifestsPayload:
-        logger.info(f"Request to fetch manifests, allowed types {req.rid_types}, rids {req.rids}")
+        if not req.limit and req.cursor is None:
+            return RidsPayload(rids=self.cache.list_rids(req.rid_types))
         
+        rids, next_cursor = self._rids_page(req.rid_types, req.cursor, req.limit)
+        return RidsPayload(rids=rids, next_cursor=next_cursor)
+    
+    def _read_manifests(self, rids: list[RID]) -> tuple[list[Manifest], list[RID]]:
         manifests: list[Manifest] = []
         not_found: list[RID] = []
         
-        for rid in (req.rids or self.cache.list_rids(req.rid_types)):
-            bundle = self.cache.read(rid)
-            if bundle:
-                manifests.append(bundle.manifest)
+        for rid in rids:
+            manifest = read_manifest(self.cache, rid)
+            if manifest:
+                manifests.append(manifest)
             else:
                 not_found.append(rid)
         
-        return ManifestsPayload(manifests=manifests, not_found=not_found)
+        return manifests, not_found
+    
+    def _changed_since(
+        self, 
+        req: FetchManifests
+    ) -> tuple[list[RID] | None, str | None]:
+        """Returns RIDs changed since the request's `since` watermark (`None` if unknown), and the current watermark."""
+        if req.since is None or not self.change_log:
+            return None, None
         
-    def fetch_bundles(self, req: FetchBundles) -> BundlesPayload:
-        logger.info(f"Request to fetch bundles, requested rids {req.rids}")
+        changes = self.change_log.changed_since(req.since)
+        if changes is None:
+            logger.debug(f"Changes since '{req.since}' unknown, returning all manifests")
+            return None, self.change_log.watermark
+        
+        rids, watermark = changes
+        if req.rid_types:
+            rids = [rid for rid in rids if type(rid) in req.rid_types]
+        return rids, watermark
+    
+    def fetch_manifests(self, req: FetchManifests) -> ManifestsPayload:
+        logger.info(f"Request to fetch manifests, allowed types {req.rid_types}, rids {req.rids}, since {req.since}")
+        
+        if req.rids:
+            manifests, not_found = self._read_manifests(req.rids)
+            return ManifestsPayload(manifests=manifests, not_found=not_found)
+        
+        changed, watermark = self._changed_since(req)
+        if changed is not None:
+            manifests, not_found = self._read_manifests(changed)
+            return ManifestsPayload(
+                manifests=manifests, not_found=not_found, watermark=watermark)
+        
+        if not req.limit and req.cursor is None:
+            return ManifestsPayload(
+                manifests=list_manifests(self.cache, req.rid_types),
+                watermark=watermark)
         
+        rids, next_cursor = self._rids_page(req.rid_types, req.cursor, req.limit)
+        # RIDs deleted since listing are left out of the page
+        manifests, _ = self._read_manifests(rids)
+        return ManifestsPayload(
+            manifests=manifests, next_cursor=next_cursor, watermark=watermark)
+    
+    def _read_bundles(self, rids: list[RID]) -> tuple[list[Bundle], list[RID]]:
         bundles: list[Bundle] = []
         not_found: list[RID] = []
-
-        for rid in req.rids:
+        
+        for rid in rids:
             bundle = self.cache.read(rid)
             if bundle:
                 bundles.append(bundle)
             else:
                 not_found.append(rid)
-            
-        return BundlesPayload(bundles=bundles, not_found=not_found)
\ No newline at end of file
+        
+        return bundles, not_found
+    
+    def fetch_bundles(self, req: FetchBundles) -> BundlesPayload:
+        logger.info(f"Request to fetch bundles, requested rids {req.rids}")
+        
+        bundles, not_found = self._read_bundles(req.rids)
+        return BundlesPayload(bundles=bundles, not_found=not_found)
+    
+    def _chunks(self, items: list) -> Iterator[tuple[list, bool]]:
+        """Splits items into chunks of `chunk_size`, flagging the last (possibly empty) chunk."""
+        for i in range(0, max(len(items), 1), self.chunk_size):
+            yield items[i:i + self.chunk_size], i + self.chunk_size >= len(items)
+    
+    def _line(self, payload: BaseModel) -> bytes:
+        return self.codec.encode(payload) + b"\n"
+    
+    def stream_rids(self, req: FetchRids) -> Iterator[bytes]:
+        """Generates the response to `fetch_rids` as NDJSON lines of `RidsPayload`s."""
+        logger.info(f"Request to stream rids, allowed types {req.rid_types}")
+        
+        rids, next_cursor = self._rids_page(req.rid_types, req.cursor, req.limit)
+        for chunk, last in self._chunks(rids):
+            yield self._line(RidsPayload(
+                rids=chunk,
+                next_cursor=next_cursor if last else None
+            ))
+    
+    def stream_manifests(self, req: FetchManifests) -> Iterator[bytes]:
+        """Generates the response to `fetch_manifests` as NDJSON lines of `ManifestsPayload`s."""
+        logger.info(f"Request to stream manifests, allowed types {req.rid_types}, rids {req.rids}, since {req.since}")
+        
+        changed, watermark, next_cursor = None, None, None
+        if req.rids:
+            rids = req.rids
+        else:
+            changed, watermark = self._changed_since(req)
+            if changed is not None:
+                rids = changed
+            else:
+                rids, next_cursor = self._rids_page(req.rid_types, req.cursor, req.limit)
+        
+        for chunk, last in self._chunks(rids):
+            manifests, not_found = self._read_manifests(chunk)
+            yield self._line(ManifestsPayload(
+                manifests=manifests,
+                # RIDs deleted since listing are left out of the page
+                not_found=not_found if req.rids or changed is not None else [],
+                next_cursor=next_cursor if last else None,
+                watermark=watermark if last else None
+            ))
+    
+    def stream_bundles(self, req: FetchBundles) -> Iterator[bytes]:
+        """Generates the response to `fetch_bundles` as NDJSON lines of `BundlesPayload`s."""
+        logger.info(f"Request to stream bundles, requested rids {req.rids}")
+        
+        for chunk, _ in self._chunks(req.rids):
+            bundles, not_found = self._read_bundles(chunk)
+            yield self._line(BundlesPayload(bundles=bundles, not_found=not_found))
@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+from rid_lib.types import KoiNetNode
+
+if TYPE_CHECKING:
+    from .interface import NetworkInterface
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    """Flushes webhook queues in batches from a background thread.
+    
+    A node's queue is flushed once `batch_size` events are waiting, or its oldest event is `max_latency` seconds old. Unreachable nodes are retried when their circuit breaker allows it.
+    """
+    
+    network: "NetworkInterface"
+    max_latency: float
+    batch_size: int
+    worker_thread: threading.Thread | None = None
+    
+    def __init__(
+        self,
+        network: "NetworkInterface",
+        max_latency: float = 0.1,
+        batch_size: int = 100
+    ):
+        self.network = network
+        self.max_latency = max_latency
+        self.batch_size = batch_size
+        
+        # nodes with queued events, mapped to when they are due to be flushed
+        self._pending: dict[KoiNetNode, float] = dict()
+        self._stopped = False
+        self._cond = threading.Condition()
+    
+    def _queue_size(self, node: KoiNetNode) -> int:
+        queue = self.network.webhook_event_queue.get(node)
+        return len(queue) if queue is not None else 0
+    
+    def notify(self, node: KoiNetNode):
+        """Schedules a flush of a node's webhook queue after an event was queued."""
+        with self._cond:
+            # wakes the worker to schedule a newly pending node, or flush a full batch
+            if node not in self._pending or self._queue_size(node) >= self.batch_size:
+                self._pending.setdefault(node, time.monotonic() + self.max_latency)
+                self._cond.notify_all()
+    
+    def start(self):
+        """Starts a background thread flushing webhook queues when they are due, including events queued before starting."""
+        for node, queue in list(self.network.webhook_event_queue.items()):
+            if not queue.empty():
+                self.notify(node)
+        
+        self._stopped = False
+        self.worker_thread = threading.Thread(
+            target=self.dispatch_worker,
+            daemon=True
+        )
+        self.worker_thread.start()
+    
+    def stop(self):
+        """Flushes all pending webhook queues and stops the background thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        
+        if self.worker_thread:
+            self.worker_thread.join()
+            self.worker_thread = None
+        
+        self.flush()
+    
+    def dispatch_worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    
+                    now = time.monotonic()
+                    due = []
+                    for node, deadline in self._pending.items():
+                        retry_in = self.network.circuit_breaker.retry_in(node)
+                        if retry_in > 0:
+                            # postpones unreachable nodes, even if their batch is full
+                            self._pending[node] = max(deadline, now + retry_in)
+                        elif deadline <= now or self._queue_size(node) >= self.batch_size:
+                            due.append(node)
+                    if due:
+                        break
+                    
+                    timeout = None
+                    if self._pending:
+                        timeout = min(self._pending.values()) - now
+                    self._cond.wait(timeout)
+                
+                for node in due:
+                    del self._pending[node]
+            
+            for node in due:
+                self._flush_node(node)
+    
+    def _flush_node(self, node: KoiNetNode):
+        try:
+            delivered = self.network.flush_webhook_queue(node)
+        except Exception as e:
+            logger.warning(f"Error flushing webhook queue of {node!r}: {e}")
+            delivered = False
+        
+        if delivered is False:
+            retry_in = max(self.network.circuit_breaker.retry_in(node), self.max_latency)
+            logger.debug(f"Retrying webhook queue of {node!r} in {retry_in:.1f}s")
+            with self._cond:
+                self._pending.setdefault(node, time.monotonic() + retry_in)
+    
+    def flush(self):
+        """Flushes the webhook queues of all pending nodes immediately, from the calling thread."""
+        with self._cond:
+            nodes = list(self._pending)
+            self._pending.clear()
+        
+        for node in nodes:
+            self._flush_node(node)
@@ -1 +1,2 @@
-from .interface import ProcessorInterface
\ No newline at end of file
+from .interface import ProcessorInterface
+from .ticket import HandleTicket
\ No newline at end of file
@@ -11,6 +11,7 @@ from ..protocol.event import Event, EventType
 from ..protocol.edge import EdgeProfile, EdgeStatus, EdgeType
 from ..protocol.node import NodeProfile
 from ..protocol.helpers import generate_edge_bundle
+from ..storage import read_manifest
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +40,13 @@ def basic_manifest_handler(processor: ProcessorInterface, kobj: KnowledgeObject)
     
     Blocks manifests with the same hash, or aren't newer than the cached version. Sets the normalized event type to `NEW` or `UPDATE` depending on whether the RID was previously known to this node.
     """
-    prev_bundle = processor.cache.read(kobj.rid)
+    prev_manifest = read_manifest(processor.cache, kobj.rid)
 
-    if prev_bundle:
-        if kobj.manifest.sha256_hash == prev_bundle.manifest.sha256_hash:
+    if prev_manifest:
+        if kobj.manifest.sha256_hash == prev_manifest.sha256_hash:
             logger.debug("Hash of incoming manifest is same as existing knowledge, ignoring")
             return STOP_CHAIN
-        if kobj.manifest.timestamp <= prev_bundle.manifest.timestamp:
+        if kobj.manifest.timestamp <= prev_manifest.timestamp:
             logger.debug("Timestamp of incoming manifest is the same or older than existing knowledge, ignoring")
             return STOP_CHAIN
         
@@ -159,22 +160,9 @@ def coordinator_contact(processor: ProcessorInterface, kobj: KnowledgeObject):
     
     logger.info("Catching up on network state")
     
-    payload = processor.network.request_handler.fetch_rids(
-        node=kobj.rid, 
-        rid_types=[KoiNetNode]
-    )
-    for rid in payload.rids:
-        if rid == processor.identity.rid:
-            logger.info("Skipping myself")
-            continue
-        if processor.cache.exists(rid):
-            logger.info(f"Skipping known RID '{rid}'")
-            continue
-        
-        # marked as external since we are handling RIDs from another node
-        # will fetch remotely instead of checking local cache
-        processor.handle(rid=rid, source=KnowledgeSource.External)
-    logger.info("Done")
+    # queues nodes which are unknown or differ from the cached version once this
+    # handler returns, later catch ups only transfer nodes changed since this one
+    processor.schedule_catch_up(kobj.rid, rid_types=[KoiNetNode])
     
 
 @KnowledgeHandler.create(HandlerType.Network)
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable
+import httpx
+from rid_lib import RID
+from rid_lib.types import KoiNetNode
+from ..network import NetworkInterface
+from ..protocol.event import EventType
+from .knowledge_object import KnowledgeObject, KnowledgeSource
+
+logger = logging.getLogger(__name__)
+
+
+class FetchBatcher:
+    """Batches remote bundle fetches for external knowledge objects.
+    
+    External knowledge objects missing a manifest or bundle are deferred here instead of being fetched one at a time. Deferred objects are grouped by state provider, fetched with one `fetch_bundles` request per provider (up to `batch_size` RIDs each), and fed back into the processing pipeline with their bundles attached. RIDs a provider can't return are retried with the next best provider.
+    
+    Knowledge objects about an RID which is already deferred are held back until that RID's fetch completes, so objects about the same RID are requeued in the order they arrived.
+    
+    Deferred objects keep their `HandleTicket` pending until they are requeued, requeued objects carry the same ticket, and objects dropped because their bundle couldn't be fetched are marked failed.
+    
+    Fetched bundles are attached to the deferred objects themselves, which resume the pipeline from the handler chain they were deferred at (see `KnowledgeObject.deferred_at`), keeping the state set by earlier handlers.
+    """
+    
+    network: NetworkInterface
+    enqueue: Callable[[KnowledgeObject], None]
+    window: float
+    batch_size: int
+    worker_thread: threading.Thread | None = None
+    
+    def __init__(
+        self,
+        network: NetworkInterface,
+        enqueue: Callable[[KnowledgeObject], None],
+        window: float = 0.05,
+        batch_size: int = 100
+    ):
+        self.network = network
+        self.enqueue = enqueue
+        self.window = window
+        self.batch_size = batch_size
+        
+        self._pending: list[KnowledgeObject] = []
+        self._pending_since: float | None = None
+        self._deferred_rids: Counter[RID] = Counter()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+    
+    @staticmethod
+    def needs_fetch(kobj: KnowledgeObject) -> bool:
+        return (
+            kobj.source == KnowledgeSource.External and
+            kobj.event_type != EventType.FORGET and
+            kobj.bundle is None
+        )
+    
+    def is_deferred(self, rid: RID) -> bool:
+        """Returns whether knowledge objects about this RID are waiting on a fetch."""
+        with self._cond:
+            return self._deferred_rids[rid] > 0
+    
+    def add(self, kobj: KnowledgeObject):
+        """Defers a knowledge object until the next batch is fetched."""
+        with self._cond:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(kobj)
+            self._deferred_rids[kobj.rid] += 1
+            self._cond.notify_all()
+        if kobj.ticket:
+            kobj.ticket.acquire()
+        logger.debug(f"Deferred {kobj!r} for batched fetch")
+    
+    def start(self):
+        """Starts a background thread flushing batches when they are full or `window` seconds old."""
+        self.worker_thread = threading.Thread(
+            target=self.fetch_worker,
+            daemon=True
+        )
+        self.worker_thread.start()
+    
+    def fetch_worker(self):
+        while True:
+            with self._cond:
+                while not self._batch_ready():
+                    if self._pending:
+                        timeout = self._pending_since + self.window - time.monotonic()
+                    else:
+                        timeout = None
+                    self._cond.wait(timeout)
+            
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Error fetching batch: {e}")
+    
+    def _batch_ready(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._pending_since >= self.window
+    
+    def flush(self, wait: bool = False) -> bool:
+        """Fetches bundles for all deferred knowledge objects and requeues them.
+        
+        If `wait` is `True`, waits for a batch being fetched by another thread to finish first. Returns `True` if any knowledge objects were requeued (or were being fetched), so the caller knows to process the queue again.
+        """
+        with self._cond:
+            was_in_flight = self._in_flight > 0
+            if wait:
+                while self._in_flight:
+                    self._cond.wait()
+            
+            kobjs = self._pending
+            if not kobjs:
+                return was_in_flight
+            
+            self._pending = []
+            self._pending_since = None
+            self._in_flight += 1
+        
+        bundles = {}
+        try:
+            bundles = self._fetch_bundles({
+                kobj.rid for kobj in kobjs if self.needs_fetch(kobj)
+            })
+        except Exception as e:
+            logger.warning(f"Error fetching batch: {e!r}")
+        
+        try:
+            for kobj in kobjs:
+                if not self.needs_fetch(kobj):
+                    self.enqueue(kobj)
+                    continue
+                
+                bundle = bundles.get(kobj.rid)
+                if not bundle:
+                    logger.debug(f"Failed to fetch bundle for {kobj!r}")
+                    if kobj.ticket:
+                        kobj.ticket.fail()
+                        kobj.ticket.release()
+                    continue
+                
+                if kobj.manifest and kobj.manifest != bundle.manifest:
+                    logger.warning("Retrieved bundle contains a different manifest")
+                
+                kobj.manifest = bundle.manifest
+                kobj.contents = bundle.contents
+                self.enqueue(kobj)
+        finally:
+            # RIDs stay deferred until their objects are requeued, so newer objects can't overtake them
+            with self._cond:
+                for kobj in kobjs:
+                    self._deferred_rids[kobj.rid] -= 1
+                    if self._deferred_rids[kobj.rid] <= 0:
+                        del self._deferred_rids[kobj.rid]
+                
+                self._in_flight -= 1
+                self._cond.notify_all()
+        
+        return True
+    
+    def _fetch_bundles(self, rids: set[RID]) -> dict:
+        """Fetches bundles for a set of RIDs, grouping requests by state provider."""
+        bundles = {}
+        tried: dict[RID, set[KoiNetNode]] = {rid: set() for rid in rids}
+        provider_cache: dict[type, list[KoiNetNode]] = {}
+        
+        while tried:
+            # assigns each unresolved RID to its best untried provider
+            batches: dict[KoiNetNode, list[RID]] = {}
+            for rid, tried_providers in list(tried.items()):
+                rid_type = type(rid)
+                if rid_type not in provider_cache:
+                    provider_cache[rid_type] = self.network.provider_stats.rank(
+                        self.network.get_state_providers(rid_type))
+                
+                provider = next((
+                    node for node in provider_cache[rid_type]
+                    if node not in tried_providers
+                ), None)
+                
+                if provider is None:
+                    logger.warning(f"Failed to fetch remote bundle for '{rid}'")
+                    del tried[rid]
+                    continue
+                
+                tried_providers.add(provider)
+                batches.setdefault(provider, []).append(rid)
+            
+            for provider, provider_rids in batches.items():
+                for i in range(0, len(provider_rids), self.batch_size):
+                    chunk = provider_rids[i:i+self.batch_size]
+                    
+                    start = time.monotonic()
+                    try:
+                        payload = self.network.request_handler.fetch_bundles(
+                            node=provider, rids=chunk)
+                    except httpx.HTTPError as e:
+                        logger.debug(f"Failed to fetch batch from '{provider}': {e!r}")
+                        self.network.provider_stats.record_failure(provider)
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Error fetching batch from '{provider}': {e!r}")
+                        self.network.provider_stats.record_failure(provider)
+                        continue
+                    
+                    self.network.provider_stats.record_success(
+                        provider, time.monotonic() - start)
+                    
+                    for bundle in payload.bundles:
+                        if bundle.rid in tried:
+                            bundles[bundle.rid] = bundle
+                            del tried[bundle.rid]
+        
+        return bundles
@@ -21,6 +21,9 @@ from .knowledge_object import (
     KnowledgeSource, 
     KnowledgeEventType
 )
+from .fetch_batcher import FetchBatcher
+from .ticket import HandleTicket
+from ..storage import read_manifest
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +36,14 @@ class ProcessorInterface():
     network: NetworkInterface
     identity: NodeIdentity
     handlers: list[KnowledgeHandler]
+    handler_index: dict[tuple, list[tuple[int, KnowledgeHandler]]]
     kobj_queue: queue.Queue[KnowledgeObject]
-    use_kobj_processor_thread: bool
+    kobj_queues: list[queue.Queue[KnowledgeObject]]
+    use_kobj_processor_thread: bool | int
+    worker_count: int
     worker_thread: threading.Thread | None = None
+    worker_threads: list[threading.Thread]
+    fetch_batcher: FetchBatcher | None = None
     
     def __init__(
         self,
@@ -43,7 +51,7 @@ class ProcessorInterface():
         cache: Cache, 
         network: NetworkInterface,
         identity: NodeIdentity,
-        use_kobj_processor_thread: bool,
+        use_kobj_processor_thread: bool | int,
         default_handlers: list[KnowledgeHandler] = []
     ):
         self.config = config
@@ -51,17 +59,76 @@ class ProcessorInterface():
         self.network = network
         self.identity = identity
         self.use_kobj_processor_thread = use_kobj_processor_thread
+        self.worker_count = int(use_kobj_processor_thread)
         self.handlers: list[KnowledgeHandler] = default_handlers
-        self.kobj_queue = queue.Queue()
+        self.handler_index = dict()
+        self._indexed_handlers: tuple[KnowledgeHandler, ...] = ()
+        self._scheduled_catch_ups: list[tuple[KoiNetNode, list[RIDType]]] = []
         
-        if self.use_kobj_processor_thread:
-            self.worker_thread = threading.Thread(
+        # one queue per worker, knowledge objects are sharded by RID
+        self.kobj_queues = [
+            queue.Queue() for _ in range(max(self.worker_count, 1))
+        ]
+        self.kobj_queue = self.kobj_queues[0]
+        
+        if self.config.koi_net.fetch_batch_window is not None:
+            self.fetch_batcher = FetchBatcher(
+                network=self.network,
+                enqueue=lambda kobj: self.handle(kobj=kobj),
+                window=self.config.koi_net.fetch_batch_window,
+                batch_size=self.config.koi_net.fetch_batch_size
+            )
+        
+        self.worker_threads = [
+            threading.Thread(
                 target=self.kobj_processor_worker,
+                args=(kobj_queue,),
                 daemon=True
-            )
+            ) for kobj_queue in self.kobj_queues[:self.worker_count]
+        ]
+        if self.worker_threads:
+            self.worker_thread = self.worker_threads[0]
         
     def add_handler(self, handler: KnowledgeHandler):
         self.handlers.append(handler)
+    
+    def get_handlers(
+        self, 
+        handler_type: HandlerType, 
+        kobj: KnowledgeObject
+    ) -> list[tuple[int, KnowledgeHandler]]:
+        """Returns handlers matching a knowledge object, with their position in `handlers`.
+        
+        Matches are cached in `handler_index` per (handler type, RID type, source, event type), and rebuilt whenever `handlers` changes.
+        """
+        handlers = tuple(self.handlers)
+        if handlers != self._indexed_handlers:
+            self.handler_index = dict()
+            self._indexed_handlers = handlers
+        
+        key = (handler_type, type(kobj.rid), kobj.source, kobj.event_type)
+        matches = self.handler_index.get(key)
+        if matches is not None:
+            return matches
+        
+        matches = []
+        for position, handler in enumerate(handlers):
+            if handler_type != handler.handler_type: 
+                continue
+            
+            if handler.rid_types and type(kobj.rid) not in handler.rid_types:
+                continue
+            
+            if handler.source and handler.source != kobj.source:
+                continue
+            
+            if handler.event_types and kobj.event_type not in handler.event_types:
+                continue
+            
+            matches.append((position, handler))
+        
+        self.handler_index[key] = matches
+        return matches
             
     def register_handler(
         self,
@@ -89,24 +156,18 @@ class ProcessorInterface():
         - `None` - to keep the same knowledge object for the next handler in the chain
         - `STOP_CHAIN` - to stop the handler chain and immediately exit the processing pipeline
         
-        Handlers will only be called in the chain if their handler and RID type match that of the inputted knowledge object. 
+        Handlers will only be called in the chain if their handler and RID type match that of the inputted knowledge object. Matching handlers are looked up in `handler_index` (see `get_handlers`).
         """
         
-        for handler in self.handlers:
-            if handler_type != handler.handler_type: 
-                continue
-            
-            if handler.rid_types and type(kobj.rid) not in handler.rid_types:
-                continue
-            
-            if handler.source and handler.source != kobj.source:
-                continue
-            
-            if handler.event_types and kobj.event_type not in handler.event_types:
-                continue
+        matched = self.get_handlers(handler_type, kobj)
+        handlers = matched
+        i = 0
+        while i < len(handlers):
+            position, handler = handlers[i]
+            i += 1
             
             logger.debug(f"Calling {handler_type} handler '{handler.func.__name__}'")
-            resp = handler.func(self, kobj.model_copy())
+            resp = handler.func(self, kobj.copy())
             
             # stops handler chain execution
             if resp is STOP_CHAIN:
@@ -117,8 +178,17 @@ class ProcessorInterface():
                 continue
             # kobj modified by handler
             elif isinstance(resp, KnowledgeObject):
+                if resp.ticket is None:
+                    resp.ticket = kobj.ticket
                 kobj = resp
                 logger.debug(f"Knowledge object modified by {handler.func.__name__}")
+                
+                # re-match remaining handlers if the handler changed a matched field
+                next_matched = self.get_handlers(handler_type, kobj)
+                if next_matched is not matched:
+                    matched = next_matched
+                    handlers = [h for h in matched if h[0] > position]
+                    i = 0
             else:
                 raise ValueError(f"Handler {handler.func.__name__} returned invalid response '{resp}'")
                     
@@ -139,8 +209,19 @@ class ProcessorInterface():
         """
         
         logger.debug(f"Handling {kobj!r}")
-        kobj = self.call_handler_chain(HandlerType.RID, kobj)
-        if kobj is STOP_CHAIN: return
+        
+        # requeued by the fetch batcher, resumes where it was deferred
+        resume_at, kobj.deferred_at = kobj.deferred_at, None
+        
+        if resume_at is None and self.fetch_batcher and self.fetch_batcher.is_deferred(kobj.rid):
+            logger.debug("RID waiting on batched fetch, deferring")
+            kobj.deferred_at = HandlerType.RID
+            self.fetch_batcher.add(kobj)
+            return
+        
+        if resume_at in (None, HandlerType.RID):
+            kobj = self.call_handler_chain(HandlerType.RID, kobj)
+            if kobj is STOP_CHAIN: return
         
         if kobj.event_type == EventType.FORGET:
             bundle = self.cache.read(kobj.rid)
@@ -157,32 +238,42 @@ class ProcessorInterface():
             # attempt to retrieve manifest
             if not kobj.manifest:
                 logger.debug("Manifest not found")
-                if kobj.source == KnowledgeSource.External:
+                if kobj.source == KnowledgeSource.External and self.fetch_batcher:
+                    kobj.deferred_at = HandlerType.Manifest
+                    self.fetch_batcher.add(kobj)
+                    return
+                
+                elif kobj.source == KnowledgeSource.External:
                     logger.debug("Attempting to fetch remote manifest")
                     manifest = self.network.fetch_remote_manifest(kobj.rid)
                     
                 elif kobj.source == KnowledgeSource.Internal:
                     logger.debug("Attempting to read manifest from cache")
-                    bundle = self.cache.read(kobj.rid)
-                    if bundle: 
-                        manifest = bundle.manifest
-                    else:
-                        manifest = None
+                    manifest = read_manifest(self.cache, kobj.rid)
+                    if not manifest:
                         return
                     
                 if not manifest:
                     logger.debug("Failed to find manifest")
+                    if kobj.ticket:
+                        kobj.ticket.fail()
                     return
                 
                 kobj.manifest = manifest
                 
-            kobj = self.call_handler_chain(HandlerType.Manifest, kobj)
-            if kobj is STOP_CHAIN: return
+            if resume_at != HandlerType.Bundle:
+                kobj = self.call_handler_chain(HandlerType.Manifest, kobj)
+                if kobj is STOP_CHAIN: return
             
             # attempt to retrieve bundle
             if not kobj.bundle:
                 logger.debug("Bundle not found")
-                if kobj.source == KnowledgeSource.External:
+                if kobj.source == KnowledgeSource.External and self.fetch_batcher:
+                    kobj.deferred_at = HandlerType.Bundle
+                    self.fetch_batcher.add(kobj)
+                    return
+                
+                elif kobj.source == KnowledgeSource.External:
                     logger.debug("Attempting to fetch remote bundle")
                     bundle = self.network.fetch_remote_bundle(kobj.rid)
                     
@@ -192,6 +283,8 @@ class ProcessorInterface():
                 
                 if not bundle: 
                     logger.debug("Failed to find bundle")
+                    if kobj.ticket:
+                        kobj.ticket.fail()
                     return
                 
                 if kobj.manifest != bundle.manifest:
@@ -215,9 +308,12 @@ class ProcessorInterface():
             logger.debug("Normalized event type was never set, no cache or network operations will occur")
             return
         
+        self.network.change_log.record(kobj.rid)
+        
         if type(kobj.rid) in (KoiNetNode, KoiNetEdge):
-            logger.debug("Change to node or edge, regenerating network graph")
-            self.network.graph.generate()
+            logger.debug("Change to node or edge, updating network graph")
+            self.network.graph.update(
+                kobj.rid, kobj.normalized_event_type, kobj.bundle)
         
         kobj = self.call_handler_chain(HandlerType.Network, kobj)
         if kobj is STOP_CHAIN: return
@@ -229,10 +325,79 @@ class ProcessorInterface():
         
         for node in kobj.network_targets:
             self.network.push_event_to(kobj.normalized_event, node)
-            self.network.flush_webhook_queue(node)
+            # unreachable targets are skipped, their events stay queued
+            if (
+                not self.network.webhook_dispatcher and
+                self.network.circuit_breaker.is_available(node)
+            ):
+                self.network.flush_webhook_queue(node)
         
         kobj = self.call_handler_chain(HandlerType.Final, kobj)
 
+    def catch_up(self, node: KoiNetNode, rid_types: list[RIDType] = []) -> int:
+        """Catches up on RIDs (of the specified types) changed by another node since the last watermark, returning the number of knowledge objects queued.
+        
+        Blocks until they are processed, use `schedule_catch_up` in handlers. The watermark only moves if every change succeeded.
+        """
+        since = self.network.sync_watermarks.get(node, "")
+        watermark = None
+        tickets: list[HandleTicket] = []
+        
+        for payload in self.network.request_handler.stream_manifests(
+            node=node, rid_types=rid_types, since=since
+        ):
+            changed = []
+            for manifest in payload.manifests:
+                if manifest.rid == self.identity.rid:
+                    continue
+                prev_manifest = read_manifest(self.cache, manifest.rid)
+                if prev_manifest and prev_manifest.sha256_hash == manifest.sha256_hash:
+                    continue
+                changed.append(manifest)
+            
+            deleted = [
+                rid for rid in payload.not_found
+                if rid != self.identity.rid and self.cache.exists(rid)
+            ]
+            
+            tickets.append(self.handle_many(manifests=changed, source=KnowledgeSource.External))
+            tickets.append(self.handle_many(rids=deleted, event_type=EventType.FORGET, source=KnowledgeSource.External))
+            
+            watermark = payload.watermark or watermark
+        
+        if self.use_kobj_processor_thread:
+            for ticket in tickets:
+                ticket.wait()
+        else:
+            self.flush_kobj_queue()
+        
+        queued = sum(ticket.size for ticket in tickets)
+        failed = sum(ticket.failed for ticket in tickets)
+        if failed:
+            logger.warning(f"Failed to process {failed} change(s) from {node!r}, keeping previous watermark")
+        elif watermark:
+            self.network.sync_watermarks[node] = watermark
+        
+        logger.info(f"Caught up with {node!r}, processed {queued} change(s)")
+        return queued
+    
+    def schedule_catch_up(self, node: KoiNetNode, rid_types: list[RIDType] = []):
+        """Catches up with a node without blocking, in a background thread (or after the queue is flushed, in nodes without processor threads)."""
+        if self.use_kobj_processor_thread:
+            threading.Thread(
+                target=self._run_catch_up,
+                args=(node, rid_types),
+                daemon=True
+            ).start()
+        else:
+            self._scheduled_catch_ups.append((node, rid_types))
+    
+    def _run_catch_up(self, node: KoiNetNode, rid_types: list[RIDType]):
+        try:
+            self.catch_up(node, rid_types=rid_types)
+        except Exception as e:
+            logger.warning(f"Failed to catch up with {node!r}: {e!r}")
+    
     def flush_kobj_queue(self):
         """Flushes all knowledge objects from queue and processes them.
         
@@ -241,26 +406,74 @@ class ProcessorInterface():
         if self.use_kobj_processor_thread:
             logger.warning("You are using a worker thread, calling this method can cause race conditions!")
         
-        while not self.kobj_queue.empty():
-            kobj = self.kobj_queue.get()
-            logger.debug(f"Dequeued {kobj!r}")
+        while True:
+            for kobj_queue in self.kobj_queues:
+                while not kobj_queue.empty():
+                    kobj = kobj_queue.get()
+                    logger.debug(f"Dequeued {kobj!r}")
+                    
+                    failed = True
+                    try:
+                        self.process_kobj(kobj)
+                        failed = False
+                    finally:
+                        self._task_done(kobj_queue, kobj, failed)
+                    logger.debug("Done")
             
-            try:
-                self.process_kobj(kobj)
-            finally:
-                self.kobj_queue.task_done()
-            logger.debug("Done")
+            # deferred fetches are requeued, process them in the next pass
+            if self.fetch_batcher and self.fetch_batcher.flush():
+                continue
+            
+            if not self._scheduled_catch_ups:
+                break
+            self._run_catch_up(*self._scheduled_catch_ups.pop(0))
+    
+    def join(self):
+        """Blocks until all queued knowledge objects have been processed by the worker threads.
+        
+        Includes knowledge objects deferred for a batched fetch, which are fetched immediately instead of waiting for the batching window.
+        """
+        while True:
+            for kobj_queue in self.kobj_queues:
+                kobj_queue.join()
+            if not self.fetch_batcher or not self.fetch_batcher.flush(wait=True):
+                break
+    
+    @property
+    def unfinished_tasks(self) -> int:
+        """Number of queued knowledge objects not yet processed."""
+        return sum(q.unfinished_tasks for q in self.kobj_queues)
+    
+    def _queue_for(self, rid: RID) -> queue.Queue[KnowledgeObject]:
+        """Returns the queue a knowledge object about this RID is processed on.
+        
+        All KOI nodes and edges go to the first queue, so network state changes are processed in the order they were received.
+        """
+        if len(self.kobj_queues) == 1 or type(rid) in (KoiNetNode, KoiNetEdge):
+            return self.kobj_queues[0]
+        return self.kobj_queues[hash(rid) % len(self.kobj_queues)]
+    
+    @staticmethod
+    def _task_done(kobj_queue: queue.Queue, kobj: KnowledgeObject, failed: bool = False):
+        kobj_queue.task_done()
+        if kobj.ticket:
+            if failed:
+                kobj.ticket.fail()
+            kobj.ticket.release()
     
-    def kobj_processor_worker(self, timeout=0.1):
+    def kobj_processor_worker(self, kobj_queue: queue.Queue | None = None, timeout=0.1):
+        kobj_queue = kobj_queue or self.kobj_queue
         while True:
             try:
-                kobj = self.kobj_queue.get(timeout=timeout)
+                kobj = kobj_queue.get(timeout=timeout)
                 logger.debug(f"Dequeued {kobj!r}")
                 
+                failed = True
                 try:
                     self.process_kobj(kobj)
+                    failed = False
                 finally:
-                    self.kobj_queue.task_done()
+                    self._task_done(kobj_queue, kobj, failed)
                 logger.debug("Done")
             
             except queue.Empty:
@@ -296,5 +509,36 @@ class ProcessorInterface():
         else:
             raise ValueError("One of 'rid', 'manifest', 'bundle', 'event', or 'kobj' must be provided")
         
-        self.kobj_queue.put(_kobj)
+        self._queue_for(_kobj.rid).put(_kobj)
         logger.debug(f"Queued {_kobj!r}")
+    
+    def handle_many(
+        self,
+        rids: list[RID] = [],
+        manifests: list[Manifest] = [],
+        bundles: list[Bundle] = [],
+        events: list[Event] = [],
+        kobjs: list[KnowledgeObject] = [],
+        event_type: KnowledgeEventType = None,
+        source: KnowledgeSource = KnowledgeSource.Internal
+    ) -> HandleTicket:
+        """Queues a batch of knowledge to be handled by processing pipeline, returning a ticket to wait for it.
+        
+        Takes lists of the knowledge types accepted by `handle`, normalized into knowledge objects in the order rids, manifests, bundles, events, kobjs. Knowledge objects of the batch may be interleaved with knowledge queued by other threads, but keep their order per RID. Knowledge objects which already have a ticket keep it, and aren't counted by the returned one.
+        """
+        batch = [
+            *(KnowledgeObject.from_rid(rid, event_type, source) for rid in rids),
+            *(KnowledgeObject.from_manifest(manifest, event_type, source) for manifest in manifests),
+            *(KnowledgeObject.from_bundle(bundle, event_type, source) for bundle in bundles),
+            *(KnowledgeObject.from_event(event, source) for event in events),
+            *kobjs
+        ]
+        
+        ticket = HandleTicket(sum(1 for kobj in batch if kobj.ticket is None))
+        for kobj in batch:
+            if kobj.ticket is None:
+                kobj.ticket = ticket
+            self._queue_for(kobj.rid).put(kobj)
+        
+        logger.debug(f"Queued {len(batch)} knowledge object(s)")
+        return ticket
@@ -1,10 +1,16 @@
+import copy
+from collections.abc import Iterable, MutableSet
 from enum import StrEnum
-from pydantic import BaseModel
+from typing import TYPE_CHECKING, Any
 from rid_lib import RID
 from rid_lib.ext import Manifest
 from rid_lib.ext.bundle import Bundle
 from rid_lib.types.koi_net_node import KoiNetNode
 from ..protocol.event import Event, EventType
+from .ticket import HandleTicket
+
+if TYPE_CHECKING:
+    from .handler import HandlerType
 
 
 type KnowledgeEventType = EventType | None
@@ -13,7 +19,52 @@ class KnowledgeSource(StrEnum):
     Internal = "INTERNAL"
     External = "EXTERNAL"
 
-class KnowledgeObject(BaseModel):
+class NetworkTargets(MutableSet):
+    """Set of network targets, shared between copies of a knowledge object until one of them modifies it (copy-on-write)."""
+    
+    __slots__ = ("_targets", "_owned")
+    
+    def __init__(self, targets: set[KoiNetNode] | None = None, owned: bool = True):
+        self._targets = targets if targets is not None else set()
+        self._owned = owned
+    
+    def __repr__(self):
+        return repr(self._targets)
+    
+    def __contains__(self, node) -> bool:
+        return node in self._targets
+    
+    def __iter__(self):
+        return iter(self._targets)
+    
+    def __len__(self) -> int:
+        return len(self._targets)
+    
+    def share(self) -> "NetworkTargets":
+        """Returns a view of the same set, both copy it before their next modification."""
+        self._owned = False
+        return NetworkTargets(self._targets, owned=False)
+    
+    def _own(self) -> set[KoiNetNode]:
+        if not self._owned:
+            self._targets = set(self._targets)
+            self._owned = True
+        return self._targets
+    
+    def add(self, node: KoiNetNode):
+        self._own().add(node)
+    
+    def discard(self, node: KoiNetNode):
+        self._own().discard(node)
+    
+    def update(self, *nodes: Iterable[KoiNetNode]):
+        self._own().update(*nodes)
+    
+    def clear(self):
+        self._targets = set()
+        self._owned = True
+
+class KnowledgeObject:
     """A normalized knowledge representation for internal processing.
     
     Capable of representing an RID, manifest, bundle, or event. Contains three additional fields use for decision making in the knowledge processing pipeline. 
@@ -25,18 +76,126 @@ class KnowledgeObject(BaseModel):
     The network targets indicate other nodes in the network this knowledge object will be sent to. The event sent to them will be constructed from this knowledge object's RID, manifest, contents, and normalized event type.
     
     Constructors are provided to create a knowledge object from an RID, manifest, bundle, or event.
+    
+    Knowledge objects are lightweight slotted objects, not Pydantic models (`model_copy`, `model_dump` and `model_validate` are kept for compatibility). `copy` is a shallow copy which shares the network targets set until either copy modifies it (copy-on-write). Contents are always shared, and should be replaced rather than modified in place.
+    
+    Knowledge objects queued by `handle_many` carry the batch's `ticket`, which is kept by copies and marked done once the object leaves the processing pipeline.
+    
+    Knowledge objects deferred for a batched fetch record the handler chain they stopped before in `deferred_at`, and resume from that chain once requeued.
     """
+    
+    __slots__ = (
+        "rid",
+        "manifest",
+        "contents",
+        "event_type",
+        "normalized_event_type",
+        "source",
+        "_network_targets",
+        "ticket",
+        "deferred_at"
+    )
+    
     rid: RID
-    manifest: Manifest | None = None
-    contents: dict | None = None
-    event_type: KnowledgeEventType = None
-    normalized_event_type: KnowledgeEventType = None
+    manifest: Manifest | None
+    contents: dict | None
+    event_type: KnowledgeEventType
+    normalized_event_type: KnowledgeEventType
     source: KnowledgeSource
-    network_targets: set[KoiNetNode] = set()
+    ticket: HandleTicket | None
+    deferred_at: "HandlerType | None"
+    
+    def __init__(
+        self,
+        rid: RID,
+        source: KnowledgeSource,
+        manifest: Manifest | None = None,
+        contents: dict | None = None,
+        event_type: KnowledgeEventType = None,
+        normalized_event_type: KnowledgeEventType = None,
+        network_targets: set[KoiNetNode] | None = None
+    ):
+        self.rid = rid
+        self.manifest = manifest
+        self.contents = contents
+        self.event_type = event_type
+        self.normalized_event_type = normalized_event_type
+        self.source = source
+        self._network_targets = NetworkTargets(network_targets)
+        self.ticket = None
+        self.deferred_at = None
     
     def __repr__(self):
         return f"<KObj '{self.rid}' event type: '{self.event_type}' -> '{self.normalized_event_type}', source: '{self.source}'>"
     
+    @property
+    def network_targets(self) -> NetworkTargets:
+        return self._network_targets
+    
+    @network_targets.setter
+    def network_targets(self, network_targets: Iterable[KoiNetNode]):
+        self._network_targets = NetworkTargets(set(network_targets))
+    
+    def copy(self) -> "KnowledgeObject":
+        """Returns a shallow copy, sharing the network targets set until it is modified."""
+        kobj = KnowledgeObject.__new__(KnowledgeObject)
+        kobj.rid = self.rid
+        kobj.manifest = self.manifest
+        kobj.contents = self.contents
+        kobj.event_type = self.event_type
+        kobj.normalized_event_type = self.normalized_event_type
+        kobj.source = self.source
+        kobj._network_targets = self._network_targets.share()
+        kobj.ticket = self.ticket
+        kobj.deferred_at = self.deferred_at
+        return kobj
+    
+    def model_copy(self, update: dict[str, Any] | None = None, deep: bool = False) -> "KnowledgeObject":
+        """Pydantic compatible copy, with fields in `update` replaced."""
+        kobj = self.copy()
+        if deep:
+            kobj.manifest = self.manifest.model_copy() if self.manifest else None
+            kobj.contents = copy.deepcopy(self.contents)
+            kobj.network_targets = self.network_targets
+        for field, value in (update or {}).items():
+            setattr(kobj, field, value)
+        return kobj
+    
+    def model_dump(self) -> dict[str, Any]:
+        """Pydantic compatible dict of the knowledge object's fields."""
+        return {
+            "rid": self.rid,
+            "manifest": self.manifest.model_dump() if self.manifest else None,
+            "contents": self.contents,
+            "event_type": self.event_type,
+            "normalized_event_type": self.normalized_event_type,
+            "source": self.source,
+            "network_targets": set(self.network_targets)
+        }
+    
+    @classmethod
+    def model_validate(cls, obj: "KnowledgeObject | dict[str, Any]") -> "KnowledgeObject":
+        """Pydantic compatible constructor from a knowledge object or a dict of its fields (like the output of `model_dump`)."""
+        if isinstance(obj, cls):
+            return obj
+        
+        rid = obj["rid"]
+        manifest = obj.get("manifest")
+        event_type = obj.get("event_type")
+        normalized_event_type = obj.get("normalized_event_type")
+        return cls(
+            rid=rid if isinstance(rid, RID) else RID.from_string(rid),
+            source=KnowledgeSource(obj["source"]),
+            manifest=Manifest.model_validate(manifest) if manifest is not None else None,
+            contents=obj.get("contents"),
+            event_type=EventType(event_type) if event_type is not None else None,
+            normalized_event_type=EventType(normalized_event_type) if normalized_event_type is not None else None,
+            network_targets={
+                node if isinstance(node, RID) else RID.from_string(node)
+                for node in obj.get("network_targets", ())
+            }
+        )
+    
     @classmethod
     def from_rid(
         cls, 
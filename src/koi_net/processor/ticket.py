@@ -0,0 +1,61 @@
+import threading
+
+
+class HandleTicket:
+    """Tracks completion of a batch of knowledge objects queued by `ProcessorInterface.handle_many`.
+    
+    Objects which raised in a handler, or couldn't be fetched, are counted in `failed`.
+    """
+    
+    size: int
+    failed: int
+    
+    def __init__(self, size: int = 0):
+        self.size = size
+        self.failed = 0
+        self._pending = size
+        self._cond = threading.Condition()
+    
+    def __repr__(self):
+        return f"<HandleTicket {self.size - self.pending}/{self.size} done>"
+    
+    @property
+    def pending(self) -> int:
+        """Number of knowledge objects of the batch not yet processed."""
+        with self._cond:
+            return self._pending
+    
+    def done(self) -> bool:
+        """Returns whether every knowledge object of the batch has been processed."""
+        return self.pending == 0
+    
+    def succeeded(self) -> bool:
+        """Returns whether every knowledge object of the batch has been processed without failing."""
+        with self._cond:
+            return self._pending == 0 and self.failed == 0
+    
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until the batch has been processed, or `timeout` seconds have passed. Returns whether the batch was processed.
+        
+        NOTE: knowledge objects are only processed by worker threads or `flush_kobj_queue`, in nodes without processor threads call `flush_kobj_queue` before waiting.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+    
+    def acquire(self, n: int = 1):
+        """Counts `n` more knowledge objects as pending."""
+        with self._cond:
+            self._pending += n
+    
+    def release(self, n: int = 1):
+        """Marks `n` knowledge objects as processed."""
+        with self._cond:
+            self._pending -= n
+            if self._pending <= 0:
+                self._pending = 0
+                self._cond.notify_all()
+    
+    def fail(self, n: int = 1):
+        """Counts `n` knowledge objects as failed, they still have to be released."""
+        with self._cond:
+            self.failed += n
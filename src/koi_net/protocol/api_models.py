@@ -11,13 +11,19 @@ from .event import Event
 class PollEvents(BaseModel):
     rid: RID
     limit: int = 0
+    cursor: str | None = None
     
 class FetchRids(BaseModel):
     rid_types: list[RIDType] = []
+    limit: int = 0
+    cursor: str | None = None
     
 class FetchManifests(BaseModel):
     rid_types: list[RIDType] = []
     rids: list[RID] = []
+    limit: int = 0
+    cursor: str | None = None
+    since: str | None = None
     
 class FetchBundles(BaseModel):
     rids: list[RID]
@@ -27,10 +33,13 @@ class FetchBundles(BaseModel):
 
 class RidsPayload(BaseModel):
     rids: list[RID]
+    next_cursor: str | None = None
 
 class ManifestsPayload(BaseModel):
     manifests: list[Manifest]
     not_found: list[RID] = []
+    next_cursor: str | None = None
+    watermark: str | None = None
     
 class BundlesPayload(BaseModel):
     bundles: list[Bundle]
@@ -39,6 +48,7 @@ class BundlesPayload(BaseModel):
     
 class EventsPayload(BaseModel):
     events: list[Event]
+    next_cursor: str | None = None
     
 
 # TYPES
@@ -0,0 +1,228 @@
+"""JSON codecs for encoding and decoding protocol models.
+
+`JSONCodec` encodes and decodes models with pydantic-core, directly to and from bytes. If `orjson` or `msgspec` is installed, `get_codec` returns a codec parsing JSON with it instead, which is faster for payloads with large contents. All codecs encode models the same way, and produce the same models when decoding.
+
+`MsgpackCodec` encodes the same structure as MessagePack, for nodes negotiating it through `Content-Type` and `Accept` headers (JSON remains the default).
+"""
+
+import json
+import logging
+import importlib.util
+import types
+import typing
+from typing import Any, Callable, TypeVar
+from pydantic import BaseModel, ValidationError
+from rid_lib import RID
+from .consts import MSGPACK_MEDIA_TYPE
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+type RIDMemo = dict[str, RID]
+type Preparer = Callable[[Any, RIDMemo], Any]
+
+_preparers: dict[Any, Preparer | None] = {}
+
+
+def _rid_preparer(rid_type: type[RID]) -> Preparer:
+    def prepare(value, memo: RIDMemo):
+        if not isinstance(value, str):
+            return value
+        rid = memo.get(value)
+        if rid is None:
+            try:
+                rid = RID.from_string(value)
+            except Exception:
+                # invalid RIDs are left for pydantic to report
+                return value
+            memo[value] = rid
+        return rid if isinstance(rid, rid_type) else value
+    return prepare
+
+def _model_preparer(model: type[BaseModel]) -> Preparer | None:
+    fields = [
+        (name, preparer) for name, field in model.model_fields.items()
+        if (preparer := _preparer(field.annotation))
+    ]
+    if not fields:
+        return None
+    
+    def prepare(value, memo: RIDMemo):
+        if isinstance(value, dict):
+            for name, preparer in fields:
+                if value.get(name) is not None:
+                    value[name] = preparer(value[name], memo)
+        return value
+    return prepare
+
+def _preparer(annotation) -> Preparer | None:
+    """Returns a function replacing RID strings in parsed JSON of this type with (shared) RID objects, or `None` if the type holds no RIDs."""
+    if annotation in _preparers:
+        return _preparers[annotation]
+    # placeholder for recursive models
+    _preparers[annotation] = None
+    
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    preparer = None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        preparer = _model_preparer(annotation)
+    
+    elif isinstance(annotation, type) and issubclass(annotation, RID):
+        preparer = _rid_preparer(annotation)
+    
+    elif origin is list and args:
+        item = _preparer(args[0])
+        if item:
+            preparer = lambda value, memo: (
+                [item(v, memo) for v in value] if isinstance(value, list) else value)
+    
+    elif origin is dict and args:
+        key, item = _preparer(args[0]), _preparer(args[1])
+        if key or item:
+            key = key or (lambda v, memo: v)
+            item = item or (lambda v, memo: v)
+            preparer = lambda value, memo: (
+                {key(k, memo): item(v, memo) for k, v in value.items()}
+                if isinstance(value, dict) else value)
+    
+    elif origin in (typing.Union, types.UnionType):
+        # only optional types are unambiguous
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            preparer = _preparer(options[0])
+    
+    _preparers[annotation] = preparer
+    return preparer
+
+
+class JSONCodec:
+    """Encodes and decodes models with pydantic-core."""
+    
+    name: str = "pydantic"
+    media_type: str = "application/json"
+    
+    def encode(self, model: BaseModel, indent: int | None = None) -> bytes:
+        return model.__pydantic_serializer__.to_json(model, indent=indent)
+    
+    def decode(self, data: bytes | str, model: type[M]) -> M:
+        return model.model_validate_json(data)
+    
+    def parse(self, data: bytes | str) -> Any:
+        return json.loads(data)
+    
+    def decode_memoized(self, data: bytes | str, model: type[M]) -> M:
+        """Decodes data with many repeated RIDs (such as saved event queues).
+        
+        Every distinct RID string is parsed once and the RID objects are shared. Models are still fully validated.
+        """
+        return self._decode_parsed(data, model)
+    
+    def _decode_parsed(self, data: bytes | str, model: type[M]) -> M:
+        try:
+            obj = self.parse(data)
+        except ValueError as e:
+            raise self._invalid(data, model, e)
+        
+        preparer = _preparer(model)
+        if preparer:
+            obj = preparer(obj, {})
+        return model.model_validate(obj)
+    
+    def _invalid(self, data: bytes | str, model: type[BaseModel], error: ValueError) -> ValidationError:
+        # reported like pydantic reports invalid JSON
+        return ValidationError.from_exception_data(model.__name__, [{
+            "type": "json_invalid", "loc": (), "input": data, "ctx": {"error": str(error)}
+        }])
+
+
+class OrjsonCodec(JSONCodec):
+    """Parses JSON with `orjson`, then validates models from the parsed objects (parsing every distinct RID once)."""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+    
+    def parse(self, data: bytes | str) -> Any:
+        return self._loads(data)
+    
+    def decode(self, data: bytes | str, model: type[M]) -> M:
+        return self._decode_parsed(data, model)
+
+
+class MsgspecCodec(JSONCodec):
+    """Parses JSON with `msgspec`, then validates models from the parsed objects (parsing every distinct RID once)."""
+    
+    name = "msgspec"
+    
+    def __init__(self):
+        import msgspec
+        self._loads = msgspec.json.decode
+    
+    def parse(self, data: bytes | str) -> Any:
+        return self._loads(data)
+    
+    def decode(self, data: bytes | str, model: type[M]) -> M:
+        return self._decode_parsed(data, model)
+
+
+class MsgpackCodec(JSONCodec):
+    """Encodes and decodes models as MessagePack with `msgspec`.
+    
+    Models are dumped to the same structure as their JSON, except timestamps are encoded as MessagePack timestamps instead of strings. Decoding validates models from the parsed objects (parsing every distinct RID once), like the JSON codecs.
+    """
+    
+    name = "msgpack"
+    media_type = MSGPACK_MEDIA_TYPE
+    
+    def __init__(self):
+        import msgspec
+        self._dumps = msgspec.msgpack.Encoder().encode
+        self._loads = msgspec.msgpack.Decoder().decode
+    
+    def encode(self, model: BaseModel, indent: int | None = None) -> bytes:
+        return self._dumps(model.model_dump())
+    
+    def parse(self, data: bytes | str) -> Any:
+        return self._loads(data)
+    
+    def decode(self, data: bytes | str, model: type[M]) -> M:
+        return self._decode_parsed(data, model)
+    
+    def _invalid(self, data: bytes | str, model: type[BaseModel], error: ValueError) -> ValidationError:
+        return ValidationError.from_exception_data(model.__name__, [{
+            "type": "value_error", "loc": (), "input": data, "ctx": {"error": error}
+        }])
+
+
+CODECS: dict[str, type[JSONCodec]] = {
+    codec.name: codec for codec in (MsgspecCodec, OrjsonCodec, JSONCodec)
+}
+
+def get_codec(name: str | None = None) -> JSONCodec:
+    """Returns the codec named `name`, or the fastest codec installed if `None`.
+    
+    Falls back to the pydantic codec if the named codec's package isn't installed.
+    """
+    if name is None:
+        name = next(
+            codec for codec in CODECS
+            if codec == JSONCodec.name or importlib.util.find_spec(codec)
+        )
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec '{name}', expected one of {list(CODECS)}")
+    
+    try:
+        return CODECS[name]()
+    except ImportError:
+        logger.warning(f"JSON codec '{name}' requires the '{name}' package, falling back to '{JSONCodec.name}'")
+        return JSONCodec()
+
+def get_msgpack_codec() -> MsgpackCodec | None:
+    """Returns the MessagePack codec, or `None` if `msgspec` isn't installed."""
+    try:
+        return MsgpackCodec()
+    except ImportError:
+        return None
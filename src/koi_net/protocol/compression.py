@@ -0,0 +1,111 @@
+"""Content codings for compressing request and response bodies.
+
+gzip is always supported, zstd is supported if `zstandard` is installed (it is also what httpx uses to decode zstd responses).
+"""
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def supported_encodings() -> list[str]:
+    """Returns the content codings this node can compress and decompress, in order of preference."""
+    return [ZSTD, GZIP] if zstandard else [GZIP]
+
+def parse_qvalues(header: str | None) -> dict[str, float]:
+    """Parses an `Accept` or `Accept-Encoding` header into its (lowercase) values and their q-values."""
+    accepted: dict[str, float] = {}
+    for item in (header or "").split(","):
+        value, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, q_value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(q_value)
+                except ValueError:
+                    q = 0.0
+        if value.strip():
+            accepted[value.strip().lower()] = q
+    return accepted
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Returns the preferred supported coding allowed by an `Accept-Encoding` header, or `None`."""
+    accepted = parse_qvalues(accept_encoding)
+    for coding in supported_encodings():
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == ZSTD and zstandard:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported content coding '{encoding}'")
+
+def decompress(data: bytes, encoding: str, max_size: int | None = None) -> bytes:
+    """Decompresses data, raising `ValueError` if it is invalid.
+    
+    Stops after `max_size + 1` bytes, so callers can reject data decompressing to more than `max_size` bytes without decompressing all of it.
+    """
+    limit = max_size + 1 if max_size is not None else None
+    if encoding == GZIP:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            out = decompressor.decompress(data, limit or 0)
+        except zlib.error as e:
+            raise ValueError(f"Invalid gzip data: {e}") from e
+        if (limit is None or len(out) < limit) and not decompressor.eof:
+            raise ValueError("Invalid gzip data: truncated")
+        return out
+    
+    if encoding == ZSTD and zstandard:
+        chunks, size = [], 0
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                while (limit is None or size < limit) and (chunk := reader.read(_CHUNK_SIZE)):
+                    chunks.append(chunk)
+                    size += len(chunk)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Invalid zstd data: {e}") from e
+        return b"".join(chunks)[:limit]
+    
+    raise ValueError(f"Unsupported content coding '{encoding}'")
+
+
+class StreamCompressor:
+    """Compresses a stream of chunks, flushing after each chunk so the receiver can decompress it as soon as it arrives."""
+    
+    encoding: str
+    
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == GZIP:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush_mode, self._finish_mode = zlib.Z_SYNC_FLUSH, zlib.Z_FINISH
+        elif encoding == ZSTD and zstandard:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._finish_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH
+        else:
+            raise ValueError(f"Unsupported content coding '{encoding}'")
+    
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(self._flush_mode)
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush(self._finish_mode)
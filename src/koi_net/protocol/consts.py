@@ -4,4 +4,7 @@ BROADCAST_EVENTS_PATH = "/events/broadcast"
 POLL_EVENTS_PATH      = "/events/poll"
 FETCH_RIDS_PATH       = "/rids/fetch"
 FETCH_MANIFESTS_PATH  = "/manifests/fetch"
-FETCH_BUNDLES_PATH    = "/bundles/fetch"
\ No newline at end of file
+FETCH_BUNDLES_PATH    = "/bundles/fetch"
+
+NDJSON_MEDIA_TYPE     = "application/x-ndjson"
+MSGPACK_MEDIA_TYPE    = "application/msgpack"
\ No newline at end of file
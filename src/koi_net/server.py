@@ -0,0 +1,331 @@
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Callable, Iterator
+from pydantic import BaseModel, ValidationError
+
+try:
+    import uvicorn
+    from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.exceptions import RequestValidationError
+    from fastapi.responses import StreamingResponse
+except ImportError as e:
+    raise ImportError(
+        "koi_net.server requires 'fastapi' and 'uvicorn', install them with 'pip install koi-net[server]'"
+    ) from e
+
+from .core import NodeInterface
+from .processor.knowledge_object import KnowledgeSource
+from .protocol.codec import JSONCodec, MsgpackCodec
+from .protocol.compression import (
+    StreamCompressor,
+    compress,
+    decompress,
+    negotiate,
+    parse_qvalues,
+    supported_encodings
+)
+from .protocol.api_models import (
+    PollEvents,
+    FetchRids,
+    FetchManifests,
+    FetchBundles,
+    EventsPayload,
+    RidsPayload,
+    ManifestsPayload,
+    BundlesPayload
+)
+from .protocol.consts import (
+    BROADCAST_EVENTS_PATH,
+    POLL_EVENTS_PATH,
+    FETCH_RIDS_PATH,
+    FETCH_MANIFESTS_PATH,
+    FETCH_BUNDLES_PATH,
+    NDJSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResponse(Response):
+    """Response rendered directly by a codec (with its media type), skipping FastAPI's response model validation and encoding.
+    
+    If `encoding` is set, bodies of at least `min_size` bytes are compressed with it.
+    """
+    
+    media_type = "application/json"
+    
+    def __init__(
+        self,
+        content: BaseModel,
+        codec: JSONCodec | None = None,
+        encoding: str | None = None,
+        min_size: int | None = None,
+        **kwargs
+    ):
+        self.codec = codec or JSONCodec()
+        self.encoding = encoding
+        self.min_size = min_size
+        self.content_encoding = None
+        kwargs.setdefault("media_type", self.codec.media_type)
+        super().__init__(content, **kwargs)
+        if self.content_encoding:
+            self.headers["Content-Encoding"] = self.content_encoding
+    
+    def render(self, content: BaseModel) -> bytes:
+        body = self.codec.encode(content)
+        if self.encoding and self.min_size is not None and len(body) >= self.min_size:
+            self.content_encoding = self.encoding
+            return compress(body, self.encoding)
+        return body
+
+
+def _prefers_msgpack(accept: str | None) -> bool:
+    """Returns whether an `Accept` header prefers MessagePack to JSON. MessagePack has to be listed explicitly, JSON stays the default."""
+    accepted = parse_qvalues(accept)
+    msgpack_q = accepted.get(MSGPACK_MEDIA_TYPE, 0.0)
+    json_q = accepted.get("application/json", accepted.get("application/*", accepted.get("*/*", 0.0)))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+def _inline_refs(schema, defs: dict):
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(value, defs) for value in schema]
+    return schema
+
+def _request_body(model: type[BaseModel], media_types: list[str]) -> dict:
+    """Documents a request body in the OpenAPI schema for routes reading it from the raw request."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    schema = _inline_refs(schema, defs)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": schema} for media_type in media_types}
+        }
+    }
+
+def _responses(model: type[BaseModel], media_types: list[str]) -> dict:
+    """Documents the media types of a successful response besides JSON, referencing the response model's schema (added to the OpenAPI components by FastAPI)."""
+    schema = {"$ref": f"#/components/schemas/{model.__name__}"}
+    return {200: {"content": {media_type: {"schema": schema} for media_type in media_types}}}
+
+
+class NodeServer:
+    """ASGI server exposing the KOI-net protocol API of a full node.
+    
+    `app` is a FastAPI app with the protocol endpoints mounted under `config.server.path`, which starts and stops the node with its lifespan. Route handlers are async: request bodies are read with a size limit of `max_body_size` bytes and decoded directly from bytes by the node's codec (`node.network.codec`), responses are encoded by the codec without being revalidated, and blocking work (cache reads, event queues, processing) runs in the threadpool. Events received through a broadcast are queued for processing all at once. Fetch endpoints stream NDJSON responses when the request accepts them.
+    
+    Request bodies may be compressed with any coding in `supported_encodings()` (gzip, and zstd if `zstandard` is installed), which every response advertises in its `Accept-Encoding` header (RFC 7694). Responses of at least `compression_threshold` bytes are compressed with the client's preferred coding, streamed responses are compressed whenever the client accepts it, flushing after each line. Compression runs in the threadpool, with response encoding.
+    
+    If `msgspec` is installed, request bodies may also be MessagePack (`Content-Type: application/msgpack`), and responses are encoded as MessagePack for requests preferring it in their `Accept` header. Streamed responses are always NDJSON.
+    """
+    
+    node: NodeInterface
+    codec: JSONCodec
+    msgpack_codec: MsgpackCodec | None
+    max_body_size: int
+    compression_threshold: int | None
+    app: FastAPI
+    router: APIRouter
+    
+    def __init__(
+        self,
+        node: NodeInterface,
+        max_body_size: int | None = None,
+        compression_threshold: int | None = None
+    ):
+        self.node = node
+        self.codec = node.network.codec
+        self.msgpack_codec = node.network.msgpack_codec
+        self.max_body_size = max_body_size or node.config.server.max_body_size
+        self.compression_threshold = (
+            compression_threshold if compression_threshold is not None
+            else node.config.server.compression_threshold
+        )
+        self._headers = {
+            "Accept-Encoding": ", ".join(supported_encodings()),
+            "Vary": "Accept-Encoding, Accept"
+        }
+        self._flush_lock = threading.Lock()
+        
+        self.router = APIRouter(prefix=node.config.server.path or "")
+        self._add_route(BROADCAST_EVENTS_PATH, self.broadcast_events, EventsPayload, None)
+        self._add_route(POLL_EVENTS_PATH, self.poll_events, PollEvents, EventsPayload)
+        self._add_route(FETCH_RIDS_PATH, self.fetch_rids, FetchRids, RidsPayload, streamed=True)
+        self._add_route(FETCH_MANIFESTS_PATH, self.fetch_manifests, FetchManifests, ManifestsPayload, streamed=True)
+        self._add_route(FETCH_BUNDLES_PATH, self.fetch_bundles, FetchBundles, BundlesPayload, streamed=True)
+        
+        self.app = FastAPI(
+            lifespan=self.lifespan,
+            title="KOI-net Protocol API",
+            version="1.0.0"
+        )
+        self.app.include_router(self.router)
+    
+    def _add_route(
+        self,
+        path: str,
+        endpoint: Callable,
+        request_model: type[BaseModel],
+        response_model: type[BaseModel] | None,
+        streamed: bool = False
+    ):
+        """Adds a protocol endpoint, documenting the media types it reads and responds with (MessagePack if `msgspec` is installed, NDJSON if `streamed`)."""
+        msgpack = [MSGPACK_MEDIA_TYPE] if self.msgpack_codec else []
+        response_media_types = msgpack + [NDJSON_MEDIA_TYPE] if streamed else msgpack
+        responses = None
+        if response_model and response_media_types:
+            responses = _responses(response_model, response_media_types)
+        
+        self.router.add_api_route(
+            path,
+            endpoint,
+            methods=["POST"],
+            response_model=response_model,
+            responses=responses,
+            openapi_extra=_request_body(request_model, ["application/json", *msgpack])
+        )
+    
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        await run_in_threadpool(self.node.start)
+        yield
+        await run_in_threadpool(self.node.stop)
+        await self.node.network.async_request_handler.aclose()
+    
+    async def _read_model(self, request: Request, model: type[BaseModel]) -> BaseModel:
+        """Reads a request body of at most `max_body_size` bytes (decompressed) and parses it into a model with the codec for its `Content-Type`."""
+        codec = self.codec
+        if request.headers.get("Content-Type", "").startswith(MSGPACK_MEDIA_TYPE):
+            if not self.msgpack_codec:
+                raise HTTPException(
+                    status_code=415,
+                    detail="MessagePack requests are not supported",
+                    headers=self._headers
+                )
+            codec = self.msgpack_codec
+        
+        encoding = request.headers.get("Content-Encoding", "identity").strip().lower()
+        if encoding != "identity" and encoding not in supported_encodings():
+            raise HTTPException(
+                status_code=415,
+                detail=f"Unsupported content coding '{encoding}'",
+                headers=self._headers
+            )
+        
+        content_length = request.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > self.max_body_size:
+                raise HTTPException(status_code=413, detail="Request body too large")
+        
+        if encoding != "identity":
+            try:
+                body = decompress(bytes(body), encoding, self.max_body_size)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if len(body) > self.max_body_size:
+                raise HTTPException(status_code=413, detail="Request body too large")
+        
+        try:
+            return codec.decode(bytes(body), model)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            for error in errors:
+                # undecodable bodies (binary, or invalid UTF-8) can't be echoed back in a JSON error response
+                if isinstance(error.get("input"), bytes):
+                    del error["input"]
+            raise RequestValidationError(errors)
+    
+    async def _respond(self, request: Request, handler: Callable[[BaseModel], BaseModel], req: BaseModel) -> Response:
+        """Runs a request handler in the threadpool, encoding (and compressing) its response there too."""
+        codec = self.codec
+        if self.msgpack_codec and _prefers_msgpack(request.headers.get("Accept")):
+            codec = self.msgpack_codec
+        encoding = negotiate(request.headers.get("Accept-Encoding"))
+        return await run_in_threadpool(lambda: ModelResponse(
+            handler(req),
+            codec,
+            encoding=encoding,
+            min_size=self.compression_threshold,
+            headers=self._headers
+        ))
+    
+    def _stream(self, request: Request, lines: Iterator[bytes]) -> Response:
+        """Streams NDJSON lines, compressed if the client accepts it."""
+        headers = dict(self._headers)
+        encoding = negotiate(request.headers.get("Accept-Encoding"))
+        if encoding and self.compression_threshold is not None:
+            lines = self._compress_stream(lines, encoding)
+            headers["Content-Encoding"] = encoding
+        return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    
+    @staticmethod
+    def _compress_stream(lines: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+        compressor = StreamCompressor(encoding)
+        for line in lines:
+            yield compressor.compress(line)
+        yield compressor.finish()
+    
+    def _process_events(self, req: EventsPayload):
+        self.node.processor.handle_many(events=req.events, source=KnowledgeSource.External)
+        
+        # nodes without processor threads process received events right away
+        if not self.node.use_kobj_processor_thread:
+            with self._flush_lock:
+                self.node.processor.flush_kobj_queue()
+    
+    async def broadcast_events(self, request: Request, response: Response):
+        response.headers.update(self._headers)
+        req = await self._read_model(request, EventsPayload)
+        logger.info(f"Request to {BROADCAST_EVENTS_PATH}, received {len(req.events)} event(s)")
+        
+        if self.node.use_kobj_processor_thread:
+            self._process_events(req)
+        else:
+            await run_in_threadpool(self._process_events, req)
+    
+    async def poll_events(self, request: Request) -> Response:
+        req = await self._read_model(request, PollEvents)
+        logger.info(f"Request to {POLL_EVENTS_PATH}")
+        return await self._respond(request, self.node.network.handle_poll, req)
+    
+    async def fetch_rids(self, request: Request) -> Response:
+        req = await self._read_model(request, FetchRids)
+        response_handler = self.node.network.response_handler
+        if NDJSON_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return self._stream(request, response_handler.stream_rids(req))
+        return await self._respond(request, response_handler.fetch_rids, req)
+    
+    async def fetch_manifests(self, request: Request) -> Response:
+        req = await self._read_model(request, FetchManifests)
+        response_handler = self.node.network.response_handler
+        if NDJSON_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return self._stream(request, response_handler.stream_manifests(req))
+        return await self._respond(request, response_handler.fetch_manifests, req)
+    
+    async def fetch_bundles(self, request: Request) -> Response:
+        req = await self._read_model(request, FetchBundles)
+        response_handler = self.node.network.response_handler
+        if NDJSON_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return self._stream(request, response_handler.stream_bundles(req))
+        return await self._respond(request, response_handler.fetch_bundles, req)
+    
+    def run(self, **kwargs):
+        """Runs the server with uvicorn on the host and port set in `config.server`, kwargs are passed to `uvicorn.run`."""
+        uvicorn.run(
+            self.app,
+            host=self.node.config.server.host,
+            port=self.node.config.server.port,
+            **kwargs
+        )
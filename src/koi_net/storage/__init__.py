@@ -0,0 +1,5 @@
+from .backend import CacheBackend
+from .file_cache import FileCache
+from .sqlite_cache import SQLiteCache
+from .change_log import ChangeLog
+from .helpers import read_manifest, list_manifests, list_rids_page
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from rid_lib import RID
+from rid_lib.core import RIDType
+from rid_lib.ext import Cache, Manifest
+
+
+class CacheBackend(Cache, ABC):
+    """RID cache which reads manifests without loading contents, and lists RIDs in pages.
+    
+    Implemented by `FileCache` and `SQLiteCache`. Plain `Cache` instances are supported through the helpers in `koi_net.storage`, which fall back to reading bundles and listing every RID.
+    """
+    
+    @abstractmethod
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        """Reads and returns only the manifest of a cached bundle."""
+    
+    @abstractmethod
+    def list_manifests(self, rid_types: list[RIDType] | None = None) -> list[Manifest]:
+        """Returns manifests of all cached bundles (of the specified types)."""
+    
+    @abstractmethod
+    def list_rids_page(
+        self,
+        rid_types: list[RIDType] | None = None,
+        after: str | None = None,
+        limit: int = 0
+    ) -> list[RID]:
+        """Returns up to `limit` (all if `0`) RIDs (of the specified types) ordered by RID string, starting after the RID string `after`."""
@@ -0,0 +1,65 @@
+import threading
+import uuid
+from collections import OrderedDict
+from rid_lib import RID
+
+
+class ChangeLog:
+    """Latest change (write or delete) to each RID in the cache, to answer which RIDs changed since a watermark.
+    
+    Watermarks are `"<epoch>:<seq>"` strings, the epoch changes whenever the log is recreated. At most `max_entries` RIDs are kept, dropping the oldest changes first.
+    """
+    
+    epoch: str
+    seq: int
+    max_entries: int
+    
+    def __init__(self, max_entries: int = 10000):
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self.max_entries = max_entries
+        
+        # RIDs mapped to the sequence number of their latest change, in order of change
+        self._changes: OrderedDict[RID, int] = OrderedDict()
+        # highest sequence number dropped from the log
+        self._horizon = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def watermark(self) -> str:
+        """Returns the position of the latest change."""
+        return f"{self.epoch}:{self.seq}"
+    
+    def record(self, rid: RID):
+        """Records a change to an RID."""
+        with self._lock:
+            self.seq += 1
+            self._changes.pop(rid, None)
+            self._changes[rid] = self.seq
+            
+            while len(self._changes) > self.max_entries:
+                _, seq = self._changes.popitem(last=False)
+                self._horizon = seq
+    
+    def changed_since(self, watermark: str) -> tuple[list[RID], str] | None:
+        """Returns RIDs changed after `watermark` (in order of their latest change) and the current watermark.
+        
+        Returns `None` if the changes can't be determined, because the watermark is from a different epoch or older changes have been dropped.
+        """
+        epoch, _, seq = watermark.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        
+        with self._lock:
+            if not self._horizon <= seq <= self.seq:
+                return None
+            
+            rids = []
+            for rid in reversed(self._changes):
+                if self._changes[rid] <= seq:
+                    break
+                rids.append(rid)
+            rids.reverse()
+            
+            return rids, self.watermark
@@ -0,0 +1,164 @@
+import bisect
+import heapq
+import os
+import shutil
+import threading
+from itertools import islice
+from rid_lib import RID
+from rid_lib.core import RIDType
+from rid_lib.ext import Bundle, Manifest
+from rid_lib.ext.utils import b64_encode
+from .backend import CacheBackend
+
+
+class FileCache(CacheBackend):
+    """Directory based RID cache with manifest sidecar files.
+    
+    Bundles are stored exactly like `Cache`, one JSON file per RID in `directory_path`. The manifest of each bundle is also written to a sidecar file in `manifest_directory_path` (`<directory_path>.manifests` by default), so `read_manifest` and `list_manifests` don't read contents. The sidecar is removed before a bundle is written or deleted and rewritten after writing, so an interrupted write never leaves a stale manifest. Missing sidecars (e.g. for bundles written by a plain `Cache`) are rebuilt from the bundle on first read, and sidecars without a bundle are ignored.
+    
+    `list_rids_page` pages through a sorted index of cached RIDs kept in memory, built on first use and updated by `write` and `delete`. The directory is only listed again if it was modified outside this cache.
+    """
+    
+    manifest_directory_path: str
+    
+    def __init__(
+        self,
+        directory_path: str,
+        manifest_directory_path: str | None = None
+    ):
+        if not directory_path:
+            raise ValueError("FileCache requires a 'directory_path' (set 'cache_directory_path' or 'cache_database_path' in the config)")
+        super().__init__(directory_path)
+        self.manifest_directory_path = (
+            manifest_directory_path or
+            directory_path.rstrip("/\\") + ".manifests"
+        )
+        # sorted RID strings by RID type, and the directory modification time they were listed at
+        self._rid_index: dict[RIDType, list[str]] | None = None
+        self._rid_index_mtime: int | None = None
+        self._rid_index_lock = threading.Lock()
+    
+    def manifest_path_to(self, rid: RID) -> str:
+        encoded_rid_str = b64_encode(str(rid))
+        return f"{self.manifest_directory_path}/{encoded_rid_str}.json"
+    
+    def _write_manifest(self, manifest: Manifest):
+        os.makedirs(self.manifest_directory_path, exist_ok=True)
+        with open(self.manifest_path_to(manifest.rid), "w", encoding="utf-8") as f:
+            f.write(manifest.model_dump_json())
+    
+    def _delete_manifest(self, rid: RID):
+        try:
+            os.remove(self.manifest_path_to(rid))
+        except FileNotFoundError:
+            return
+    
+    def _directory_mtime(self) -> int | None:
+        try:
+            return os.stat(self.directory_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _load_rid_index(self) -> dict[RIDType, list[str]]:
+        """Returns the RID index, listing the directory if it was modified outside this cache. Call with `_rid_index_lock` held."""
+        mtime = self._directory_mtime()
+        if self._rid_index is None or mtime != self._rid_index_mtime:
+            index: dict[RIDType, list[str]] = {}
+            for rid in self.list_rids():
+                index.setdefault(type(rid), []).append(str(rid))
+            for rid_strs in index.values():
+                rid_strs.sort()
+            self._rid_index, self._rid_index_mtime = index, mtime
+        return self._rid_index
+    
+    def _update_rid_index(self, rid: RID, exists: bool):
+        with self._rid_index_lock:
+            if self._rid_index is None:
+                return
+            rid_strs = self._rid_index.setdefault(type(rid), [])
+            rid_str = str(rid)
+            i = bisect.bisect_left(rid_strs, rid_str)
+            found = i < len(rid_strs) and rid_strs[i] == rid_str
+            if exists and not found:
+                rid_strs.insert(i, rid_str)
+            elif not exists and found:
+                del rid_strs[i]
+            self._rid_index_mtime = self._directory_mtime()
+    
+    def write(self, cache_bundle: Bundle) -> Bundle:
+        """Writes bundle and its manifest sidecar to cache, returns a Bundle."""
+        self._delete_manifest(cache_bundle.rid)
+        super().write(cache_bundle)
+        self._write_manifest(cache_bundle.manifest)
+        self._update_rid_index(cache_bundle.rid, exists=True)
+        return cache_bundle
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        """Reads and returns the manifest of a cached bundle from its sidecar.
+        
+        Sidecars of bundles deleted outside the cache are removed, and the bundle treated as missing."""
+        try:
+            with open(self.manifest_path_to(rid), "r", encoding="utf-8") as f:
+                manifest = Manifest.model_validate_json(f.read())
+        except FileNotFoundError:
+            manifest = None
+        
+        if manifest:
+            if self.exists(rid):
+                return manifest
+            self._delete_manifest(rid)
+            return None
+        
+        bundle = self.read(rid)
+        if not bundle:
+            return None
+        
+        self._write_manifest(bundle.manifest)
+        return bundle.manifest
+    
+    def list_manifests(self, rid_types: list[RIDType] | None = None) -> list[Manifest]:
+        """Returns manifests of all cached bundles (of the specified types)."""
+        manifests = []
+        for rid in self.list_rids(rid_types):
+            manifest = self.read_manifest(rid)
+            if manifest:
+                manifests.append(manifest)
+        return manifests
+    
+    def list_rids_page(
+        self, 
+        rid_types: list[RIDType] | None = None,
+        after: str | None = None,
+        limit: int = 0
+    ) -> list[RID]:
+        """Returns up to `limit` (all if `0`) RIDs ordered by RID string, starting after the RID string `after`."""
+        with self._rid_index_lock:
+            index = self._load_rid_index()
+            if rid_types:
+                groups = [index.get(rid_type, []) for rid_type in rid_types]
+            else:
+                groups = list(index.values())
+            
+            tails = []
+            for rid_strs in groups:
+                start = bisect.bisect_right(rid_strs, after) if after else 0
+                tails.append(map(rid_strs.__getitem__, range(start, len(rid_strs))))
+            page = list(islice(heapq.merge(*tails), limit or None))
+        
+        return [RID.from_string(rid_str) for rid_str in page]
+    
+    def delete(self, rid: RID) -> None:
+        """Deletes cache bundle and its manifest sidecar."""
+        self._delete_manifest(rid)
+        super().delete(rid)
+        self._update_rid_index(rid, exists=False)
+    
+    def drop(self) -> None:
+        """Deletes all cache bundles and manifest sidecars."""
+        super().drop()
+        with self._rid_index_lock:
+            self._rid_index = None
+        try:
+            shutil.rmtree(self.manifest_directory_path)
+        except FileNotFoundError:
+            return
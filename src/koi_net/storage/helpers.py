@@ -0,0 +1,53 @@
+import heapq
+from rid_lib import RID
+from rid_lib.core import RIDType
+from rid_lib.ext import Cache, Manifest
+from .backend import CacheBackend
+
+
+def read_manifest(cache: Cache, rid: RID) -> Manifest | None:
+    """Reads only the manifest of a cached RID.
+    
+    Uses `read_manifest` of a `CacheBackend` (avoiding loading the contents), otherwise reads the full bundle."""
+    if isinstance(cache, CacheBackend):
+        return cache.read_manifest(rid)
+    
+    bundle = cache.read(rid)
+    if bundle:
+        return bundle.manifest
+
+
+def list_manifests(cache: Cache, rid_types: list[RIDType] | None = None) -> list[Manifest]:
+    """Returns manifests of all cached RIDs (of the specified types).
+    
+    Uses `list_manifests` of a `CacheBackend`, otherwise reads each manifest with `read_manifest`."""
+    if isinstance(cache, CacheBackend):
+        return cache.list_manifests(rid_types)
+    
+    manifests = []
+    for rid in cache.list_rids(rid_types):
+        manifest = read_manifest(cache, rid)
+        if manifest:
+            manifests.append(manifest)
+    return manifests
+
+
+def list_rids_page(
+    cache: Cache, 
+    rid_types: list[RIDType] | None = None,
+    after: str | None = None,
+    limit: int = 0
+) -> list[RID]:
+    """Returns up to `limit` (all if `0`) cached RIDs (of the specified types) ordered by RID string, starting after the RID string `after`.
+    
+    Uses `list_rids_page` of a `CacheBackend`, otherwise lists all RIDs and selects the page."""
+    if isinstance(cache, CacheBackend):
+        return cache.list_rids_page(rid_types, after, limit)
+    
+    rids = cache.list_rids(rid_types)
+    if after is not None:
+        rids = [rid for rid in rids if str(rid) > after]
+    
+    if limit:
+        return heapq.nsmallest(limit, rids, key=str)
+    return sorted(rids, key=str)
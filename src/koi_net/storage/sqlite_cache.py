@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+from rid_lib import RID
+from rid_lib.core import RIDType
+from rid_lib.ext import Bundle, Manifest
+from .backend import CacheBackend
+
+
+class SQLiteCache(CacheBackend):
+    """RID cache stored in a single SQLite database file.
+    
+    Drop-in replacement for the directory based `Cache`, with `directory_path` set to the directory holding the database. The database runs in WAL mode so reads don't block on writes, and each thread uses its own connection. RIDs are indexed by RID type for `list_rids`, `list_rids_page` pages through RIDs with a single indexed query, and manifests are stored separately from bundles so `read_manifest` doesn't load contents.
+    """
+    
+    database_path: str
+    
+    def __init__(self, database_path: str):
+        super().__init__(os.path.dirname(database_path) or ".")
+        self.database_path = database_path
+        self._local = threading.local()
+        os.makedirs(self.directory_path, exist_ok=True)
+        
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bundles (
+                    rid TEXT PRIMARY KEY,
+                    rid_type TEXT NOT NULL,
+                    manifest TEXT NOT NULL,
+                    bundle TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS bundles_rid_type ON bundles (rid_type)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _row(bundle: Bundle) -> tuple[str, str, str, str]:
+        return (
+            str(bundle.rid),
+            str(type(bundle.rid)),
+            bundle.manifest.model_dump_json(),
+            bundle.model_dump_json()
+        )
+    
+    def write(self, cache_bundle: Bundle) -> Bundle:
+        """Writes bundle to cache, returns a Bundle."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO bundles VALUES (?, ?, ?, ?)",
+                self._row(cache_bundle)
+            )
+        return cache_bundle
+    
+    def exists(self, rid: RID) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM bundles WHERE rid = ?", (str(rid),)
+        ).fetchone()
+        return row is not None
+    
+    def read(self, rid: RID) -> Bundle | None:
+        """Reads and returns bundle from RID cache."""
+        row = self._connection().execute(
+            "SELECT bundle FROM bundles WHERE rid = ?", (str(rid),)
+        ).fetchone()
+        if row:
+            return Bundle.model_validate_json(row[0])
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        """Reads and returns only the manifest of a bundle from RID cache."""
+        row = self._connection().execute(
+            "SELECT manifest FROM bundles WHERE rid = ?", (str(rid),)
+        ).fetchone()
+        if row:
+            return Manifest.model_validate_json(row[0])
+    
+    def _select(self, column: str, rid_types: list[RIDType] | None = None) -> sqlite3.Cursor:
+        if not rid_types:
+            return self._connection().execute(f"SELECT {column} FROM bundles")
+        
+        contexts = [str(rid_type) for rid_type in rid_types]
+        return self._connection().execute(
+            f"SELECT {column} FROM bundles WHERE rid_type IN ({', '.join('?' * len(contexts))})",
+            contexts
+        )
+    
+    def list_rids(self, rid_types: list[RIDType] | None = None) -> list[RID]:
+        return [
+            RID.from_string(rid_str) 
+            for rid_str, in self._select("rid", rid_types)
+        ]
+    
+    def list_rids_page(
+        self, 
+        rid_types: list[RIDType] | None = None,
+        after: str | None = None,
+        limit: int = 0
+    ) -> list[RID]:
+        """Returns up to `limit` (all if `0`) RIDs ordered by RID string, starting after the RID string `after`."""
+        query = "SELECT rid FROM bundles WHERE rid > ?"
+        params = [after or ""]
+        if rid_types:
+            query += f" AND rid_type IN ({', '.join('?' * len(rid_types))})"
+            params.extend(str(rid_type) for rid_type in rid_types)
+        query += " ORDER BY rid"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        return [
+            RID.from_string(rid_str)
+            for rid_str, in self._connection().execute(query, params)
+        ]
+    
+    def list_manifests(self, rid_types: list[RIDType] | None = None) -> list[Manifest]:
+        """Returns manifests of all cached bundles (of the specified types)."""
+        return [
+            Manifest.model_validate_json(manifest_json) 
+            for manifest_json, in self._select("manifest", rid_types)
+        ]
+    
+    def delete(self, rid: RID) -> None:
+        """Deletes cache bundle."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM bundles WHERE rid = ?", (str(rid),))
+    
+    def drop(self) -> None:
+        """Deletes all cache bundles."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM bundles")
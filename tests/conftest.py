@@ -0,0 +1,92 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+import pytest
+from rid_lib.types import KoiNetNode
+from koi_net import NodeInterface
+from koi_net.config import NodeConfig, KoiNetConfig
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Builds node configs storing everything under a temporary directory."""
+    def make_config(
+        name: str = "node",
+        node_type: NodeType = NodeType.FULL,
+        provides: NodeProvides | None = None,
+        **kwargs
+    ) -> NodeConfig:
+        config = NodeConfig(koi_net=KoiNetConfig(
+            node_name=name,
+            node_rid=KoiNetNode.generate(name),
+            node_profile=NodeProfile(
+                node_type=node_type,
+                provides=provides or NodeProvides(),
+                base_url=f"http://127.0.0.1/{name}" if node_type == NodeType.FULL else None
+            ),
+            cache_directory_path=str(tmp_path / f"{name}_cache"),
+            event_queues_path=str(tmp_path / f"{name}_event_queues.json"),
+            sync_watermarks_path=str(tmp_path / f"{name}_sync_watermarks.json"),
+            **kwargs
+        ))
+        return config
+    return make_config
+
+@pytest.fixture
+def make_node(make_config):
+    """Builds nodes (without processor threads by default), closing their clients after the test."""
+    nodes = []
+    def make_node(*args, use_kobj_processor_thread: bool | int = False, **kwargs) -> NodeInterface:
+        node = NodeInterface(make_config(*args, **kwargs), use_kobj_processor_thread=use_kobj_processor_thread)
+        nodes.append(node)
+        return node
+    yield make_node
+    for node in nodes:
+        node.network.request_handler.close()
+        node.network.async_request_handler.close()
+
+
+class Peer:
+    """Minimal HTTP server standing in for a remote node, answering every POST with `respond(path, body)`."""
+    
+    url: str
+    requests: list[tuple[str, dict]]
+    respond: Callable[[str, dict], tuple[int, dict | None]]
+    
+    def __init__(self):
+        self.requests = []
+        self.respond = lambda path, body: (200, None)
+        peer = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"null")
+                peer.requests.append((self.path, body))
+                status, payload = peer.respond(self.path, body)
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def peer():
+    peer = Peer()
+    yield peer
+    peer.close()
@@ -0,0 +1,68 @@
+import asyncio
+from rid_lib.types import KoiNetNode
+from koi_net.config import HTTPClientConfig
+from koi_net.network.async_request_handler import AsyncRequestHandler
+from koi_net.protocol.consts import FETCH_RIDS_PATH
+
+
+def test_handler_works_across_event_loops(peer):
+    rids = [str(KoiNetNode.generate(f"node-{i}")) for i in range(3)]
+    peer.respond = lambda path, body: (200, {"rids": rids})
+    handler = AsyncRequestHandler(None, None)
+    
+    async def fetch():
+        # concurrent requests contend for the semaphore
+        results = await asyncio.gather(*(handler.fetch_rids(url=peer.url) for _ in range(20)))
+        return [[str(rid) for rid in result.rids] for result in results]
+    
+    # each asyncio.run creates a new event loop
+    assert asyncio.run(fetch()) == [rids] * 20
+    assert asyncio.run(fetch()) == [rids] * 20
+    assert [path for path, _ in peer.requests] == [FETCH_RIDS_PATH] * 40
+    handler.close()
+
+def test_close_closes_clients_of_every_loop(peer):
+    peer.respond = lambda path, body: (200, {"rids": []})
+    handler = AsyncRequestHandler(None, None)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(handler.fetch_rids(url=peer.url))
+        client = loop.run_until_complete(_client(handler))
+        handler.close()
+        assert client.is_closed
+        assert loop.run_until_complete(_client(handler)) is not client
+    finally:
+        handler.close()
+        loop.close()
+
+async def _client(handler: AsyncRequestHandler):
+    return handler.client
+
+def test_node_stop_closes_async_clients(make_node, peer):
+    peer.respond = lambda path, body: (200, {"rids": []})
+    node = make_node()
+    node.start()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(node.network.async_request_handler.fetch_rids(url=peer.url))
+        client = loop.run_until_complete(_client(node.network.async_request_handler))
+        node.stop()
+        assert client.is_closed
+    finally:
+        loop.close()
+
+def test_requests_while_consuming_stream_dont_deadlock(peer):
+    rids = [str(KoiNetNode.generate(f"node-{i}")) for i in range(3)]
+    peer.respond = lambda path, body: (200, {"rids": rids})
+    handler = AsyncRequestHandler(None, None, client_config=HTTPClientConfig(max_concurrent_requests=1))
+    
+    async def fetch_while_streaming():
+        results = []
+        async for payload in handler.stream_rids(url=peer.url):
+            results.append(await asyncio.wait_for(handler.fetch_rids(url=peer.url), timeout=2))
+        return results
+    
+    try:
+        assert len(asyncio.run(fetch_while_streaming())) == 1
+    finally:
+        handler.close()
@@ -0,0 +1,144 @@
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.network.response_handler import ResponseHandler
+from koi_net.processor.handler import HandlerType
+from koi_net.processor.knowledge_object import KnowledgeObject
+from koi_net.protocol.api_models import FetchManifests, ManifestsPayload
+from koi_net.storage import ChangeLog
+
+
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"})
+    for i in range(4)
+]
+
+
+def test_changed_since_returns_latest_changes_in_order():
+    log = ChangeLog()
+    rids = [bundle.rid for bundle in BUNDLES]
+    log.record(rids[0])
+    log.record(rids[1])
+    watermark = log.watermark
+    
+    log.record(rids[2])
+    log.record(rids[0])
+    log.record(rids[2])
+    
+    changed, current = log.changed_since(watermark)
+    assert changed == [rids[0], rids[2]]
+    assert current == log.watermark
+    assert log.changed_since(current) == ([], current)
+
+def test_unknown_changes_return_none():
+    log = ChangeLog(max_entries=2)
+    rids = [bundle.rid for bundle in BUNDLES]
+    watermark = log.watermark
+    for rid in rids[:3]:
+        log.record(rid)
+    
+    # the first change was dropped
+    assert log.changed_since(watermark) is None
+    assert log.changed_since(ChangeLog().watermark) is None
+    assert log.changed_since("not a watermark") is None
+
+def test_fetch_manifests_since_watermark(make_node):
+    cache = make_node().cache
+    log = ChangeLog()
+    handler = ResponseHandler(cache, change_log=log)
+    for bundle in BUNDLES[:3]:
+        cache.write(bundle)
+        log.record(bundle.rid)
+    
+    # a first sync (empty watermark) gets every manifest and the watermark
+    full = handler.fetch_manifests(FetchManifests(since=""))
+    assert {m.rid for m in full.manifests} == {b.rid for b in BUNDLES[:3]}
+    assert full.watermark == log.watermark
+    
+    cache.write(BUNDLES[3])
+    log.record(BUNDLES[3].rid)
+    cache.delete(BUNDLES[0].rid)
+    log.record(BUNDLES[0].rid)
+    
+    delta = handler.fetch_manifests(FetchManifests(since=full.watermark))
+    assert [m.rid for m in delta.manifests] == [BUNDLES[3].rid]
+    assert delta.not_found == [BUNDLES[0].rid]
+    assert delta.watermark == log.watermark
+
+
+PEER = KoiNetNode.generate("peer")
+
+
+@pytest.fixture
+def catch_up_node(monkeypatch):
+    """Fakes the manifest stream and bundles of a peer a node catches up with."""
+    def catch_up_node(node, fetchable=BUNDLES):
+        node.requests = []
+        node.stream = [ManifestsPayload(manifests=[b.manifest for b in BUNDLES[:2]], watermark="w1")]
+        
+        def stream_manifests(since=None, **kwargs):
+            node.requests.append(since)
+            if isinstance(node.stream, Exception):
+                raise node.stream
+            yield from node.stream
+        
+        monkeypatch.setattr(node.network.request_handler, "stream_manifests", stream_manifests)
+        monkeypatch.setattr(
+            node.network, "fetch_remote_bundle",
+            lambda rid: next((b for b in fetchable if b.rid == rid), None))
+        return node
+    return catch_up_node
+
+def test_catch_up_moves_watermark_after_processing(make_node, catch_up_node):
+    node = catch_up_node(make_node())
+    assert node.processor.catch_up(PEER) == 2
+    assert node.network.sync_watermarks[PEER] == "w1"
+    assert all(node.cache.exists(b.rid) for b in BUNDLES[:2])
+    
+    node.stream = [ManifestsPayload(manifests=[], watermark="w2")]
+    node.processor.catch_up(PEER)
+    assert node.requests == ["", "w1"]
+    assert node.network.sync_watermarks[PEER] == "w2"
+
+@pytest.mark.parametrize("workers", [False, 2])
+@pytest.mark.parametrize("failure", ["unfetchable", "handler error"])
+def test_failed_catch_up_keeps_watermark(make_node, catch_up_node, workers, failure):
+    node = make_node(use_kobj_processor_thread=workers)
+    if failure == "unfetchable":
+        catch_up_node(node, fetchable=BUNDLES[:1])
+    else:
+        catch_up_node(node)
+        @node.processor.register_handler(HandlerType.Bundle, rid_types=[SlackMessage])
+        def fail(processor, kobj: KnowledgeObject):
+            if kobj.rid == BUNDLES[1].rid:
+                raise RuntimeError("handler error")
+    for thread in node.processor.worker_threads:
+        thread.start()
+    node.network.sync_watermarks[PEER] = "w0"
+    
+    if workers:
+        # waits for the worker threads to process the changes
+        node.processor.catch_up(PEER)
+    else:
+        node.processor.schedule_catch_up(PEER)
+        node.processor.flush_kobj_queue()
+    
+    assert node.requests == ["w0"]
+    assert node.network.sync_watermarks[PEER] == "w0"
+    assert node.cache.exists(BUNDLES[0].rid)
+
+def test_scheduled_catch_up_errors_are_contained(make_node, catch_up_node):
+    node = catch_up_node(make_node())
+    node.stream = ValueError("invalid response")
+    
+    @node.processor.register_handler(HandlerType.Bundle, rid_types=[SlackMessage])
+    def schedule(processor, kobj: KnowledgeObject):
+        # runs once the handler returns and the queue is empty
+        processor.schedule_catch_up(PEER)
+        assert node.requests == []
+    
+    node.processor.handle(bundle=BUNDLES[3])
+    node.processor.flush_kobj_queue()
+    assert node.requests == [""]
+    assert PEER not in node.network.sync_watermarks
+    assert node.cache.exists(BUNDLES[3].rid)
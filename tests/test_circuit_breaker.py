@@ -0,0 +1,96 @@
+import asyncio
+import time
+import httpx
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.network.circuit_breaker import CircuitBreaker, CircuitState
+from koi_net.protocol.event import Event, EventType
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+
+
+PEER = KoiNetNode.generate("peer")
+EVENT = Event.from_bundle(EventType.NEW, Bundle.generate(SlackMessage("T0", "C0", "1.000100"), {"text": "hello"}))
+
+
+def test_opens_after_threshold_and_backs_off():
+    breaker = CircuitBreaker(failure_threshold=2, base_delay=10, max_delay=25, jitter=0)
+    breaker.record_failure(PEER)
+    assert breaker.state(PEER) == CircuitState.CLOSED
+    assert breaker.allow(PEER)
+    
+    breaker.record_failure(PEER)
+    assert breaker.state(PEER) == CircuitState.OPEN
+    assert not breaker.allow(PEER)
+    assert 9 < breaker.retry_in(PEER) <= 10
+    
+    breaker.record_failure(PEER)
+    assert 19 < breaker.retry_in(PEER) <= 20
+    breaker.record_failure(PEER)
+    assert 24 < breaker.retry_in(PEER) <= 25
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(base_delay=0.01, jitter=0)
+    breaker.record_failure(PEER)
+    time.sleep(0.02)
+    assert breaker.is_available(PEER)
+    
+    assert breaker.allow(PEER)
+    assert breaker.state(PEER) == CircuitState.HALF_OPEN
+    assert not breaker.allow(PEER)
+    assert not breaker.is_available(PEER)
+    
+    breaker.record_success(PEER)
+    assert breaker.state(PEER) == CircuitState.CLOSED
+    assert breaker.allow(PEER) and breaker.stats() == {}
+
+
+@pytest.fixture
+def network(make_node, monkeypatch):
+    network = make_node().network
+    profile = NodeProfile(node_type=NodeType.FULL, base_url="http://peer", provides=NodeProvides())
+    monkeypatch.setattr(network.graph, "get_node_profile", lambda node: profile)
+    network.circuit_breaker.base_delay = 0.01
+    network.circuit_breaker.jitter = 0
+    network._get_queue(network.webhook_event_queue, PEER).put(EVENT)
+    
+    # the first flush fails and opens the circuit
+    def unreachable(node, events):
+        raise httpx.ConnectError("unreachable")
+    monkeypatch.setattr(network.request_handler, "broadcast_events", unreachable)
+    assert network.flush_webhook_queue(PEER) is False
+    assert network.circuit_breaker.state(PEER) == CircuitState.OPEN
+    time.sleep(0.02)
+    return network
+
+def test_probe_failing_with_other_error_reopens_circuit(network, monkeypatch):
+    def invalid(node, events):
+        raise ValueError("invalid response")
+    monkeypatch.setattr(network.request_handler, "broadcast_events", invalid)
+    
+    with pytest.raises(ValueError):
+        network.flush_webhook_queue(PEER)
+    assert network.circuit_breaker.state(PEER) == CircuitState.OPEN
+    
+    time.sleep(0.03)
+    monkeypatch.setattr(network.request_handler, "broadcast_events", lambda node, events: None)
+    assert network.flush_webhook_queue(PEER) is True
+    assert network.circuit_breaker.state(PEER) == CircuitState.CLOSED
+    assert network.webhook_event_queue[PEER].empty()
+
+def test_cancelled_async_probe_reopens_circuit(network, monkeypatch):
+    async def hanging(node, events):
+        await asyncio.sleep(10)
+    monkeypatch.setattr(network.async_request_handler, "broadcast_events", hanging)
+    
+    async def cancel_flush():
+        task = asyncio.create_task(network.flush_webhook_queue_async(PEER))
+        await asyncio.sleep(0.01)
+        assert network.circuit_breaker.state(PEER) == CircuitState.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(cancel_flush())
+    assert network.circuit_breaker.state(PEER) == CircuitState.OPEN
+    assert len(network.webhook_event_queue[PEER]) == 1
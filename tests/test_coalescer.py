@@ -0,0 +1,80 @@
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.config import EventLogConfig
+from koi_net.network.event_queue import EventCoalescer
+from koi_net.protocol.api_models import PollEvents
+from koi_net.protocol.event import Event, EventType
+
+
+PEER = KoiNetNode.generate("partial")
+
+
+def bundle(i: int, version: int = 0) -> Bundle:
+    return Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}", "version": version})
+
+def new(i, version=0): return Event.from_bundle(EventType.NEW, bundle(i, version))
+def update(i, version=0): return Event.from_bundle(EventType.UPDATE, bundle(i, version))
+def forget(i): return Event(rid=bundle(i).rid, event_type=EventType.FORGET)
+
+def summary(events: list[Event]) -> list[tuple]:
+    return [
+        (str(event.rid).rsplit("/", 1)[-1], event.event_type, event.contents and event.contents["version"])
+        for event in events
+    ]
+
+
+def test_updates_replace_earlier_events():
+    coalescer = EventCoalescer()
+    events = coalescer.coalesce([new(1), update(1, 1), update(2), update(2, 1), update(1, 2)])
+    
+    # NEW keeps its type with the latest state, ordered by the latest merged event
+    assert summary(events) == [("2.000100", EventType.UPDATE, 1), ("1.000100", EventType.NEW, 2)]
+    assert coalescer.stats() == {"events": 5, "coalesced": 3, "cancelled": 0}
+
+def test_new_then_forget_cancels_out():
+    coalescer = EventCoalescer()
+    events = coalescer.coalesce([new(1), update(1, 1), forget(1), update(2)])
+    
+    assert summary(events) == [("2.000100", EventType.UPDATE, 0)]
+    assert coalescer.stats() == {"events": 4, "coalesced": 3, "cancelled": 1}
+
+def test_forget_replaces_update():
+    events = EventCoalescer().coalesce([update(1), forget(1)])
+    assert summary(events) == [("1.000100", EventType.FORGET, None)]
+
+def test_new_after_forget_is_kept():
+    events = EventCoalescer().coalesce([update(1), forget(1), new(1, 1), update(1, 2)])
+    assert summary(events) == [("1.000100", EventType.FORGET, None), ("1.000100", EventType.NEW, 2)]
+
+def test_delivered_new_is_not_cancelled():
+    coalescer = EventCoalescer()
+    events = coalescer.coalesce([new(1), update(1, 1), forget(1), new(2), forget(2)], delivered=1)
+    
+    # the receiver may have applied the first NEW, only the undelivered pair cancels out
+    assert summary(events) == [("1.000100", EventType.FORGET, None)]
+    assert coalescer.stats()["cancelled"] == 1
+
+def test_network_coalesces_only_when_enabled(make_node):
+    batch = [new(1), update(1, 1)]
+    
+    assert len(make_node("plain").network._coalesce(batch)) == 2
+    network = make_node("coalescing", event_log=EventLogConfig(coalesce=True)).network
+    assert summary(network._coalesce(batch)) == [("1.000100", EventType.NEW, 1)]
+
+def test_redelivered_poll_page_keeps_forget(make_node):
+    network = make_node(event_log=EventLogConfig(coalesce=True)).network
+    queue = network._get_queue(network.poll_event_queue, PEER)
+    queue.put(new(1))
+    
+    page = network.handle_poll(PollEvents(rid=PEER, cursor=""))
+    assert summary(page.events) == [("1.000100", EventType.NEW, 0)]
+    
+    # the response was applied, but its cursor never made it into a later poll
+    queue.put(forget(1))
+    page = network.handle_poll(PollEvents(rid=PEER, cursor=""))
+    assert summary(page.events) == [("1.000100", EventType.FORGET, None)]
+    
+    queue.put(new(2))
+    queue.put(forget(2))
+    page = network.handle_poll(PollEvents(rid=PEER, cursor=page.next_cursor))
+    assert page.events == []
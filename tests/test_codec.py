@@ -0,0 +1,98 @@
+import json
+import pytest
+from pydantic import ValidationError
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.protocol import codec as codec_module
+from koi_net.protocol.api_models import BundlesPayload, EventsPayload, FetchBundles, FetchManifests
+from koi_net.protocol.codec import JSONCodec, MsgpackCodec, MsgspecCodec, OrjsonCodec, get_codec
+from koi_net.protocol.event import Event, EventType
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+CODEC_TYPES = {
+    JSONCodec: None,
+    OrjsonCodec: "orjson",
+    MsgspecCodec: "msgspec",
+    MsgpackCodec: "msgspec",
+}
+
+@pytest.fixture(params=list(CODEC_TYPES), ids=lambda codec: codec.__name__)
+def codec(request) -> JSONCodec:
+    if CODEC_TYPES[request.param]:
+        pytest.importorskip(CODEC_TYPES[request.param])
+    return request.param()
+
+RIDS = [SlackMessage("T0", "C0", f"{i}.000100") for i in range(3)]
+BUNDLE = Bundle.generate(RIDS[0], {"text": "hi", "nested": {"list": [1, 2.5, None]}})
+MODELS = [
+    EventsPayload(events=[
+        Event.from_bundle(EventType.NEW, BUNDLE),
+        Event.from_rid(EventType.FORGET, RIDS[1]),
+        Event.from_rid(EventType.FORGET, RIDS[1]),
+    ], next_cursor="3"),
+    BundlesPayload(bundles=[BUNDLE], not_found=[RIDS[2]], deferred=[]),
+    FetchManifests(rid_types=[KoiNetNode, SlackMessage], rids=RIDS),
+]
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: type(model).__name__)
+def test_codec_round_trip(codec: JSONCodec, model):
+    data = codec.encode(model)
+    assert isinstance(data, bytes)
+    assert codec.decode(data, type(model)) == model
+    assert codec.decode_memoized(data, type(model)) == model
+
+def test_codecs_share_repeated_rids(codec: JSONCodec):
+    decoded = codec.decode_memoized(codec.encode(MODELS[0]), EventsPayload)
+    assert decoded.events[1].rid is decoded.events[2].rid
+
+def test_json_codecs_encode_alike():
+    pytest.importorskip("msgspec")
+    pytest.importorskip("orjson")
+    model = MODELS[0]
+    for codec in (OrjsonCodec(), MsgspecCodec()):
+        assert codec.encode(model) == JSONCodec().encode(model)
+        assert codec.decode(JSONCodec().encode(model), EventsPayload) == model
+
+@pytest.mark.parametrize("data", [b"{not json", b""])
+def test_codec_rejects_malformed_data(codec: JSONCodec, data: bytes):
+    with pytest.raises(ValidationError):
+        codec.decode(data, EventsPayload)
+    with pytest.raises(ValidationError):
+        codec.decode_memoized(data, EventsPayload)
+
+@pytest.mark.parametrize("model, obj", [
+    (EventsPayload, {"events": "nope"}),
+    (EventsPayload, {"events": [{"rid": str(RIDS[0]), "event_type": "MAYBE"}]}),
+    (FetchBundles, {}),
+], ids=["wrong type", "unknown event type", "missing field"])
+def test_codec_rejects_invalid_models(codec: JSONCodec, model, obj: dict):
+    if isinstance(codec, MsgpackCodec):
+        data = msgspec.msgpack.encode(obj)
+    else:
+        data = json.dumps(obj).encode()
+    
+    with pytest.raises(ValidationError):
+        codec.decode(data, model)
+    with pytest.raises(ValidationError):
+        codec.decode_memoized(data, model)
+
+def test_get_codec():
+    assert type(get_codec("pydantic")) is JSONCodec
+    assert get_codec().name in codec_module.CODECS
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+def test_get_codec_falls_back_without_package(monkeypatch):
+    class MissingCodec(JSONCodec):
+        name = "missing"
+        def __init__(self):
+            raise ImportError("missing")
+    
+    monkeypatch.setitem(codec_module.CODECS, "missing", MissingCodec)
+    assert type(get_codec("missing")) is JSONCodec
@@ -0,0 +1,120 @@
+import os
+import time
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import SlackMessage
+from koi_net.network import event_queue
+from koi_net.network.event_queue import NodeEventQueue, MemoryEventQueue, DurableEventQueue
+from koi_net.protocol.event import Event, EventType
+
+
+def make_event(i: int) -> Event:
+    return Event.from_bundle(EventType.NEW, Bundle.generate(
+        SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"}))
+
+def rids(events: list[Event]) -> list:
+    return [event.rid for event in events]
+
+EVENTS = [make_event(i) for i in range(10)]
+
+
+def test_node_event_queue_is_abstract():
+    with pytest.raises(TypeError):
+        NodeEventQueue()
+
+@pytest.mark.parametrize("durable", [False, True])
+def test_read_ack_pop(durable, tmp_path):
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=3) if durable else MemoryEventQueue()
+    assert [queue.put(event) for event in EVENTS[:5]] == [0, 1, 2, 3, 4]
+    
+    # reads don't remove events
+    assert rids(queue.read(limit=2)) == rids(EVENTS[:2])
+    assert rids(queue.read(start=3)) == rids(EVENTS[3:5])
+    assert len(queue) == 5
+    
+    queue.ack(2)
+    assert rids(queue.read()) == rids(EVENTS[2:5])
+    assert rids(queue.read(start=0, limit=1)) == rids(EVENTS[2:3])
+    queue.ack(1)
+    assert queue.acked == 2
+    
+    assert rids(queue.pop(limit=2)) == rids(EVENTS[2:4])
+    assert rids(queue.pop()) == rids(EVENTS[4:5])
+    assert queue.empty() and queue.pop() == []
+    queue.close()
+
+def test_durable_queue_replays_unacknowledged_events(tmp_path):
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=3)
+    for event in EVENTS[:7]:
+        queue.put(event)
+    queue.ack(2)
+    epoch = queue.epoch
+    queue.close()
+    
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=3)
+    assert queue.epoch == epoch
+    assert (queue.acked, queue.sent, queue.end) == (2, 7, 7)
+    assert rids(queue.read()) == rids(EVENTS[2:7])
+    
+    # appends continue in the last segment
+    assert queue.put(EVENTS[7]) == 7
+    assert rids(queue.read(start=6)) == rids(EVENTS[6:8])
+    queue.close()
+
+def test_durable_queue_truncates_torn_write(tmp_path):
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=100)
+    for event in EVENTS[:3]:
+        queue.put(event)
+    queue.close()
+    
+    # a crash in the middle of writing the fourth event
+    segment = tmp_path / f"{0:020d}.log"
+    with open(segment, "ab") as f:
+        f.write(b'{"rid": "orn:slack.message:T0/C0/3.0001')
+    
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=100)
+    assert queue.end == 3
+    assert rids(queue.read()) == rids(EVENTS[:3])
+    assert segment.read_bytes().endswith(b"\n")
+    
+    assert queue.put(EVENTS[3]) == 3
+    assert rids(queue.read()) == rids(EVENTS[:4])
+    queue.close()
+
+def test_durable_queue_compacts_acknowledged_segments(tmp_path):
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=3)
+    for event in EVENTS[:8]:
+        queue.put(event)
+    
+    def segments():
+        return sorted(int(name.removesuffix(".log")) for name in os.listdir(tmp_path) if name.endswith(".log"))
+    
+    assert segments() == [0, 3, 6]
+    queue.ack(4)
+    assert segments() == [3, 6]
+    queue.ack(8)
+    assert segments() == [6]
+    
+    queue.close()
+    queue = DurableEventQueue(directory=str(tmp_path), segment_size=3)
+    assert queue.empty() and (queue.acked, queue.end) == (8, 8)
+    assert queue.put(EVENTS[8]) == 8
+    assert rids(queue.read()) == rids(EVENTS[8:9])
+    queue.close()
+
+def test_durable_queue_syncs_idle_tail(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(event_queue.os, "fsync", lambda fd: synced.append(fd))
+    queue = DurableEventQueue(directory=str(tmp_path), fsync_batch=100, fsync_interval=0.05)
+    
+    for event in EVENTS[:3]:
+        queue.put(event)
+    assert synced == []
+    
+    # no more writes, the timer syncs the burst
+    deadline = time.monotonic() + 2
+    while not synced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(synced) == 1
+    assert queue._unsynced == 0
+    queue.close()
@@ -0,0 +1,137 @@
+import threading
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.processor.fetch_batcher import FetchBatcher
+from koi_net.processor.handler import HandlerType, STOP_CHAIN
+from koi_net.processor.knowledge_object import KnowledgeObject, KnowledgeSource
+from koi_net.protocol.api_models import BundlesPayload
+from koi_net.protocol.event import EventType
+
+
+PROVIDERS = [KoiNetNode.generate(f"provider-{i}") for i in range(2)]
+TARGET = KoiNetNode.generate("target")
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"})
+    for i in range(5)
+]
+
+
+@pytest.fixture
+def node(make_node, monkeypatch):
+    node = make_node(fetch_batch_window=60)
+    monkeypatch.setattr(node.network, "get_state_providers", lambda rid_type: PROVIDERS)
+    node.fetches = []
+    node.failing = set()
+    
+    def fetch_bundles(node_rid, rids):
+        node.fetches.append((node_rid, list(rids)))
+        if node_rid in node.failing:
+            raise ValueError("invalid response")
+        return BundlesPayload(bundles=[b for b in BUNDLES if b.rid in rids])
+    
+    monkeypatch.setattr(
+        node.network.request_handler, "fetch_bundles",
+        lambda node=None, rids=[], **kwargs: fetch_bundles(node, rids))
+    return node
+
+@pytest.fixture
+def calls(node):
+    calls = {HandlerType.RID: 0, HandlerType.Manifest: 0, "bundle kobjs": []}
+    
+    @node.processor.register_handler(HandlerType.RID, rid_types=[SlackMessage])
+    def rid_handler(processor, kobj: KnowledgeObject):
+        calls[HandlerType.RID] += 1
+        kobj.network_targets.add(TARGET)
+        return kobj
+    
+    @node.processor.register_handler(HandlerType.Manifest, rid_types=[SlackMessage])
+    def manifest_handler(processor, kobj: KnowledgeObject):
+        calls[HandlerType.Manifest] += 1
+    
+    @node.processor.register_handler(HandlerType.Bundle, rid_types=[SlackMessage])
+    def bundle_handler(processor, kobj: KnowledgeObject):
+        calls["bundle kobjs"].append(kobj)
+        return STOP_CHAIN
+    
+    return calls
+
+@pytest.mark.parametrize("known", ["rid", "manifest"])
+def test_requeued_kobj_resumes_where_it_was_deferred(node, calls, known):
+    bundle = BUNDLES[0]
+    if known == "rid":
+        ticket = node.processor.handle_many(rids=[bundle.rid], event_type=EventType.NEW, source=KnowledgeSource.External)
+    else:
+        ticket = node.processor.handle_many(manifests=[bundle.manifest], event_type=EventType.NEW, source=KnowledgeSource.External)
+    node.processor.flush_kobj_queue()
+    
+    # earlier handler chains aren't called again, and their changes are kept
+    assert calls[HandlerType.RID] == 1
+    assert calls[HandlerType.Manifest] == 1
+    [kobj] = calls["bundle kobjs"]
+    assert kobj.contents == bundle.contents
+    assert kobj.manifest == bundle.manifest
+    assert kobj.network_targets == {TARGET}
+    assert node.fetches == [(PROVIDERS[0], [bundle.rid])]
+    assert ticket.done()
+
+def test_batches_fetches_and_writes_bundles(node):
+    ticket = node.processor.handle_many(
+        rids=[bundle.rid for bundle in BUNDLES], event_type=EventType.NEW, source=KnowledgeSource.External)
+    node.processor.flush_kobj_queue()
+    
+    assert len(node.fetches) == 1
+    assert {bundle.rid for bundle in BUNDLES} == set(node.fetches[0][1])
+    for bundle in BUNDLES:
+        assert node.cache.read(bundle.rid).contents == bundle.contents
+    assert ticket.done()
+
+def test_provider_error_falls_back_to_next_provider(node):
+    node.failing.add(PROVIDERS[0])
+    ticket = node.processor.handle_many(
+        rids=[bundle.rid for bundle in BUNDLES], event_type=EventType.NEW, source=KnowledgeSource.External)
+    node.processor.flush_kobj_queue()
+    
+    assert [provider for provider, _ in node.fetches] == PROVIDERS
+    for bundle in BUNDLES:
+        assert node.cache.exists(bundle.rid)
+    assert node.network.provider_stats.records[PROVIDERS[0]].failures == 1
+    assert ticket.done()
+
+def test_unfetchable_kobjs_are_dropped_and_released(node, monkeypatch):
+    node.failing.update(PROVIDERS)
+    ticket = node.processor.handle_many(
+        rids=[bundle.rid for bundle in BUNDLES], event_type=EventType.NEW, source=KnowledgeSource.External)
+    node.processor.flush_kobj_queue()
+    
+    assert not any(node.cache.exists(bundle.rid) for bundle in BUNDLES)
+    assert ticket.done()
+    assert ticket.failed == len(BUNDLES)
+    
+    # errors outside of provider requests drop the batch too
+    def broken(rid_type):
+        raise RuntimeError("broken graph")
+    monkeypatch.setattr(node.network, "get_state_providers", broken)
+    ticket = node.processor.handle_many(rids=[BUNDLES[0].rid], event_type=EventType.NEW, source=KnowledgeSource.External)
+    node.processor.flush_kobj_queue()
+    assert ticket.done()
+
+def test_requeues_outside_lock(node):
+    requeued = []
+    
+    def enqueue(kobj):
+        # a worker checking deferred RIDs while requeueing must not block
+        thread = threading.Thread(target=batcher.is_deferred, args=(kobj.rid,))
+        thread.start()
+        thread.join(timeout=2)
+        requeued.append((kobj, thread.is_alive()))
+    
+    batcher = FetchBatcher(node.network, enqueue)
+    batcher.add(KnowledgeObject.from_rid(BUNDLES[0].rid, EventType.NEW, KnowledgeSource.External))
+    batcher.add(KnowledgeObject.from_bundle(BUNDLES[1], EventType.NEW, KnowledgeSource.External))
+    assert batcher.is_deferred(BUNDLES[0].rid)
+    assert batcher.flush()
+    
+    assert [(kobj.rid, blocked) for kobj, blocked in requeued] == [
+        (BUNDLES[0].rid, False), (BUNDLES[1].rid, False)]
+    assert not batcher.is_deferred(BUNDLES[0].rid)
@@ -0,0 +1,246 @@
+import threading
+from types import SimpleNamespace
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetEdge, KoiNetNode, SlackMessage, SlackChannel
+from koi_net.protocol.edge import EdgeProfile, EdgeStatus, EdgeType
+from koi_net.protocol.event import EventType
+from koi_net.protocol.node import NodeProfile, NodeProvides, NodeType
+
+
+def edge_bundle(rid: KoiNetEdge, source, target, rid_types, status=EdgeStatus.APPROVED) -> Bundle:
+    return Bundle.generate(rid, EdgeProfile(
+        source=source, target=target, edge_type=EdgeType.WEBHOOK,
+        status=status, rid_types=rid_types
+    ).model_dump())
+
+def neighbors_from_graph(graph, direction=None, status=None, allowed_type=None) -> set:
+    """Neighbors computed from the graph's edges and their profiles, without the index."""
+    neighbors = set()
+    for source, target in graph.dg.edges:
+        if graph.identity.rid not in (source, target):
+            continue
+        profile = graph.get_edge_profile(graph.dg.get_edge_data(source, target)["rid"])
+        edge_direction = "out" if source == graph.identity.rid else "in"
+        if direction and direction != edge_direction: continue
+        if status and status != profile.status: continue
+        if allowed_type and allowed_type not in profile.rid_types: continue
+        neighbors.add(target if edge_direction == "out" else source)
+    return neighbors
+
+def assert_index_matches_graph(graph):
+    for direction in ("in", "out", None):
+        for status in (*EdgeStatus, None):
+            for allowed_type in (SlackMessage, SlackChannel, None):
+                assert set(graph.get_neighbors(direction, status, allowed_type)) == \
+                    neighbors_from_graph(graph, direction, status, allowed_type), (direction, status, allowed_type)
+
+def test_neighbor_index_follows_updates(make_node):
+    node = make_node()
+    graph = node.network.graph
+    me = node.identity.rid
+    peers = [KoiNetNode.generate(f"peer-{i}") for i in range(3)]
+    edges = [KoiNetEdge(f"edge-{i}") for i in range(3)]
+    
+    def apply(bundle, event_type=EventType.NEW):
+        if event_type == EventType.FORGET:
+            node.cache.delete(bundle.rid)
+        else:
+            node.cache.write(bundle)
+        graph.update(bundle.rid, event_type, bundle)
+        assert_index_matches_graph(graph)
+    
+    apply(edge_bundle(edges[0], me, peers[0], [SlackMessage]))
+    apply(edge_bundle(edges[1], peers[1], me, [SlackChannel], EdgeStatus.PROPOSED))
+    assert graph.get_neighbors(direction="out", allowed_type=SlackMessage) == [peers[0]]
+    
+    # status and types change, then the edge moves to another node
+    apply(edge_bundle(edges[1], peers[1], me, [SlackMessage, SlackChannel]))
+    apply(edge_bundle(edges[0], me, peers[2], [SlackMessage]))
+    assert graph.get_neighbors(direction="out") == [peers[2]]
+    
+    apply(edge_bundle(edges[0], me, peers[2], [SlackMessage]), EventType.FORGET)
+    assert graph.get_neighbors(direction="out") == []
+
+def test_edges_between_the_same_nodes(make_node):
+    node = make_node()
+    graph = node.network.graph
+    me, peer = node.identity.rid, KoiNetNode.generate("peer")
+    first = edge_bundle(KoiNetEdge("first"), me, peer, [SlackMessage])
+    second = edge_bundle(KoiNetEdge("second"), me, peer, [SlackChannel])
+    for bundle in (first, second):
+        node.cache.write(bundle)
+        graph.update(bundle.rid, EventType.NEW, bundle)
+    
+    # the last edge added replaces the first
+    assert_index_matches_graph(graph)
+    assert graph.get_neighbors(allowed_type=SlackChannel) == [peer]
+    assert graph.get_neighbors(allowed_type=SlackMessage) == []
+    
+    # removing the replaced edge keeps the current one
+    node.cache.delete(first.rid)
+    graph.update(first.rid, EventType.FORGET)
+    assert_index_matches_graph(graph)
+    assert graph.get_neighbors() == [peer]
+    assert graph.get_edge_profile(source=me, target=peer).rid_types == [SlackChannel]
+    
+    # removing the current edge restores the previous one
+    node.cache.write(first)
+    graph.update(first.rid, EventType.NEW, first)
+    node.cache.write(second)
+    graph.update(second.rid, EventType.NEW, second)
+    node.cache.delete(second.rid)
+    graph.update(second.rid, EventType.FORGET)
+    assert_index_matches_graph(graph)
+    assert graph.get_neighbors(allowed_type=SlackMessage) == [peer]
+    
+    node.cache.delete(first.rid)
+    graph.update(first.rid, EventType.FORGET)
+    assert_index_matches_graph(graph)
+    assert graph.get_neighbors() == [] and not graph.dg.has_edge(me, peer)
+    
+    # regenerating from the cache gives the same index
+    graph.generate()
+    assert graph.neighbor_index == {}
+
+def test_stale_profile_read_doesnt_replace_update(make_node):
+    node = make_node()
+    graph = node.network.graph
+    peer = KoiNetNode.generate("peer")
+    old = Bundle.generate(peer, NodeProfile(node_type=NodeType.PARTIAL, provides=NodeProvides()).model_dump())
+    new = Bundle.generate(peer, NodeProfile(
+        node_type=NodeType.PARTIAL, provides=NodeProvides(event=[SlackMessage])).model_dump())
+    node.cache.write(old)
+    
+    reading, proceed = threading.Event(), threading.Event()
+    read = node.cache.read
+    def slow_read(rid):
+        # reads the old bundle, then waits while the node is updated
+        bundle = read(rid)
+        reading.set()
+        proceed.wait(timeout=5)
+        return bundle
+    graph.cache = SimpleNamespace(read=slow_read)
+    
+    reader = threading.Thread(target=graph.get_node_profile, args=(peer,))
+    reader.start()
+    assert reading.wait(timeout=5)
+    
+    def apply_update():
+        node.cache.write(new)
+        graph.update(peer, EventType.UPDATE, new)
+    updater = threading.Thread(target=apply_update)
+    updater.start()
+    updater.join(timeout=0.1)
+    proceed.set()
+    reader.join(timeout=5)
+    updater.join(timeout=5)
+    
+    graph.cache = node.cache
+    assert graph.get_node_profile(peer).provides.event == [SlackMessage]
+
+def graph_state(graph) -> dict:
+    return {
+        "nodes": set(graph.dg.nodes),
+        "edges": {(*edge, data["rid"]) for *edge, data in graph.dg.edges(data=True)},
+        "neighbors": graph.neighbor_index,
+        "state providers": graph.state_providers,
+        "event providers": graph.event_providers
+    }
+
+def test_incremental_updates_match_generate(make_node):
+    node = make_node()
+    graph = node.network.graph
+    me = node.identity.rid
+    identity_bundle = Bundle.generate(me, node.identity.profile.model_dump())
+    node.cache.write(identity_bundle)
+    graph.update(me, EventType.NEW, identity_bundle)
+    peers = [KoiNetNode.generate(f"peer-{i}") for i in range(3)]
+    peer_bundles = [
+        Bundle.generate(peer, NodeProfile(
+            node_type=NodeType.FULL, base_url=f"http://127.0.0.1/{peer}",
+            provides=NodeProvides(event=[SlackMessage], state=[SlackMessage])
+        ).model_dump())
+        for peer in peers
+    ]
+    edges = [KoiNetEdge(f"edge-{i}") for i in range(3)]
+    
+    def apply(bundle, event_type=EventType.NEW):
+        if event_type == EventType.FORGET:
+            node.cache.delete(bundle.rid)
+        else:
+            node.cache.write(bundle)
+        graph.update(bundle.rid, event_type, bundle)
+        
+        incremental = graph_state(graph)
+        regenerated = make_node(name="regenerated").network.graph
+        regenerated.cache, regenerated.identity = node.cache, node.identity
+        regenerated.generate()
+        assert incremental == graph_state(regenerated)
+    
+    apply(peer_bundles[0])
+    apply(edge_bundle(edges[0], peers[0], me, [SlackMessage]))
+    # an edge to a node which isn't cached
+    apply(edge_bundle(edges[1], me, peers[1], [SlackMessage]))
+    apply(edge_bundle(edges[2], peers[0], peers[1], [SlackChannel]))
+    
+    # forgotten nodes are kept while they have edges
+    apply(peer_bundles[0], EventType.FORGET)
+    assert peers[0] in graph.dg
+    apply(edge_bundle(edges[0], peers[0], me, [SlackMessage]), EventType.FORGET)
+    assert peers[0] in graph.dg
+    apply(edge_bundle(edges[2], peers[0], peers[1], [SlackChannel]), EventType.FORGET)
+    assert peers[0] not in graph.dg
+    
+    # edges moving to other nodes leave the previous ones behind
+    apply(peer_bundles[2])
+    apply(edge_bundle(edges[1], me, peers[2], [SlackMessage]))
+    assert peers[1] not in graph.dg
+    apply(edge_bundle(edges[1], me, peers[2], [SlackMessage]), EventType.FORGET)
+    assert set(graph.dg.nodes) == {me, peers[2]}
+
+def node_bundle(rid: KoiNetNode, node_type=NodeType.FULL, event=(), state=()) -> Bundle:
+    return Bundle.generate(rid, NodeProfile(
+        node_type=node_type,
+        base_url=f"http://127.0.0.1/{rid}" if node_type == NodeType.FULL else None,
+        provides=NodeProvides(event=list(event), state=list(state))
+    ).model_dump())
+
+def test_provider_index_follows_updates(make_node):
+    node = make_node()
+    graph = node.network.graph
+    full, partial = KoiNetNode.generate("full"), KoiNetNode.generate("partial")
+    
+    def apply(bundle, event_type=EventType.NEW):
+        if event_type == EventType.FORGET:
+            node.cache.delete(bundle.rid)
+        else:
+            node.cache.write(bundle)
+        graph.update(bundle.rid, event_type, bundle)
+    
+    apply(node_bundle(full, event=[SlackMessage], state=[SlackMessage, SlackChannel]))
+    # partial nodes can't serve state
+    apply(node_bundle(partial, NodeType.PARTIAL, event=[SlackMessage], state=[SlackMessage]))
+    assert graph.get_state_providers(SlackMessage) == [full]
+    assert graph.get_state_providers(SlackChannel) == [full]
+    assert set(graph.get_event_providers(SlackMessage)) == {full, partial}
+    assert node.network.get_state_providers(SlackMessage) == [full]
+    
+    # an updated profile replaces the previous entries
+    apply(node_bundle(full, event=[SlackChannel], state=[SlackChannel]), EventType.UPDATE)
+    assert graph.get_state_providers(SlackMessage) == []
+    assert graph.get_state_providers(SlackChannel) == [full]
+    assert graph.get_event_providers(SlackMessage) == [partial]
+    assert SlackMessage not in graph.state_providers
+    
+    apply(node_bundle(full, NodeType.PARTIAL, state=[SlackChannel]), EventType.UPDATE)
+    assert graph.get_state_providers(SlackChannel) == []
+    
+    apply(node_bundle(partial), EventType.FORGET)
+    assert graph.get_event_providers(SlackMessage) == []
+    assert graph.state_providers == {} and graph.event_providers == {}
+    
+    # the index is rebuilt from the cache
+    apply(node_bundle(full, event=[SlackMessage], state=[SlackMessage]), EventType.UPDATE)
+    graph.state_providers.clear()
+    graph.generate()
+    assert graph.get_state_providers(SlackMessage) == [full]
@@ -0,0 +1,115 @@
+import threading
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.processor.handler import HandlerType, STOP_CHAIN
+from koi_net.processor.knowledge_object import KnowledgeObject, KnowledgeSource
+from koi_net.processor.ticket import HandleTicket
+from koi_net.protocol.api_models import BundlesPayload
+from koi_net.protocol.event import Event, EventType
+
+
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"})
+    for i in range(4)
+]
+
+
+def test_ticket_counts_pending_kobjs():
+    ticket = HandleTicket(2)
+    assert not ticket.done()
+    assert not ticket.wait(timeout=0.01)
+    
+    ticket.acquire()
+    ticket.release(2)
+    assert ticket.pending == 1
+    assert repr(ticket) == "<HandleTicket 1/2 done>"
+    
+    threading.Timer(0.05, ticket.release).start()
+    assert ticket.wait(timeout=5)
+    assert ticket.done()
+    
+    assert HandleTicket().done()
+
+def test_handle_many_ticket_done_after_flush(make_node):
+    node = make_node()
+    handled = []
+    
+    @node.processor.register_handler(HandlerType.RID, rid_types=[SlackMessage])
+    def replace(processor, kobj: KnowledgeObject):
+        # handlers replacing knowledge objects don't affect the ticket
+        handled.append(kobj.rid)
+        return KnowledgeObject.from_bundle(kobj.bundle, kobj.event_type, kobj.source)
+    
+    ticket = node.processor.handle_many(bundles=BUNDLES[:2], events=[
+        Event.from_bundle(EventType.NEW, bundle) for bundle in BUNDLES[2:]])
+    assert ticket.size == len(BUNDLES)
+    assert ticket.pending == len(BUNDLES)
+    
+    node.processor.flush_kobj_queue()
+    assert ticket.succeeded()
+    assert ticket.wait(timeout=0)
+    assert handled == [bundle.rid for bundle in BUNDLES]
+
+def test_handle_many_ticket_done_with_workers(make_node):
+    node = make_node(use_kobj_processor_thread=2)
+    
+    @node.processor.register_handler(HandlerType.Bundle, rid_types=[SlackMessage])
+    def fail(processor, kobj: KnowledgeObject):
+        # failed knowledge objects are done too
+        raise RuntimeError("handler error")
+    
+    for thread in node.processor.worker_threads:
+        thread.start()
+    ticket = node.processor.handle_many(bundles=BUNDLES)
+    assert ticket.wait(timeout=5)
+    assert ticket.failed == len(BUNDLES)
+    assert not ticket.succeeded()
+
+def test_deferred_kobjs_keep_ticket_pending(make_node, monkeypatch):
+    node = make_node(fetch_batch_window=60)
+    provider = KoiNetNode.generate("provider")
+    monkeypatch.setattr(node.network, "get_state_providers", lambda rid_type: [provider])
+    fetching, fetched = threading.Event(), threading.Event()
+    
+    def fetch_bundles(node=None, rids=[], **kwargs):
+        fetching.set()
+        fetched.wait(timeout=5)
+        return BundlesPayload(bundles=[b for b in BUNDLES if b.rid in rids])
+    monkeypatch.setattr(node.network.request_handler, "fetch_bundles", fetch_bundles)
+    
+    @node.processor.register_handler(HandlerType.Bundle, rid_types=[SlackMessage])
+    def stop(processor, kobj: KnowledgeObject):
+        return STOP_CHAIN
+    
+    ticket = node.processor.handle_many(
+        rids=[bundle.rid for bundle in BUNDLES[:2]],
+        bundles=BUNDLES[2:],
+        event_type=EventType.NEW,
+        source=KnowledgeSource.External
+    )
+    flush = threading.Thread(target=node.processor.flush_kobj_queue)
+    flush.start()
+    try:
+        assert fetching.wait(timeout=5)
+        # bundles were processed, RIDs are deferred until their bundles are fetched
+        assert ticket.pending == 2
+        assert not ticket.wait(timeout=0.01)
+    finally:
+        fetched.set()
+        flush.join(timeout=5)
+    assert ticket.done()
+
+def test_handle_many_keeps_existing_tickets(make_node):
+    node = make_node()
+    existing = HandleTicket(1)
+    kobj = KnowledgeObject.from_bundle(BUNDLES[0])
+    kobj.ticket = existing
+    
+    ticket = node.processor.handle_many(bundles=BUNDLES[1:], kobjs=[kobj])
+    assert kobj.ticket is existing
+    assert ticket.size == len(BUNDLES) - 1
+    
+    node.processor.flush_kobj_queue()
+    assert existing.done()
+    assert ticket.done()
@@ -0,0 +1,93 @@
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.processor.handler import HandlerType, KnowledgeHandler
+from koi_net.processor.knowledge_object import KnowledgeObject, KnowledgeSource
+from koi_net.protocol.event import EventType
+
+
+RID = SlackMessage("T0", "C0", "0.000100")
+
+
+def make_handler(calls: list, name: str, handler_type=HandlerType.RID, rid_types=None, result=None, **kwargs) -> KnowledgeHandler:
+    def func(processor, kobj: KnowledgeObject):
+        calls.append(name)
+        return result(kobj) if result else None
+    func.__name__ = name
+    return KnowledgeHandler(func, handler_type, rid_types, **kwargs)
+
+def forget(kobj: KnowledgeObject) -> KnowledgeObject:
+    kobj.event_type = EventType.FORGET
+    return kobj
+
+def test_get_handlers_matches_and_indexes(make_node):
+    processor = make_node().processor
+    calls = []
+    any_rid = make_handler(calls, "any_rid")
+    slack = make_handler(calls, "slack", rid_types=[SlackMessage])
+    external = make_handler(calls, "external", source=KnowledgeSource.External)
+    new = make_handler(calls, "new", event_types=[EventType.NEW])
+    bundle = make_handler(calls, "bundle", HandlerType.Bundle)
+    processor.handlers = [any_rid, slack, external, new, bundle]
+    
+    kobj = KnowledgeObject.from_rid(RID, EventType.NEW, KnowledgeSource.External)
+    matches = processor.get_handlers(HandlerType.RID, kobj)
+    assert matches == [(0, any_rid), (1, slack), (2, external), (3, new)]
+    assert processor.get_handlers(HandlerType.RID, kobj) is matches
+    
+    node_kobj = KnowledgeObject.from_rid(KoiNetNode.generate("a"), EventType.FORGET, KnowledgeSource.Internal)
+    assert processor.get_handlers(HandlerType.RID, node_kobj) == [(0, any_rid)]
+    assert processor.get_handlers(HandlerType.Bundle, kobj) == [(4, bundle)]
+    assert len(processor.handler_index) == 3
+
+def test_handler_index_rebuilds_when_handlers_change(make_node):
+    processor = make_node().processor
+    calls = []
+    first = make_handler(calls, "first", rid_types=[SlackMessage])
+    processor.handlers = [first]
+    kobj = KnowledgeObject.from_rid(RID)
+    assert processor.get_handlers(HandlerType.RID, kobj) == [(0, first)]
+    
+    second = make_handler(calls, "second", rid_types=[SlackMessage])
+    processor.handlers.insert(0, second)
+    assert processor.get_handlers(HandlerType.RID, kobj) == [(0, second), (1, first)]
+    
+    processor.handlers.remove(first)
+    assert processor.get_handlers(HandlerType.RID, kobj) == [(0, second)]
+    
+    processor.register_handler(HandlerType.RID)(lambda processor, kobj: None)
+    assert len(processor.get_handlers(HandlerType.RID, kobj)) == 2
+
+def test_handler_chain_rematches_modified_kobj(make_node):
+    processor = make_node().processor
+    calls = []
+    processor.handlers = [
+        make_handler(calls, "forget_before", event_types=[EventType.FORGET]),
+        make_handler(calls, "to_forget", event_types=[EventType.NEW], result=forget),
+        make_handler(calls, "new_after", event_types=[EventType.NEW]),
+        make_handler(calls, "forget_after", event_types=[EventType.FORGET]),
+        make_handler(calls, "any_after"),
+    ]
+    
+    kobj = KnowledgeObject.from_rid(RID, EventType.NEW, KnowledgeSource.External)
+    result = processor.call_handler_chain(HandlerType.RID, kobj)
+    
+    assert calls == ["to_forget", "forget_after", "any_after"]
+    assert result.event_type == EventType.FORGET
+
+def test_handler_chain_rematches_modified_source(make_node):
+    processor = make_node().processor
+    calls = []
+    
+    def internal(kobj: KnowledgeObject) -> KnowledgeObject:
+        kobj.source = KnowledgeSource.Internal
+        return kobj
+    
+    processor.handlers = [
+        make_handler(calls, "to_internal", source=KnowledgeSource.External, result=internal),
+        make_handler(calls, "external", source=KnowledgeSource.External),
+        make_handler(calls, "internal", source=KnowledgeSource.Internal),
+    ]
+    
+    kobj = KnowledgeObject.from_rid(RID, source=KnowledgeSource.External)
+    processor.call_handler_chain(HandlerType.RID, kobj)
+    
+    assert calls == ["to_internal", "internal"]
@@ -0,0 +1,68 @@
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.processor.knowledge_object import KnowledgeObject, KnowledgeSource
+from koi_net.protocol.event import EventType
+
+
+NODES = [KoiNetNode.generate(f"node-{i}") for i in range(3)]
+BUNDLE = Bundle.generate(SlackMessage("T0", "C0", "1.000100"), {"text": "hello"})
+
+
+def make_kobj() -> KnowledgeObject:
+    kobj = KnowledgeObject.from_bundle(BUNDLE, EventType.NEW, KnowledgeSource.External)
+    kobj.network_targets.add(NODES[0])
+    return kobj
+
+def test_copies_share_network_targets_until_modified():
+    kobj = make_kobj()
+    copy = kobj.copy()
+    
+    # reads don't copy the set
+    assert copy.network_targets == {NODES[0]}
+    assert copy.network_targets._targets is kobj.network_targets._targets
+    
+    copy.network_targets.add(NODES[1])
+    assert copy.network_targets == {NODES[0], NODES[1]}
+    assert kobj.network_targets == {NODES[0]}
+    
+    # the original copies before modifying too
+    other = kobj.copy()
+    kobj.network_targets.update([NODES[2]])
+    assert kobj.network_targets == {NODES[0], NODES[2]}
+    assert other.network_targets == {NODES[0]}
+
+def test_network_targets_setter_doesnt_alias():
+    kobj = make_kobj()
+    targets = {NODES[1]}
+    kobj.network_targets = targets
+    kobj.network_targets.add(NODES[2])
+    assert targets == {NODES[1]}
+    assert kobj.network_targets == {NODES[1], NODES[2]}
+
+def test_model_copy_applies_update():
+    kobj = make_kobj()
+    copy = kobj.model_copy(update={
+        "normalized_event_type": EventType.UPDATE,
+        "network_targets": {NODES[1]}
+    })
+    assert copy.normalized_event_type == EventType.UPDATE
+    assert copy.network_targets == {NODES[1]}
+    assert kobj.normalized_event_type is None
+    assert kobj.network_targets == {NODES[0]}
+    
+    deep = kobj.model_copy(deep=True)
+    assert deep.contents == kobj.contents and deep.contents is not kobj.contents
+
+def test_model_dump_round_trips():
+    kobj = make_kobj()
+    kobj.normalized_event_type = EventType.NEW
+    data = kobj.model_dump()
+    
+    assert data["rid"] == BUNDLE.rid
+    assert data["manifest"] == BUNDLE.manifest.model_dump()
+    assert data["network_targets"] == {NODES[0]}
+    
+    restored = KnowledgeObject.model_validate(data)
+    assert restored.model_dump() == data
+    assert restored.bundle == BUNDLE
+    assert KnowledgeObject.model_validate(kobj) is kobj
@@ -0,0 +1,56 @@
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.protocol.api_models import PollEvents
+from koi_net.protocol.event import Event, EventType
+
+
+PEER = KoiNetNode.generate("partial")
+EVENTS = [
+    Event.from_bundle(EventType.NEW, Bundle.generate(
+        SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"}))
+    for i in range(5)
+]
+
+
+def rids(events: list[Event]) -> list:
+    return [event.rid for event in events]
+
+def make_network(make_node):
+    network = make_node().network
+    queue = network._get_queue(network.poll_event_queue, PEER)
+    for event in EVENTS:
+        queue.put(event)
+    return network
+
+def test_cursor_pages_are_redelivered_until_acknowledged(make_node):
+    network = make_network(make_node)
+    
+    first = network.handle_poll(PollEvents(rid=PEER, limit=2, cursor=""))
+    assert rids(first.events) == rids(EVENTS[:2])
+    
+    # a lost response is redelivered by polling with the same cursor
+    assert rids(network.handle_poll(PollEvents(rid=PEER, limit=2, cursor="")).events) == rids(EVENTS[:2])
+    
+    second = network.handle_poll(PollEvents(rid=PEER, limit=2, cursor=first.next_cursor))
+    assert rids(second.events) == rids(EVENTS[2:4])
+    assert len(network.poll_event_queue[PEER]) == 3
+    
+    third = network.handle_poll(PollEvents(rid=PEER, limit=2, cursor=second.next_cursor))
+    assert rids(third.events) == rids(EVENTS[4:])
+    
+    last = network.handle_poll(PollEvents(rid=PEER, limit=2, cursor=third.next_cursor))
+    assert last.events == [] and last.next_cursor == third.next_cursor
+    assert network.poll_event_queue[PEER].empty()
+
+def test_stale_cursor_acknowledges_nothing(make_node):
+    network = make_network(make_node)
+    page = network.handle_poll(PollEvents(rid=PEER, limit=2, cursor="old-epoch:4"))
+    assert rids(page.events) == rids(EVENTS[:2])
+    assert len(network.poll_event_queue[PEER]) == 5
+
+def test_poll_without_cursor_removes_events(make_node):
+    network = make_network(make_node)
+    page = network.handle_poll(PollEvents(rid=PEER, limit=3))
+    assert rids(page.events) == rids(EVENTS[:3])
+    assert page.next_cursor is None
+    assert len(network.poll_event_queue[PEER]) == 2
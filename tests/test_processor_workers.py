@@ -0,0 +1,43 @@
+import random
+import threading
+import time
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.processor.handler import HandlerType, STOP_CHAIN
+from koi_net.processor.knowledge_object import KnowledgeObject
+
+
+RIDS = [SlackMessage("T0", "C0", f"{i}.000100") for i in range(8)]
+
+
+def test_workers_keep_order_per_rid(make_node):
+    node = make_node(use_kobj_processor_thread=4)
+    seen: dict = {rid: [] for rid in RIDS}
+    threads = set()
+    
+    @node.processor.register_handler(HandlerType.RID, rid_types=[SlackMessage])
+    def record(processor, kobj: KnowledgeObject):
+        time.sleep(random.random() / 1000)
+        seen[kobj.rid].append(kobj.contents["version"])
+        threads.add(threading.current_thread())
+        return STOP_CHAIN
+    
+    node.start()
+    bundles = [
+        Bundle.generate(rid, {"version": version})
+        for version in range(20) for rid in RIDS
+    ]
+    for i in range(0, len(bundles), 16):
+        node.processor.handle_many(bundles=bundles[i:i+16])
+    node.processor.join()
+    
+    assert seen == {rid: list(range(20)) for rid in RIDS}
+    assert len(threads) > 1
+    assert node.processor.unfinished_tasks == 0
+
+def test_nodes_and_edges_use_first_queue(make_node):
+    processor = make_node(use_kobj_processor_thread=4).processor
+    assert len(processor.kobj_queues) == 4
+    for i in range(10):
+        assert processor._queue_for(KoiNetNode.generate(f"node-{i}")) is processor.kobj_queues[0]
+    assert len({id(processor._queue_for(rid)) for rid in RIDS}) > 1
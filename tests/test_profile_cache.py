@@ -0,0 +1,50 @@
+from rid_lib.types import KoiNetNode
+from koi_net.network.profile_cache import ProfileCache
+from koi_net.protocol.node import NodeProfile, NodeProvides, NodeType
+
+
+RIDS = [KoiNetNode.generate(f"node-{i}") for i in range(4)]
+PROFILE = NodeProfile(node_type=NodeType.PARTIAL, provides=NodeProvides())
+
+
+def test_evicts_least_recently_used():
+    profiles = ProfileCache(max_size=2)
+    profiles.set(RIDS[0], PROFILE)
+    profiles.set(RIDS[1], PROFILE)
+    
+    # reading the first profile makes the second the least recently used
+    assert profiles.get(RIDS[0]) is PROFILE
+    profiles.set(RIDS[2], PROFILE)
+    assert len(profiles) == 2
+    assert profiles.get(RIDS[1]) is None
+    assert profiles.get(RIDS[0]) is PROFILE
+    assert profiles.get(RIDS[2]) is PROFILE
+    
+    # updating a profile makes it the most recently used
+    profiles.set(RIDS[0], PROFILE)
+    profiles.set(RIDS[3], PROFILE)
+    assert profiles.get(RIDS[2]) is None
+    assert profiles.get(RIDS[0]) is PROFILE
+
+def test_counters():
+    profiles = ProfileCache(max_size=1)
+    assert profiles.get(RIDS[0]) is None
+    profiles.set(RIDS[0], PROFILE)
+    profiles.get(RIDS[0])
+    profiles.get(RIDS[0])
+    profiles.set(RIDS[1], PROFILE)
+    
+    assert profiles.stats() == {"size": 1, "max_size": 1, "hits": 2, "misses": 1, "evictions": 1}
+    
+    # clearing keeps the counters
+    profiles.invalidate(RIDS[1])
+    profiles.set(RIDS[2], PROFILE)
+    profiles.clear()
+    assert profiles.stats() == {"size": 0, "max_size": 1, "hits": 2, "misses": 1, "evictions": 1}
+
+def test_disabled_cache_stores_nothing():
+    profiles = ProfileCache(max_size=0)
+    profiles.set(RIDS[0], PROFILE)
+    assert len(profiles) == 0
+    assert profiles.get(RIDS[0]) is None
+    assert profiles.stats()["evictions"] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import httpx
+import pytest
+from rid_lib.types import KoiNetNode, SlackMessage
+
+
+RID = SlackMessage("T0", "C0", "1.000100")
+PROVIDERS = [KoiNetNode.generate(f"provider-{i}") for i in range(3)]
+
+
+@pytest.fixture
+def network(make_node, monkeypatch):
+    def make_network(**kwargs):
+        network = make_node(**kwargs).network
+        monkeypatch.setattr(network, "get_state_providers", lambda rid_type: PROVIDERS)
+        return network
+    return make_network
+
+@pytest.fixture
+def wait_calls(monkeypatch):
+    calls = []
+    wait = asyncio.wait
+    async def counting_wait(*args, **kwargs):
+        calls.append(kwargs.get("timeout"))
+        return await wait(*args, **kwargs)
+    monkeypatch.setattr(asyncio, "wait", counting_wait)
+    return calls
+
+def slow_providers(delays: dict[KoiNetNode, float], results: dict[KoiNetNode, str], queried: list):
+    async def fetch_from_node(node_rid):
+        queried.append(node_rid)
+        await asyncio.sleep(delays.get(node_rid, 0))
+        if results.get(node_rid) == "error":
+            raise httpx.ConnectError("unreachable")
+        return results.get(node_rid)
+    return fetch_from_node
+
+def test_without_hedge_delay_queries_all_and_waits_without_polling(network, wait_calls):
+    network = network()
+    queried = []
+    fetch = slow_providers(
+        {PROVIDERS[0]: 0.2, PROVIDERS[1]: 0.1, PROVIDERS[2]: 0.05},
+        {PROVIDERS[0]: "slow", PROVIDERS[2]: "error"},
+        queried
+    )
+    result = asyncio.run(network._fetch_from_providers_async(RID, fetch))
+    
+    assert result == "slow"
+    assert set(queried) == set(PROVIDERS)
+    # one wait per finished request, none of them timing out
+    assert wait_calls == [None] * 3
+    assert network.provider_stats.records[PROVIDERS[2]].failures == 1
+
+def test_hedge_delay_queries_next_provider_after_delay(network, wait_calls):
+    network = network(fetch_hedge_delay=0.05)
+    queried = []
+    fetch = slow_providers(
+        {PROVIDERS[0]: 1, PROVIDERS[1]: 0},
+        {PROVIDERS[0]: "slow", PROVIDERS[1]: "fast"},
+        queried
+    )
+    result = asyncio.run(network._fetch_from_providers_async(RID, fetch))
+    
+    assert result == "fast"
+    assert len(queried) == 2
+    assert wait_calls[0] == 0.05
+
+def test_stop_shuts_down_fetch_executor(make_node):
+    node = make_node()
+    node.stop()
+    with pytest.raises(RuntimeError):
+        node.network._fetch_executor.submit(lambda: None)
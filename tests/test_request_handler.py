@@ -0,0 +1,68 @@
+import asyncio
+import importlib.util
+import time
+import httpx
+import pytest
+from koi_net.config import HTTPClientConfig
+from koi_net.network.async_request_handler import AsyncRequestHandler
+from koi_net.network.request_handler import RequestHandler
+
+
+CONFIG = HTTPClientConfig(
+    connect_timeout=1.0,
+    read_timeout=0.2,
+    write_timeout=3.0,
+    pool_timeout=4.0,
+    max_connections=7,
+    max_keepalive_connections=3,
+    keepalive_expiry=2.5
+)
+
+
+def test_client_uses_configured_timeout_and_limits():
+    handler = RequestHandler(None, None, client_config=CONFIG)
+    kwargs = handler._client_kwargs()
+    
+    assert kwargs["timeout"] == httpx.Timeout(connect=1.0, read=0.2, write=3.0, pool=4.0)
+    assert kwargs["limits"] == httpx.Limits(max_connections=7, max_keepalive_connections=3, keepalive_expiry=2.5)
+    assert handler.client.timeout == kwargs["timeout"]
+    handler.close()
+
+def test_async_client_uses_configured_timeout():
+    handler = AsyncRequestHandler(None, None, client_config=CONFIG)
+    
+    async def timeout():
+        return handler.client.timeout
+    
+    assert asyncio.run(timeout()) == httpx.Timeout(connect=1.0, read=0.2, write=3.0, pool=4.0)
+    handler.close()
+
+def test_timeouts_can_be_disabled():
+    handler = RequestHandler(None, None, client_config=HTTPClientConfig(
+        connect_timeout=None, read_timeout=None, write_timeout=None, pool_timeout=None,
+        max_connections=None, max_keepalive_connections=None
+    ))
+    kwargs = handler._client_kwargs()
+    
+    assert kwargs["timeout"] == httpx.Timeout(None)
+    assert kwargs["limits"] == httpx.Limits(max_connections=None, max_keepalive_connections=None, keepalive_expiry=5.0)
+    handler.close()
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None if name == "h2" else find_spec(name))
+    handler = RequestHandler(None, None, client_config=HTTPClientConfig(http2=True))
+    
+    assert handler._client_kwargs()["http2"] is False
+    handler.close()
+
+def test_slow_peer_raises_read_timeout(peer):
+    def slow(path, body):
+        time.sleep(1)
+        return 200, {"rids": []}
+    
+    peer.respond = slow
+    handler = RequestHandler(None, None, client_config=CONFIG)
+    with pytest.raises(httpx.ReadTimeout):
+        handler.fetch_rids(url=peer.url)
+    handler.close()
@@ -0,0 +1,59 @@
+import json
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.network.response_handler import ResponseHandler
+from koi_net.protocol.api_models import FetchRids, FetchManifests, FetchBundles
+
+
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"})
+    for i in range(7)
+]
+RIDS = sorted((bundle.rid for bundle in BUNDLES), key=str)
+
+
+def make_handler(make_node, **kwargs) -> ResponseHandler:
+    node = make_node()
+    for bundle in BUNDLES:
+        node.cache.write(bundle)
+    # a RID of another type, filtered out by rid_types
+    node.cache.write(Bundle.generate(KoiNetNode.generate("other"), {}))
+    return ResponseHandler(node.cache, change_log=node.network.change_log, **kwargs)
+
+def test_fetch_rids_pages_in_rid_order(make_node):
+    handler = make_handler(make_node)
+    pages, cursor = [], None
+    while True:
+        payload = handler.fetch_rids(FetchRids(rid_types=[SlackMessage], limit=3, cursor=cursor))
+        pages.append(payload.rids)
+        cursor = payload.next_cursor
+        if cursor is None:
+            break
+    
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [rid for page in pages for rid in page] == RIDS
+    
+    # without a limit or cursor, everything is returned at once
+    assert set(handler.fetch_rids(FetchRids(rid_types=[SlackMessage])).rids) == set(RIDS)
+
+def test_fetch_manifests_pages(make_node):
+    handler = make_handler(make_node)
+    first = handler.fetch_manifests(FetchManifests(rid_types=[SlackMessage], limit=4))
+    second = handler.fetch_manifests(FetchManifests(rid_types=[SlackMessage], limit=4, cursor=first.next_cursor))
+    
+    assert [m.rid for m in first.manifests + second.manifests] == RIDS
+    assert second.next_cursor is None
+
+def test_streams_match_regular_responses(make_node):
+    handler = make_handler(make_node, chunk_size=2)
+    
+    lines = list(handler.stream_rids(FetchRids(rid_types=[SlackMessage], limit=5)))
+    payloads = [json.loads(line) for line in lines]
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [len(p["rids"]) for p in payloads] == [2, 2, 1]
+    assert [p["next_cursor"] for p in payloads] == [None, None, str(RIDS[4])]
+    
+    lines = list(handler.stream_bundles(FetchBundles(rids=RIDS + [SlackMessage("T0", "C0", "9.9")])))
+    payloads = [json.loads(line) for line in lines]
+    assert sum(len(p["bundles"]) for p in payloads) == 7
+    assert payloads[-1]["not_found"] == ["orn:slack.message:T0/C0/9.9"]
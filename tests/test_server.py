@@ -0,0 +1,219 @@
+import asyncio
+import json
+from pathlib import Path
+import httpx
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import SlackMessage
+from koi_net.protocol.compression import compress, supported_encodings
+from koi_net.protocol.api_models import EventsPayload
+from koi_net.protocol.consts import BROADCAST_EVENTS_PATH, FETCH_BUNDLES_PATH, FETCH_RIDS_PATH, MSGPACK_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+from koi_net.protocol.event import Event, EventType
+from koi_net.server import NodeServer
+
+
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i} " * 20})
+    for i in range(20)
+]
+
+
+@pytest.fixture
+def server(make_node):
+    node = make_node()
+    for bundle in BUNDLES:
+        node.cache.write(bundle)
+    return NodeServer(node, max_body_size=64 * 1024)
+
+def post(server: NodeServer, path: str, content: bytes, headers: dict = {}) -> httpx.Response:
+    """Posts to the server's app without starting the node (its lifespan isn't run)."""
+    async def request():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://node") as client:
+            return await client.post(
+                (server.node.config.server.path or "") + path,
+                content=content,
+                headers={"Content-Type": "application/json", "Accept-Encoding": "identity", **headers}
+            )
+    return asyncio.run(request())
+
+SPEC_PATH = Path(__file__).parent.parent / "koi-net-protocol-openapi.json"
+
+
+def fetch_body(rids=None) -> bytes:
+    return json.dumps({"rids": [str(rid) for rid in rids or [b.rid for b in BUNDLES]]}).encode()
+
+
+def test_compresses_responses_above_threshold(server):
+    resp = post(server, FETCH_BUNDLES_PATH, fetch_body(), {"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding, Accept"
+    assert resp.headers["Accept-Encoding"] == ", ".join(supported_encodings())
+    # httpx decodes the response
+    assert len(resp.json()["bundles"]) == len(BUNDLES)
+    
+    small = post(server, FETCH_BUNDLES_PATH, fetch_body([BUNDLES[0].rid]), {"Accept-Encoding": "gzip"})
+    assert small.status_code == 200
+    assert "Content-Encoding" not in small.headers
+    assert small.headers["Vary"] == "Accept-Encoding, Accept"
+    
+    identity = post(server, FETCH_BUNDLES_PATH, fetch_body())
+    assert "Content-Encoding" not in identity.headers
+    assert identity.json() == resp.json()
+
+def test_compresses_streams(server):
+    resp = post(server, FETCH_RIDS_PATH, b"{}", {"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"].startswith("application/x-ndjson")
+    assert resp.headers["Content-Encoding"] == "gzip"
+    rids = [rid for line in resp.text.splitlines() for rid in json.loads(line)["rids"]]
+    assert set(rids) >= {str(b.rid) for b in BUNDLES}
+
+def test_decompresses_request_bodies(server):
+    resp = post(server, FETCH_BUNDLES_PATH, compress(fetch_body(), "gzip"), {"Content-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert len(resp.json()["bundles"]) == len(BUNDLES)
+
+def test_zstd(server):
+    pytest.importorskip("zstandard")
+    resp = post(server, FETCH_BUNDLES_PATH, compress(fetch_body(), "zstd"),
+        {"Content-Encoding": "zstd", "Accept-Encoding": "zstd;q=1, gzip;q=0.5"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "zstd"
+    assert len(resp.json()["bundles"]) == len(BUNDLES)
+
+def test_rejects_unsupported_and_invalid_codings(server):
+    resp = post(server, FETCH_BUNDLES_PATH, fetch_body(), {"Content-Encoding": "br"})
+    assert resp.status_code == 415
+    assert resp.headers["Accept-Encoding"] == ", ".join(supported_encodings())
+    
+    resp = post(server, FETCH_BUNDLES_PATH, b"not gzip", {"Content-Encoding": "gzip"})
+    assert resp.status_code == 400
+    
+    truncated = compress(fetch_body(), "gzip")[:-10]
+    resp = post(server, FETCH_BUNDLES_PATH, truncated, {"Content-Encoding": "gzip"})
+    assert resp.status_code == 400
+
+def test_rejects_oversized_bodies(server):
+    padding = " " * server.max_body_size
+    resp = post(server, FETCH_BUNDLES_PATH, fetch_body() + padding.encode())
+    assert resp.status_code == 413
+    
+    # bodies decompressing to more than the limit are rejected too
+    bomb = compress(fetch_body() + padding.encode(), "gzip")
+    assert len(bomb) < server.max_body_size
+    resp = post(server, FETCH_BUNDLES_PATH, bomb, {"Content-Encoding": "gzip"})
+    assert resp.status_code == 413
+
+def test_msgpack_requests_and_responses(server):
+    msgspec = pytest.importorskip("msgspec")
+    body = msgspec.msgpack.encode({"rids": [str(b.rid) for b in BUNDLES]})
+    resp = post(server, FETCH_BUNDLES_PATH, body, {
+        "Content-Type": MSGPACK_MEDIA_TYPE,
+        "Accept": f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5",
+        "Accept-Encoding": "gzip"
+    })
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == MSGPACK_MEDIA_TYPE
+    assert resp.headers["Content-Encoding"] == "gzip"
+    bundles = msgspec.msgpack.decode(resp.content)["bundles"]
+    assert [bundle["contents"] for bundle in bundles] == [b.contents for b in BUNDLES]
+    
+    # MessagePack request bodies can be compressed too
+    resp = post(server, FETCH_BUNDLES_PATH, compress(body, "gzip"), {
+        "Content-Type": MSGPACK_MEDIA_TYPE, "Content-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "application/json"
+    assert len(resp.json()["bundles"]) == len(BUNDLES)
+
+@pytest.mark.parametrize("accept", [
+    None,
+    "*/*",
+    "application/json",
+    f"application/json, {MSGPACK_MEDIA_TYPE};q=0.5",
+    f"{MSGPACK_MEDIA_TYPE};q=0"
+])
+def test_json_is_the_default(server, accept):
+    headers = {"Accept": accept} if accept else {}
+    resp = post(server, FETCH_BUNDLES_PATH, fetch_body(), headers)
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "application/json"
+
+def test_rejects_msgpack_without_msgspec(server):
+    server.msgpack_codec = None
+    resp = post(server, FETCH_BUNDLES_PATH, b"\x80", {"Content-Type": MSGPACK_MEDIA_TYPE})
+    assert resp.status_code == 415
+    
+    resp = post(server, FETCH_BUNDLES_PATH, fetch_body(), {"Accept": MSGPACK_MEDIA_TYPE})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "application/json"
+
+def test_rejects_invalid_msgpack(server):
+    pytest.importorskip("msgspec")
+    resp = post(server, FETCH_BUNDLES_PATH, b"\xc1", {"Content-Type": MSGPACK_MEDIA_TYPE})
+    assert resp.status_code == 422
+
+def test_openapi_documents_media_types(server):
+    msgpack = [MSGPACK_MEDIA_TYPE] if server.msgpack_codec else []
+    paths = server.app.openapi()["paths"]
+    for path, item in paths.items():
+        operation = item["post"]
+        streamed = path.endswith("/fetch")
+        assert list(operation["requestBody"]["content"]) == ["application/json", *msgpack]
+        if not path.endswith("/broadcast"):
+            assert list(operation["responses"]["200"]["content"]) == [
+                "application/json", *msgpack, *([NDJSON_MEDIA_TYPE] if streamed else [])]
+    
+    # the published spec documents every media type
+    spec = json.loads(SPEC_PATH.read_text())
+    for path, item in spec["paths"].items():
+        operation = item["post"]
+        assert set(operation["requestBody"]["content"]) == {"application/json", MSGPACK_MEDIA_TYPE}
+        response = operation["responses"]["200"]["content"]
+        if "$ref" in response["application/json"]["schema"]:
+            assert MSGPACK_MEDIA_TYPE in response
+            assert (NDJSON_MEDIA_TYPE in response) == path.endswith("/fetch")
+
+def test_lifespan_starts_and_stops_node(server, monkeypatch):
+    calls = []
+    node = server.node
+    
+    def recording(name, method):
+        def record():
+            calls.append(name)
+            method()
+        return record
+    
+    for name in ("start", "stop"):
+        monkeypatch.setattr(node, name, recording(name, getattr(node, name)))
+    
+    async def run():
+        async with server.lifespan(server.app):
+            assert calls == ["start"]
+            client = node.network.async_request_handler.client
+        assert calls == ["start", "stop"]
+        return client
+    
+    assert asyncio.run(run()).is_closed
+
+def test_invalid_bodies_are_rejected_with_422(server):
+    resp = post(server, FETCH_BUNDLES_PATH, b"{not json")
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["type"] == "json_invalid"
+    
+    resp = post(server, FETCH_BUNDLES_PATH, b'{"rids": "not a list"}')
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["rids"]
+    
+    # invalid UTF-8 isn't echoed back
+    resp = post(server, FETCH_BUNDLES_PATH, b'{"rids": ["\xff"]}')
+    assert resp.status_code == 422
+    assert all("input" not in error for error in resp.json()["detail"])
+
+def test_broadcast_events_are_processed(server):
+    bundle = Bundle.generate(SlackMessage("T0", "C0", "99.000100"), {"text": "new"})
+    event = Event.from_bundle(EventType.NEW, bundle)
+    resp = post(server, BROADCAST_EVENTS_PATH, server.node.network.codec.encode(EventsPayload(events=[event])))
+    assert resp.status_code == 200
+    assert server.node.cache.read(bundle.rid).contents == bundle.contents
@@ -0,0 +1,104 @@
+import os
+import pytest
+from rid_lib.ext import Bundle, Cache
+from rid_lib.types import SlackMessage, SlackChannel
+from koi_net.storage import (
+    CacheBackend, FileCache, SQLiteCache, read_manifest, list_manifests, list_rids_page
+)
+
+
+BUNDLES = [
+    Bundle.generate(SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"})
+    for i in range(5)
+] + [Bundle.generate(SlackChannel("T0", "C0"), {"name": "general"})]
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "file":
+        return FileCache(str(tmp_path / "cache"))
+    return SQLiteCache(str(tmp_path / "cache.db"))
+
+def test_manifests_and_pages(cache):
+    for bundle in BUNDLES:
+        cache.write(bundle)
+    
+    assert read_manifest(cache, BUNDLES[0].rid) == BUNDLES[0].manifest
+    assert {m.rid for m in list_manifests(cache, [SlackMessage])} == {b.rid for b in BUNDLES[:5]}
+    
+    rids = sorted((b.rid for b in BUNDLES[:5]), key=str)
+    first = list_rids_page(cache, [SlackMessage], limit=3)
+    rest = list_rids_page(cache, [SlackMessage], after=str(first[-1]))
+    assert first + rest == rids
+    
+    cache.delete(BUNDLES[0].rid)
+    assert read_manifest(cache, BUNDLES[0].rid) is None
+    assert not cache.exists(BUNDLES[0].rid)
+
+def test_file_cache_rebuilds_missing_sidecar(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"))
+    cache.write(BUNDLES[0])
+    os.remove(cache.manifest_path_to(BUNDLES[0].rid))
+    
+    assert cache.read_manifest(BUNDLES[0].rid) == BUNDLES[0].manifest
+    assert os.path.exists(cache.manifest_path_to(BUNDLES[0].rid))
+
+def test_file_cache_ignores_sidecar_without_bundle(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"))
+    cache.write(BUNDLES[0])
+    os.remove(cache.file_path_to(BUNDLES[0].rid))
+    
+    assert cache.read_manifest(BUNDLES[0].rid) is None
+    assert not os.path.exists(cache.manifest_path_to(BUNDLES[0].rid))
+    assert cache.list_manifests() == []
+
+def test_file_cache_requires_directory():
+    with pytest.raises(ValueError, match="directory_path"):
+        FileCache(None)
+
+def test_caches_implement_backend(cache, tmp_path):
+    assert isinstance(cache, CacheBackend)
+    # the database's directory for SQLite
+    assert cache.directory_path in (str(tmp_path / "cache"), str(tmp_path))
+    with pytest.raises(TypeError):
+        CacheBackend(str(tmp_path))
+
+def test_helpers_support_plain_caches(tmp_path):
+    cache = Cache(str(tmp_path / "cache"))
+    for bundle in BUNDLES:
+        cache.write(bundle)
+    
+    assert read_manifest(cache, BUNDLES[0].rid) == BUNDLES[0].manifest
+    assert read_manifest(cache, SlackMessage("T0", "C0", "0.0")) is None
+    assert {m.rid for m in list_manifests(cache, [SlackChannel])} == {BUNDLES[5].rid}
+    rids = sorted((b.rid for b in BUNDLES), key=str)
+    assert list_rids_page(cache, limit=4) == rids[:4]
+    assert list_rids_page(cache, after=str(rids[3])) == rids[4:]
+
+def test_file_cache_pages_without_listing_directory(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path / "cache"))
+    for bundle in BUNDLES[1:]:
+        cache.write(bundle)
+    assert cache.list_rids_page(limit=2) == sorted((b.rid for b in BUNDLES[1:]), key=str)[:2]
+    
+    listings = []
+    list_rids = cache.list_rids
+    monkeypatch.setattr(cache, "list_rids", lambda *args: listings.append(args) or list_rids(*args))
+    
+    # writes and deletes through the cache update the index
+    cache.write(BUNDLES[0])
+    cache.delete(BUNDLES[2].rid)
+    expected = sorted((b.rid for b in BUNDLES if b is not BUNDLES[2]), key=str)
+    pages, after = [], None
+    while page := cache.list_rids_page(after=after, limit=2):
+        pages.append(page)
+        after = str(page[-1])
+    assert [rid for page in pages for rid in page] == expected
+    assert cache.list_rids_page([SlackChannel]) == [BUNDLES[5].rid]
+    assert listings == []
+    
+    # bundles deleted outside the cache are picked up
+    os.remove(cache.file_path_to(BUNDLES[3].rid))
+    os.utime(cache.directory_path, ns=(0, 0))
+    assert BUNDLES[3].rid not in cache.list_rids_page()
+    assert len(listings) == 1
@@ -0,0 +1,74 @@
+import threading
+import time
+import httpx
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.protocol.event import Event, EventType
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+
+
+PEER = KoiNetNode.generate("peer")
+EVENTS = [
+    Event.from_bundle(EventType.NEW, Bundle.generate(
+        SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"}))
+    for i in range(6)
+]
+
+
+@pytest.fixture
+def network(make_node, monkeypatch):
+    network = make_node(webhook_flush_interval=0.2, webhook_batch_size=3).network
+    profile = NodeProfile(node_type=NodeType.FULL, base_url="http://peer", provides=NodeProvides())
+    monkeypatch.setattr(network.graph, "get_node_profile", lambda node: profile)
+    network.batches = []
+    network.failing = False
+    network.delivered = threading.Event()
+    
+    def broadcast(node, events):
+        if network.failing:
+            raise httpx.ConnectError("unreachable")
+        network.batches.append([event.rid for event in events])
+        network.delivered.set()
+    
+    monkeypatch.setattr(network.request_handler, "broadcast_events", broadcast)
+    network.webhook_dispatcher.start()
+    yield network
+    network.webhook_dispatcher.stop()
+
+def test_full_batch_is_flushed_before_max_latency(network):
+    start = time.monotonic()
+    for event in EVENTS[:3]:
+        network.push_event_to(event, PEER)
+    
+    assert network.delivered.wait(timeout=1)
+    assert time.monotonic() - start < 0.2
+    assert network.batches == [[event.rid for event in EVENTS[:3]]]
+
+def test_partial_batch_is_flushed_after_max_latency(network):
+    start = time.monotonic()
+    network.push_event_to(EVENTS[0], PEER)
+    network.push_event_to(EVENTS[1], PEER)
+    
+    assert network.delivered.wait(timeout=2)
+    assert time.monotonic() - start >= 0.2
+    assert network.batches == [[event.rid for event in EVENTS[:2]]]
+
+def test_stop_flushes_pending_events(network):
+    network.push_event_to(EVENTS[0], PEER)
+    network.webhook_dispatcher.stop()
+    assert network.batches == [[EVENTS[0].rid]]
+
+def test_failed_flush_is_retried(network):
+    network.failing = True
+    network.circuit_breaker.base_delay = 0.1
+    network.circuit_breaker.jitter = 0
+    for event in EVENTS[:3]:
+        network.push_event_to(event, PEER)
+    
+    time.sleep(0.05)
+    assert network.batches == []
+    network.failing = False
+    
+    assert network.delivered.wait(timeout=2)
+    assert network.batches == [[event.rid for event in EVENTS[:3]]]
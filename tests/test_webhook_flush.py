@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetNode, SlackMessage
+from koi_net.protocol.event import Event, EventType
+from koi_net.protocol.node import NodeProfile, NodeType, NodeProvides
+
+
+PEER = KoiNetNode.generate("peer")
+EVENTS = [
+    Event.from_bundle(EventType.NEW, Bundle.generate(
+        SlackMessage("T0", "C0", f"{i}.000100"), {"text": f"message {i}"}))
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def network(make_node, monkeypatch):
+    network = make_node().network
+    profile = NodeProfile(node_type=NodeType.FULL, base_url="http://peer", provides=NodeProvides())
+    monkeypatch.setattr(network.graph, "get_node_profile", lambda node: profile)
+    network.delivered = []
+    
+    def broadcast(node, events):
+        time.sleep(0.02)
+        network.delivered.extend(event.rid for event in events)
+    
+    async def broadcast_async(node, events):
+        await asyncio.sleep(0.02)
+        network.delivered.extend(event.rid for event in events)
+    
+    monkeypatch.setattr(network.request_handler, "broadcast_events", broadcast)
+    monkeypatch.setattr(network.async_request_handler, "broadcast_events", broadcast_async)
+    
+    queue = network._get_queue(network.webhook_event_queue, PEER)
+    for event in EVENTS:
+        queue.put(event)
+    return network
+
+def test_concurrent_async_flushes_deliver_once(network):
+    async def flush_concurrently():
+        return await asyncio.gather(*(
+            network.flush_webhook_queue_async(PEER) for _ in range(5)))
+    
+    # flushes finding the queue already emptied return None
+    assert sorted(asyncio.run(flush_concurrently()), key=str) == [None] * 4 + [True]
+    assert network.delivered == [event.rid for event in EVENTS]
+    assert network.webhook_event_queue[PEER].empty()
+
+def test_async_flush_waits_for_thread_flush(network):
+    thread = threading.Thread(target=network.flush_webhook_queue, args=(PEER,))
+    
+    async def flush_during_thread_flush():
+        thread.start()
+        await asyncio.sleep(0.005)
+        return await network.flush_webhook_queue_async(PEER)
+    
+    assert asyncio.run(flush_during_thread_flush()) is None
+    thread.join()
+    assert network.delivered == [event.rid for event in EVENTS]
+
+def test_flushes_from_several_event_loops_deliver_once(network):
+    threads = [
+        threading.Thread(target=asyncio.run, args=(network.flush_webhook_queue_async(PEER),))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert network.delivered == [event.rid for event in EVENTS]
+
+def flush(network, use_async: bool):
+    if use_async:
+        return asyncio.run(network.flush_webhook_queue_async(PEER))
+    return network.flush_webhook_queue(PEER)
+
+@pytest.mark.parametrize("use_async", [False, True], ids=["sync", "async"])
+def test_failed_flush_keeps_events_queued(network, monkeypatch, use_async):
+    def unreachable(node, events):
+        raise httpx.ConnectError("unreachable")
+    
+    async def unreachable_async(node, events):
+        unreachable(node, events)
+    
+    monkeypatch.setattr(network.request_handler, "broadcast_events", unreachable)
+    monkeypatch.setattr(network.async_request_handler, "broadcast_events", unreachable_async)
+    
+    assert flush(network, use_async) is False
+    assert len(network.webhook_event_queue[PEER]) == len(EVENTS)
+    assert network.circuit_breaker.circuits[PEER].failures == 1
+
+@pytest.mark.parametrize("use_async", [False, True], ids=["sync", "async"])
+def test_flush_error_is_raised_and_recorded(network, monkeypatch, use_async):
+    def broken(node, events):
+        raise RuntimeError("broken")
+    
+    async def broken_async(node, events):
+        broken(node, events)
+    
+    monkeypatch.setattr(network.request_handler, "broadcast_events", broken)
+    monkeypatch.setattr(network.async_request_handler, "broadcast_events", broken_async)
+    
+    with pytest.raises(RuntimeError):
+        flush(network, use_async)
+    assert len(network.webhook_event_queue[PEER]) == len(EVENTS)
+    assert network.circuit_breaker.circuits[PEER].failures == 1
+    assert not network._webhook_locks[PEER].locked()
+
+def test_cancelled_async_flush_releases_thread_lock(network):
+    lock = network._webhook_locks.setdefault(PEER, threading.Lock())
+    lock.acquire()
+    
+    async def cancel_while_waiting():
+        task = asyncio.create_task(network.flush_webhook_queue_async(PEER))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        lock.release()
+        await asyncio.sleep(0.05)
+    
+    asyncio.run(cancel_while_waiting())
+    assert not lock.locked()
+    assert network.delivered == []